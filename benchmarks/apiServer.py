@@ -0,0 +1,364 @@
+"""
+Local stand-in for the Wynncraft, Mojang, PlayerDB and Wynntils APIs, so load tests and benchmarks of the bot don't hit
+the real APIs.
+
+Usage: ``python -m benchmarks.apiServer [--port N] [--players N] [--guilds N] [--online F] [--churn F]
+[--rate-limit N] [--error-rate F] [--latency S] [--seed N]``
+
+Start the bot or the tracker process with ``API_OVERRIDE_URL=http://127.0.0.1:PORT`` to send all API requests here.
+The server simulates a world of synthetic players and guilds in which a share of the online players is replaced every
+minute. Wynncraft responses carry the ``ratelimit-reset`` and ``x-ratelimit-remaining-minute`` headers of the real API,
+requests above the rate limit are answered with 429 and a configurable share of requests fails with 524.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid as uuid_lib
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from benchmarks import payloads
+
+
+@dataclass(frozen=True)
+class WorldConfig:
+    players: int = 20000
+    guilds: int = 500
+    online: float = 0.1  # Share of the players that is online
+    churn: float = 0.02  # Share of the online players that leave (and are replaced by joining players) per minute
+    rate_limit: int = 120  # Wynncraft requests per minute and client
+    error_rate: float = 0.0  # Share of the wynncraft requests that fail with 524
+    latency: float = 0.0  # Mean response delay in seconds
+    seed: int = 38
+
+
+# Requests per window (in seconds) of the other APIs
+_LIMITS = {
+    "mojang": (600, 600),
+    "minecraftservices": (600, 600),
+    "playerdb": (600, 60),
+    "wynntils": (1200, 60),
+}
+
+
+class _RateWindow:
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._start = time.monotonic()
+        self._count = 0
+
+    def hit(self) -> tuple[bool, int, int]:
+        """
+        Count a request.
+
+        :return: Whether the request is allowed, the remaining requests and the seconds until the window resets.
+        """
+        now = time.monotonic()
+        if now - self._start >= self.window:
+            self._start = now
+            self._count = 0
+        reset = max(int(self._start + self.window - now), 1)
+
+        if self._count >= self.limit:
+            return False, 0, reset
+        self._count += 1
+        return True, self.limit - self._count, reset
+
+
+def _api_of(path: str) -> str:
+    if path.startswith("/v3/"):
+        return "wynncraft"
+    if path.startswith("/api/player/"):
+        return "playerdb"
+    if path.startswith("/minecraft/profile/"):
+        return "minecraftservices"
+    if path.startswith("/cache/"):
+        return "wynntils"
+    return "mojang"
+
+
+def _parse_uuid(s: str) -> str | None:
+    try:
+        return str(uuid_lib.UUID(s))
+    except ValueError:
+        return None
+
+
+class World:
+    def __init__(self, config: WorldConfig):
+        """
+        The synthetic players, guilds and online players served by the stand-in server.
+        """
+        self.config = config
+        self._rng = random.Random(config.seed)
+        rng = self._rng
+
+        self.players: dict[str, str] = {}
+        self._by_name: dict[str, str] = {}
+        while len(self.players) < config.players:
+            name = payloads.make_username(rng)
+            if name.lower() not in self._by_name:
+                uuid = payloads.make_uuid(rng)
+                self.players[uuid] = name
+                self._by_name[name.lower()] = uuid
+
+        self.guilds: dict[str, tuple[str, str, str]] = {}
+        while len(self.guilds) < config.guilds:
+            name = payloads.make_username(rng)
+            self.guilds.setdefault(name.lower(), (payloads.make_uuid(rng), name, name[:4].upper()))
+        guild_list = list(self.guilds.values())
+        self._by_prefix = {g[2].lower(): g for g in reversed(guild_list)}
+
+        self.members: dict[str, dict[str, str]] = {g[1]: {} for g in guild_list}
+        self.player_guild: dict[str, tuple[str, str, str]] = {}
+        for uuid, name in self.players.items():
+            if rng.random() < 0.6:
+                g = rng.choice(guild_list)
+                self.player_guild[uuid] = g
+                self.members[g[1]][uuid] = name
+
+        self.online: dict[str, str] = {uuid: rng.choice(payloads.WORLDS)
+                                       for uuid in rng.sample(list(self.players), int(config.players * config.online))}
+        self._last_churn = time.monotonic()
+        self._churn_carry = 0.0
+
+        self.territories = payloads.territories(random.Random(config.seed), guild_list)
+
+    def update_online(self):
+        """
+        Replace the share of online players given by the churn for the time passed since the last update.
+        """
+        now = time.monotonic()
+        self._churn_carry += self.config.churn * len(self.online) * (now - self._last_churn) / 60
+        self._last_churn = now
+
+        changes = int(self._churn_carry)
+        if changes == 0:
+            return
+        self._churn_carry -= changes
+
+        offline = [uuid for uuid in self._rng.sample(list(self.players), min(changes * 2, len(self.players)))
+                   if uuid not in self.online][:changes]
+        for uuid in self._rng.sample(list(self.online), min(len(offline), len(self.online))):
+            del self.online[uuid]
+        for uuid in offline:
+            self.online[uuid] = self._rng.choice(payloads.WORLDS)
+
+    def find_player(self, identifier: str) -> str | None:
+        """
+        :return: The uuid of the player with the uuid or username or None if there is none.
+        """
+        uuid = _parse_uuid(identifier)
+        if uuid is not None:
+            return uuid if uuid in self.players else None
+        return self._by_name.get(identifier.lower())
+
+    def rng_for(self, key: str) -> random.Random:
+        """
+        A Random that produces the same payload for the same player or guild on each request.
+        """
+        return random.Random(f"{self.config.seed}:{key}")
+
+
+class StandinApi:
+    def __init__(self, world: World):
+        self.world = world
+        self._windows: dict[tuple[str, str], _RateWindow] = {}
+        self._rng = random.Random(world.config.seed)
+
+    def _window(self, api: str, client: str) -> _RateWindow:
+        window = self._windows.get((api, client))
+        if window is None:
+            limit, seconds = _LIMITS.get(api, (self.world.config.rate_limit, 60))
+            window = self._windows[(api, client)] = _RateWindow(limit, seconds)
+        return window
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        config = self.world.config
+        if config.latency > 0:
+            await asyncio.sleep(self._rng.expovariate(1 / config.latency))
+
+        api = _api_of(request.path)
+        allowed, remaining, reset = self._window(api, request.remote).hit()
+        headers = {}
+        if api == "wynncraft":
+            headers = {"ratelimit-reset": str(reset), "x-ratelimit-remaining-minute": str(remaining)}
+
+        if not allowed:
+            return web.json_response({"message": "Ratelimited"}, status=429,
+                                     headers={**headers, "Retry-After": str(reset)})
+        if api == "wynncraft" and self._rng.random() < config.error_rate:
+            return web.Response(status=524, text="A timeout occurred")
+
+        self.world.update_online()
+        resp = await handler(request)
+        resp.headers.update(headers)
+        return resp
+
+    # Wynncraft
+
+    async def online_players(self, request: web.Request) -> web.Response:
+        online = self.world.online
+        if request.query.get("identifier") == "uuid":
+            players = dict(online)
+        else:
+            players = {self.world.players[uuid]: server for uuid, server in online.items()}
+        return web.json_response({"total": len(players), "players": players})
+
+    def _player_or_404(self, request: web.Request) -> str | None:
+        return self.world.find_player(request.match_info["player"])
+
+    async def player(self, request: web.Request) -> web.Response:
+        uuid = self._player_or_404(request)
+        if uuid is None:
+            return web.json_response({"Error": "Player not found"}, status=404)
+
+        world = self.world
+        data = payloads.player_stats(world.rng_for(uuid), uuid, world.players[uuid],
+                                     full_result=request.query.get("fullResult", "False") == "True",
+                                     guild=world.player_guild.get(uuid), online=uuid in world.online)
+        data["server"] = world.online.get(uuid)
+        return web.json_response(data)
+
+    async def characters(self, request: web.Request) -> web.Response:
+        uuid = self._player_or_404(request)
+        if uuid is None:
+            return web.json_response({"Error": "Player not found"}, status=404)
+
+        rng = self.world.rng_for(uuid)
+        return web.json_response({payloads.make_uuid(rng): payloads.character_short(rng) for _ in range(6)})
+
+    async def abilities(self, request: web.Request) -> web.Response:
+        uuid = self._player_or_404(request)
+        if uuid is None:
+            return web.json_response({"Error": "Player not found"}, status=404)
+
+        return web.json_response(payloads.ability_nodes(self.world.rng_for(request.match_info["character"])))
+
+    def _guild_response(self, request: web.Request, guild: tuple[str, str, str] | None) -> web.Response:
+        if guild is None:
+            return web.json_response({"Error": "Guild not found"}, status=404)
+
+        world = self.world
+        members = world.members[guild[1]]
+        data = payloads.guild_stats(world.rng_for(guild[0]), guild[1], guild[2], members=members)
+        data["uuid"] = guild[0]
+
+        by_username = request.query.get("identifier") != "uuid"
+        online = 0
+        for rank, rank_members in data["members"].items():
+            if rank == "total":
+                continue
+            for uuid, member in rank_members.items():
+                member["online"] = uuid in world.online
+                member["server"] = world.online.get(uuid)
+                online += member["online"]
+            if by_username:
+                data["members"][rank] = {m["username"]: {**m, "uuid": uuid} for uuid, m in rank_members.items()}
+        data["online"] = online
+
+        return web.json_response(data)
+
+    async def guild(self, request: web.Request) -> web.Response:
+        return self._guild_response(request, self.world.guilds.get(request.match_info["name"].lower()))
+
+    async def guild_by_prefix(self, request: web.Request) -> web.Response:
+        return self._guild_response(request, self.world._by_prefix.get(request.match_info["prefix"].lower()))
+
+    async def guild_list(self, request: web.Request) -> web.Response:
+        return web.json_response({g[1]: {"uuid": g[0], "prefix": g[2]} for g in self.world.guilds.values()})
+
+    async def territory_list(self, request: web.Request) -> web.Response:
+        return web.json_response(self.world.territories)
+
+    # Mojang and PlayerDB
+
+    def _profile(self, uuid: str) -> dict:
+        return {"id": uuid.replace("-", ""), "name": self.world.players[uuid]}
+
+    async def mojang_by_name(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        uuid = self.world.find_player(name)
+        if uuid is None or _parse_uuid(name) is not None:
+            return web.json_response({"path": request.path,
+                                      "errorMessage": f"Couldn't find any profile with name {name}"}, status=404)
+        return web.json_response(self._profile(uuid))
+
+    async def mojang_by_uuid(self, request: web.Request) -> web.Response:
+        uuid = _parse_uuid(request.match_info["uuid"])
+        if uuid is None or uuid not in self.world.players:
+            return web.json_response({"path": request.path, "errorMessage": "Not Found"}, status=404)
+        return web.json_response(self._profile(uuid))
+
+    async def mojang_bulk(self, request: web.Request) -> web.Response:
+        names = await request.json()
+        if not isinstance(names, list) or len(names) > 10:
+            return web.json_response({"errorMessage": "Invalid request"}, status=400)
+
+        uuids = (self.world.find_player(name) for name in names if _parse_uuid(name) is None)
+        return web.json_response([self._profile(uuid) for uuid in uuids if uuid is not None])
+
+    async def playerdb(self, request: web.Request) -> web.Response:
+        uuid = self.world.find_player(request.match_info["player"])
+        if uuid is None:
+            return web.json_response({"code": "player.not_found", "success": False}, status=404)
+        return web.json_response({
+            "code": "player.found",
+            "data": {"player": {"id": uuid, "raw_id": uuid.replace("-", ""), "username": self.world.players[uuid]}},
+            "success": True,
+        })
+
+    # Wynntils
+
+    async def wynntils_guilds(self, request: web.Request) -> web.Response:
+        rng = self.world.rng_for("wynntils")
+        return web.json_response([{"_id": g[1], "prefix": g[2], "color": f"#{rng.getrandbits(24):06x}"}
+                                  for g in self.world.guilds.values()])
+
+
+def create_app(config: WorldConfig = WorldConfig()) -> web.Application:
+    api = StandinApi(World(config))
+    app = web.Application(middlewares=[api.middleware])
+    app.router.add_get("/v3/player", api.online_players)
+    app.router.add_get("/v3/player/{player}", api.player)
+    app.router.add_get("/v3/player/{player}/characters", api.characters)
+    app.router.add_get("/v3/player/{player}/characters/{character}/abilities", api.abilities)
+    app.router.add_get("/v3/guild/list/guild", api.guild_list)
+    app.router.add_get("/v3/guild/list/territory", api.territory_list)
+    app.router.add_get("/v3/guild/prefix/{prefix}", api.guild_by_prefix)
+    app.router.add_get("/v3/guild/{name}", api.guild)
+    app.router.add_get("/users/profiles/minecraft/{name}", api.mojang_by_name)
+    app.router.add_get("/user/profile/{uuid}", api.mojang_by_uuid)
+    app.router.add_post("/minecraft/profile/lookup/bulk/byname", api.mojang_bulk)
+    app.router.add_get("/api/player/minecraft/{player}", api.playerdb)
+    app.router.add_get("/cache/get/guildList", api.wynntils_guilds)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the APIs used by the bot.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--players", type=int, default=WorldConfig.players)
+    parser.add_argument("--guilds", type=int, default=WorldConfig.guilds)
+    parser.add_argument("--online", type=float, default=WorldConfig.online)
+    parser.add_argument("--churn", type=float, default=WorldConfig.churn)
+    parser.add_argument("--rate-limit", type=int, default=WorldConfig.rate_limit)
+    parser.add_argument("--error-rate", type=float, default=WorldConfig.error_rate)
+    parser.add_argument("--latency", type=float, default=WorldConfig.latency)
+    parser.add_argument("--seed", type=int, default=WorldConfig.seed)
+    args = parser.parse_args()
+
+    config = WorldConfig(args.players, args.guilds, args.online, args.churn, args.rate_limit, args.error_rate,
+                         args.latency, args.seed)
+    app = create_app(config)
+    print(f"Serving {config.players} players and {config.guilds} guilds. "
+          f"Run the bot with API_OVERRIDE_URL=http://127.0.0.1:{args.port}")
+    web.run_app(app, host="127.0.0.1", port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
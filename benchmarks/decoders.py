@@ -0,0 +1,114 @@
+"""
+Benchmark of the compiled json decoders against the reflective conversion and of the tracked stats projection.
+
+Usage: ``python -m benchmarks.decoders [--payloads FILE | --recording FILE] [--repeat N]``
+
+The payloads FILE is a json file of the form ``{"players": [...], "guilds": [...]}`` containing raw
+``/v3/player/{uuid}`` and ``/v3/guild/{name}`` responses. The recording FILE is an API recording made with
+``API_RECORD_FILE`` whose successful player and guild responses are used. Synthetic payloads are generated if no file
+is given.
+"""
+import argparse
+import json
+import random
+import re
+import time
+from datetime import datetime
+
+from yarl import URL
+
+from benchmarks import payloads
+from common.api import apiRecorder
+from common.types import jsonDecoder
+from common.types.wynncraft import PlayerStats, GuildStats, TrackedPlayerStats
+
+
+def _synthetic_payloads() -> dict[str, list]:
+    rng = random.Random(26)
+    return {
+        "players": [payloads.player_stats(rng, full_result=i % 4 == 0, guild=("uuid", "Nerfuria", "Nia"))
+                    for i in range(200)],
+        "guilds": [payloads.guild_stats(rng, member_count=rng.randint(20, 150)) for _ in range(50)],
+    }
+
+
+_PLAYER_PATH = re.compile(r"/v3/player/[^/]+")
+_GUILD_PATH = re.compile(r"/v3/guild/(prefix/)?[^/]+")
+
+
+def _recorded_payloads(path: str) -> dict[str, list]:
+    data = {"players": [], "guilds": []}
+    for record in apiRecorder.load(path):
+        if record["status"] != 200 or not isinstance(record["body"], str):
+            continue
+
+        url_path = URL(record["url"]).path
+        if _PLAYER_PATH.fullmatch(url_path):
+            data["players"].append(json.loads(record["body"]))
+        elif _GUILD_PATH.fullmatch(url_path) and not url_path.startswith("/v3/guild/list/"):
+            data["guilds"].append(json.loads(record["body"]))
+    return data
+
+
+def _time(f, items: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for item in items:
+            f(item)
+        best = min(best, time.perf_counter() - t)
+    return best / len(items)
+
+
+def run(data: dict[str, list], repeat: int):
+    for cls, items in ((PlayerStats, data["players"]), (GuildStats, data["guilds"])):
+        if not items:
+            continue
+
+        for item in items:
+            if cls.from_json(item) != jsonDecoder.decode_reflective(cls, item):
+                raise AssertionError(f"Compiled decoder result differs from reflective result for {cls.__name__}")
+
+        reflective = _time(lambda j: jsonDecoder.decode_reflective(cls, j), items, repeat)
+        compiled = _time(cls.from_json, items, repeat)
+
+        print(f"{cls.__name__:<12} ({len(items)} payloads): "
+              f"reflective {reflective * 1e6:9.1f}us  compiled {compiled * 1e6:9.1f}us  "
+              f"speed-up {reflective / compiled:5.2f}x")
+
+
+def run_projection(data: dict[str, list], repeat: int):
+    items = data["players"]
+    if not items:
+        return
+
+    now = datetime.utcnow()
+    full = _time(lambda j: TrackedPlayerStats.from_stats(PlayerStats.from_json(j), now), items, repeat)
+    projected = _time(lambda j: TrackedPlayerStats.from_stats_json(j, now), items, repeat)
+
+    print(f"{'Tracked row':<12} ({len(items)} payloads): "
+          f"full decode {full * 1e6:8.1f}us  projection {projected * 1e6:8.1f}us  "
+          f"speed-up {full / projected:5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", help="json file with recorded payloads")
+    parser.add_argument("--recording", help="API recording made with API_RECORD_FILE")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payloads:
+        with open(args.payloads, encoding="utf8") as f:
+            data = json.load(f)
+    elif args.recording:
+        data = _recorded_payloads(args.recording)
+    else:
+        data = _synthetic_payloads()
+
+    run(data, args.repeat)
+    run_projection(data, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
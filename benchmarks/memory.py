@@ -0,0 +1,66 @@
+"""
+Memory report of the decoded API models for a realistic cache population.
+
+Usage: ``python -m benchmarks.memory [--guilds N] [--players N] [--territories N]``
+
+The payloads are generated and serialized first. Each measurement parses the json text and decodes it like an API
+response, then drops the raw json, so only the memory retained by the decoded objects is counted.
+"""
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from benchmarks import payloads
+from common.types.wynncraft import GuildStats, PlayerStats, Territory
+
+
+def _measure(f) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    res = f()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, res
+
+
+def run(guild_count: int, player_count: int, territory_count: int):
+    rng = random.Random(28)
+    guilds = [payloads.guild_stats(rng, member_count=rng.randint(10, 150)) for _ in range(guild_count)]
+    guild_ids = [(g["uuid"], g["name"], g["prefix"]) for g in guilds]
+    players = [payloads.player_stats(rng, full_result=rng.random() < 0.05, guild=rng.choice(guild_ids + [None]))
+               for _ in range(player_count)]
+    territories = payloads.territories(rng, guild_ids, territory_count)
+
+    guilds = [json.dumps(g) for g in guilds]
+    players = [json.dumps(p) for p in players]
+    territories = json.dumps(territories)
+
+    total = 0
+    for name, f in (
+            (f"{guild_count} guild rosters", lambda: [GuildStats.from_json(json.loads(g)) for g in guilds]),
+            (f"{player_count} player stats", lambda: [PlayerStats.from_json(json.loads(p)) for p in players]),
+            (f"{territory_count} territories",
+             lambda: {k: Territory.from_json(v) for k, v in json.loads(territories).items()}),
+    ):
+        size, _ = _measure(f)
+        total += size
+        print(f"{name:<20} {size / 2 ** 20:8.2f} MiB")
+
+    print(f"{'total':<20} {total / 2 ** 20:8.2f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=300)
+    parser.add_argument("--players", type=int, default=3000)
+    parser.add_argument("--territories", type=int, default=400)
+    args = parser.parse_args()
+
+    run(args.guilds, args.players, args.territories)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Synthetic payloads shaped like the responses of the Wynncraft, Mojang and Wynntils APIs.
+All generators take a seeded Random so the produced payloads are reproducible between runs.
+"""
+import random
+import uuid as uuid_lib
+from datetime import datetime, timedelta, timezone
+
+DUNGEONS = (
+    "Decrepit Sewers", "Infested Pit", "Lost Sanctuary", "Underworld Crypt", "Sand-Swept Tomb", "Ice Barrows",
+    "Galleon's Graveyard", "Undergrowth Ruins", "Corrupted Decrepit Sewers", "Corrupted Infested Pit",
+    "Corrupted Lost Sanctuary", "Corrupted Sand-Swept Tomb", "Corrupted Underworld Crypt",
+    "Corrupted Galleon's Graveyard", "Corrupted Undergrowth Ruins", "Corrupted Ice Barrows", "Fallen Factory",
+    "Eldritch Outlook", "Timelost Sanctum",
+)
+RAIDS = ("Nest of the Grootslangs", "Orphion's Nexus of Light", "The Canyon Colossus", "The Nameless Anomaly")
+CLASSES = ("ARCHER", "WARRIOR", "MAGE", "ASSASSIN", "SHAMAN")
+RANKS = ("Player", "Player", "Player", "Media", "Moderator")
+SUPPORT_RANKS = (None, "vip", "vipplus", "hero", "champion")
+GUILD_RANKS = ("owner", "chief", "strategist", "captain", "recruiter", "recruit")
+PROFESSIONS = ("fishing", "woodcutting", "mining", "farming", "scribing", "jeweling", "alchemism", "cooking",
+               "weaponsmithing", "tailoring", "woodworking", "armouring")
+WORLDS = tuple(f"WC{i}" for i in range(1, 61))
+
+_EPOCH = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def make_uuid(rng: random.Random) -> str:
+    return str(uuid_lib.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_username(rng: random.Random) -> str:
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 16)))
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _timestamp(rng: random.Random, max_days: int = 2000) -> str:
+    return _iso(_EPOCH - timedelta(seconds=rng.randint(0, max_days * 86400)))
+
+
+def _completions(rng: random.Random, names: tuple[str, ...]) -> dict:
+    completions = {name: rng.randint(1, 300) for name in names if rng.random() < 0.6}
+    return {"total": sum(completions.values()), "list": completions}
+
+
+def character_stats(rng: random.Random) -> dict:
+    return {
+        "type": rng.choice(CLASSES),
+        "nickname": None,
+        "level": rng.randint(1, 106),
+        "xp": rng.randint(0, 10 ** 9),
+        "xpPercent": rng.randint(0, 99),
+        "totalLevel": rng.randint(1, 1690),
+        "wars": rng.randint(0, 5000),
+        "playtime": round(rng.uniform(0, 3000), 2),
+        "mobsKilled": rng.randint(0, 10 ** 6),
+        "chestsFound": rng.randint(0, 10 ** 4),
+        "blocksWalked": rng.randint(0, 10 ** 8),
+        "itemsIdentified": rng.randint(0, 10 ** 4),
+        "logins": rng.randint(0, 10 ** 4),
+        "deaths": rng.randint(0, 10 ** 4),
+        "discoveries": rng.randint(0, 700),
+        "pvp": {"kills": rng.randint(0, 100), "deaths": rng.randint(0, 100)},
+        "gamemode": [m for m in ("hardcore", "ironman", "craftsman", "hunted") if rng.random() < 0.1],
+        "skillPoints": {s: rng.randint(0, 150) for s in ("strength", "dexterity", "intelligence", "defence",
+                                                          "agility")},
+        "professions": {p: {"level": rng.randint(1, 132), "xpPercent": rng.randint(0, 99)} for p in PROFESSIONS},
+        "dungeons": _completions(rng, DUNGEONS),
+        "raids": _completions(rng, RAIDS),
+        "quests": [f"Quest {i}" for i in range(rng.randint(0, 250))],
+    }
+
+
+def character_short(rng: random.Random) -> dict:
+    return {
+        "type": rng.choice(CLASSES),
+        "nickname": None,
+        "level": rng.randint(1, 106),
+        "xp": rng.randint(0, 10 ** 9),
+        "xpPercent": rng.randint(0, 99),
+        "totalLevel": rng.randint(1, 1690),
+        "gamemode": [],
+    }
+
+
+def ability_nodes(rng: random.Random, amount: int = 40) -> list[dict]:
+    """
+    Generate a ``/v3/player/{uuid}/characters/{character_uuid}/abilities`` response.
+    """
+    return [{
+        "type": "ability",
+        "coordinates": {"x": rng.randint(1, 9), "y": rng.randint(1, 6)},
+        "meta": {
+            "icon": {
+                "value": {"id": "minecraft:stone_axe", "name": "", "customModelData": str(rng.randint(1, 100))},
+                "format": "attribute",
+            },
+            "page": rng.randint(1, 8),
+            "id": f"ability{i}",
+        },
+        "family": [],
+    } for i in range(amount)]
+
+
+def player_stats(rng: random.Random, uuid: str = None, username: str = None, full_result: bool = False,
+                 guild: tuple[str, str, str] = None, online: bool = None, characters: int = 6) -> dict:
+    """
+    Generate a ``/v3/player/{uuid}`` response.
+
+    :param guild: (uuid, name, prefix) of the guild the player is in.
+    """
+    uuid = uuid or make_uuid(rng)
+    username = username or make_username(rng)
+    online = rng.random() < 0.2 if online is None else online
+    support_rank = rng.choice(SUPPORT_RANKS)
+    dungeons = _completions(rng, DUNGEONS)
+    raids = _completions(rng, RAIDS)
+
+    return {
+        "username": username,
+        "online": online,
+        "server": rng.choice(WORLDS) if online else None,
+        "activeCharacter": None,
+        "uuid": uuid,
+        "rank": rng.choice(RANKS),
+        "rankBadge": f"nextgen/badges/rank_{support_rank or 'player'}.svg",
+        "legacyRankColour": {"main": "#55ff55", "sub": "#00aa00"},
+        "shortenedRank": support_rank,
+        "supportRank": support_rank,
+        "veteran": rng.random() < 0.1,
+        "firstJoin": _timestamp(rng),
+        "lastJoin": _timestamp(rng, 30),
+        "playtime": round(rng.uniform(0, 5000), 2),
+        "guild": {
+            "uuid": guild[0],
+            "name": guild[1],
+            "prefix": guild[2],
+            "rank": rng.choice(GUILD_RANKS).upper(),
+            "rankStars": "**",
+        } if guild is not None else None,
+        "globalData": {
+            "wars": rng.randint(0, 10000),
+            "totalLevel": rng.randint(1, 5000),
+            "killedMobs": rng.randint(0, 10 ** 6),
+            "chestsFound": rng.randint(0, 10 ** 4),
+            "dungeons": dungeons,
+            "raids": raids,
+            "completedQuests": rng.randint(0, 1000),
+            "pvp": {"kills": rng.randint(0, 500), "deaths": rng.randint(0, 500)},
+        },
+        "forumLink": None,
+        "ranking": {"warsCompletion": rng.randint(1, 10 ** 5), "playerContent": rng.randint(1, 10 ** 5)},
+        "previousRanking": {},
+        "publicProfile": True,
+        "characters": {make_uuid(rng): character_stats(rng) for _ in range(characters)} if full_result else {},
+    }
+
+
+def guild_member(rng: random.Random, username: str = None, online: bool = None) -> dict:
+    online = rng.random() < 0.15 if online is None else online
+    return {
+        "username": username or make_username(rng),
+        "online": online,
+        "server": rng.choice(WORLDS) if online else None,
+        "contributed": rng.randint(0, 10 ** 10),
+        "contributionRank": rng.randint(1, 150),
+        "joined": _timestamp(rng, 1000),
+    }
+
+
+def guild_stats(rng: random.Random, name: str = None, prefix: str = None, members: dict[str, str] = None,
+                member_count: int = 120) -> dict:
+    """
+    Generate a ``/v3/guild/{name}?identifier=uuid`` response.
+
+    :param members: Mapping of member uuids to usernames. Random members are generated if None.
+    """
+    name = name or make_username(rng)
+    prefix = prefix or name[:3]
+    if members is None:
+        members = {make_uuid(rng): make_username(rng) for _ in range(member_count)}
+
+    ranks = {r: {} for r in GUILD_RANKS}
+    for i, (uuid, username) in enumerate(members.items()):
+        if i == 0:
+            rank = "owner"
+        else:
+            rank = rng.choices(GUILD_RANKS[1:], weights=(2, 5, 10, 15, 40))[0]
+        ranks[rank][uuid] = guild_member(rng, username)
+
+    online = sum(m["online"] for r in ranks.values() for m in r.values())
+
+    return {
+        "uuid": make_uuid(rng),
+        "name": name,
+        "prefix": prefix,
+        "level": rng.randint(1, 130),
+        "xpPercent": rng.randint(0, 99),
+        "territories": rng.randint(0, 40),
+        "wars": rng.randint(0, 100000),
+        "created": _timestamp(rng),
+        "members": {"total": len(members), **ranks},
+        "online": online,
+        "banner": {
+            "base": "WHITE",
+            "tier": 1,
+            "structure": "tier1",
+            "layers": [{"colour": "BLACK", "pattern": "STRIPE_TOP"} for _ in range(rng.randint(0, 6))],
+        },
+        "seasonRanks": {str(s): {"rating": rng.randint(0, 10 ** 6), "finalTerritories": rng.randint(0, 40)}
+                        for s in range(1, 19) if rng.random() < 0.5},
+    }
+
+
+def territories(rng: random.Random, guilds: list[tuple[str, str, str]], amount: int = 400) -> dict:
+    """
+    Generate a ``/v3/guild/list/territory`` response.
+
+    :param guilds: (uuid, name, prefix) of the guilds that can own territories.
+    """
+    res = {}
+    for i in range(amount):
+        g = rng.choice(guilds)
+        x, z = rng.randint(-2000, 2000), rng.randint(-6000, 0)
+        res[f"Territory {i}"] = {
+            "guild": {"uuid": g[0], "name": g[1], "prefix": g[2]},
+            "acquired": _timestamp(rng, 3),
+            "location": {"start": [x, z], "end": [x + rng.randint(50, 300), z + rng.randint(50, 300)]},
+        }
+    return res
@@ -0,0 +1,104 @@
+"""
+Serves a recording of API responses back to the bot, so benchmarks of the workers can be repeated with real traffic.
+
+Usage: ``python -m benchmarks.replayServer FILE [--port N] [--speed F] [--sequential]``
+
+FILE is a recording made by running the bot or the tracker process with ``API_RECORD_FILE=FILE``. Start the bot with
+``API_OVERRIDE_URL=http://127.0.0.1:PORT`` to replay it. Requests are matched to recorded responses by method, path and
+query. By default the clock of the recording is replayed: a request is answered with the latest response to the same
+request recorded up to the current time of the recording (sped up by --speed), after the recorded latency. So changes
+like the churn of the online player list happen at their original pace. With --sequential the responses to each request
+are served in recorded order without delays instead; the last one is repeated once all were served.
+"""
+import argparse
+import asyncio
+import bisect
+import time
+import urllib.parse
+from dataclasses import dataclass
+
+from aiohttp import web
+from yarl import URL
+
+from common.api import apiRecorder
+
+
+def request_key(method: str, url: str | URL) -> tuple[str, str, str]:
+    url = URL(url)
+    return method.upper(), url.path, urllib.parse.urlencode(sorted(url.query.items()))
+
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    speed: float = 1.0  # Speed of the replayed clock compared to the original
+    sequential: bool = False  # Serve responses in order instead of following the clock
+
+
+class Replay:
+    def __init__(self, records: list[dict], config: ReplayConfig = ReplayConfig()):
+        """
+        The recorded responses grouped by request.
+        """
+        self.config = config
+        self._responses: dict[tuple[str, str, str], list[dict]] = {}
+        for record in sorted(records, key=lambda r: r["t"]):
+            self._responses.setdefault(request_key(record["method"], record["url"]), []).append(record)
+        self._times = {key: [r["t"] for r in responses] for key, responses in self._responses.items()}
+        self._served: dict[tuple[str, str, str], int] = {}
+        self._start = time.monotonic()
+
+    def _recording_time(self) -> float:
+        return (time.monotonic() - self._start) * self.config.speed
+
+    def find(self, key: tuple[str, str, str]) -> dict | None:
+        """
+        Find the recorded response to serve for a request.
+        """
+        responses = self._responses.get(key)
+        if responses is None:
+            return None
+
+        if self.config.sequential:
+            i = self._served.get(key, 0)
+            self._served[key] = i + 1
+            return responses[min(i, len(responses) - 1)]
+
+        i = bisect.bisect_right(self._times[key], self._recording_time())
+        return responses[max(i - 1, 0)]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        record = self.find(request_key(request.method, request.rel_url))
+        if record is None:
+            return web.json_response({"message": f"{request.method} {request.rel_url} was not recorded"}, status=404)
+
+        if not self.config.sequential:
+            await asyncio.sleep(record["latency"] / self.config.speed)
+
+        body = record["body"]
+        return web.Response(status=record["status"], headers=record["headers"],
+                            body=body.encode() if isinstance(body, str) else body)
+
+
+def create_app(records: list[dict], config: ReplayConfig = ReplayConfig()) -> web.Application:
+    replay = Replay(records, config)
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", replay.handle)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recording of API responses.")
+    parser.add_argument("file")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--sequential", action="store_true")
+    args = parser.parse_args()
+
+    records = apiRecorder.load(args.file)
+    app = create_app(records, ReplayConfig(args.speed, args.sequential))
+    print(f"Replaying {len(records)} responses. Run the bot with API_OVERRIDE_URL=http://127.0.0.1:{args.port}")
+    web.run_app(app, host="127.0.0.1", port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import base64
+import gzip
+import json
+import time
+from typing import TextIO
+
+import aiohttp
+
+# Headers that describe the encoding of the response on the wire and don't apply to the stored (decoded) body
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+_file: TextIO | None = None
+_start = 0.0
+
+
+class RecordingResponse(aiohttp.ClientResponse):
+    """
+    A response that writes its status, headers and body to the recording once read. Responses whose body isn't read
+    (e.g. errors raised by raise_for_status) are recorded without a body when they are released.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sent_at = time.monotonic()
+        self._recorded = False
+
+    def _record(self, body: bytes | None):
+        if self._recorded or _file is None:
+            return
+        self._recorded = True
+
+        now = time.monotonic()
+        record = {
+            "t": round(now - _start, 3),
+            "latency": round(now - self._sent_at, 3),
+            "method": self.method,
+            "url": str(self.url),
+            "status": self.status,
+            "headers": {k: v for k, v in self.headers.items() if k.lower() not in _SKIPPED_HEADERS},
+        }
+        try:
+            record["body"] = body.decode() if body is not None else None
+        except UnicodeDecodeError:
+            record["body"] = base64.b64encode(body).decode()
+            record["base64"] = True
+
+        _file.write(json.dumps(record) + "\n")
+
+    async def read(self) -> bytes:
+        body = await super().read()
+        self._record(body)
+        return body
+
+    def release(self):
+        self._record(self._body)
+        return super().release()
+
+
+def start(path: str):
+    """
+    Record all responses of sessions created with RecordingResponse to a gzip compressed json lines file. Recordings
+    are appended if the file exists.
+    """
+    global _file, _start
+    if _file is not None:
+        raise RuntimeError("Already recording")
+    _file = gzip.open(path, "at", encoding="utf-8")
+    _start = time.monotonic()
+
+
+def is_recording() -> bool:
+    return _file is not None
+
+
+def stop():
+    global _file
+    if _file is not None:
+        _file.close()
+        _file = None
+
+
+def load(path: str) -> list[dict]:
+    """
+    Load the records of a recording in the order they were recorded. Bodies are returned as str, or as bytes if they
+    weren't text.
+    """
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.pop("base64", False):
+                record["body"] = base64.b64decode(record["body"])
+            records.append(record)
+    return records
@@ -1,67 +1,107 @@
 import asyncio
+import collections
 import os
+import time
 from http import HTTPStatus
 
 from common.types.dataTypes import MinecraftPlayer
-from . import sessionManager, rateLimit
+from . import sessionManager, rateLimit, retryPolicy, negativeCache
 
 _mojang_rate_limit = rateLimit.RateLimit(30, 1)
 _mc_services_rate_limit = rateLimit.RateLimit(10, 1)
 _ashcon_rate_limit = rateLimit.RateLimit(1000, 1)
 
-_mojang_api_session_id = sessionManager.register_session("https://api.mojang.com")
-_mc_services_api_session_id = sessionManager.register_session("https://api.minecraftservices.com")
-_player_api = sessionManager.register_session("https://playerdb.co")
+# Username lookups are many small requests, so keep connections alive between update cycles and fail fast.
+_lookup_profile = sessionManager.PoolProfile(limit=20, limit_per_host=10, keepalive_timeout=60, total_timeout=10,
+                                             connect_timeout=3)
+
+_mojang_api_session_id = sessionManager.register_session("https://api.mojang.com", _lookup_profile)
+_mc_services_api_session_id = sessionManager.register_session("https://api.minecraftservices.com", _lookup_profile)
+_player_api = sessionManager.register_session("https://playerdb.co", _lookup_profile)
+
+# Retry once quickly, a failed lookup is retried by the caller later anyway.
+_lookup_policy = retryPolicy.RetryPolicy(max_tries=2, base_delay=0.5, max_retry_after=5)
+
+
+def _negative_cache_key(uuid: str | None, username: str | None) -> tuple[str, str]:
+    if username is not None:
+        return negativeCache.MINECRAFT_NAME, username
+    return negativeCache.MINECRAFT_UUID, uuid.replace("-", "")
 
 
 async def get_player(*, uuid: str = None, username: str = None, use_mojang: bool = False) -> MinecraftPlayer | None:
     """
     Get a player via either their uuid or their username. Exactly one argument must be provided.
-    May raise a RatelimitException or ClientResponseError.
+    Players that weren't found are remembered for a while (see negativeCache).
+    May raise a RatelimitException, CircuitOpenException or ClientResponseError.
 
     :return: A player object if the player exists otherwise None.
     """
-    if (uuid is None) and (username is not None):
+    if (uuid is None) == (username is None):
+        raise TypeError("Exactly one argument (either uuid or username) must be provided.")
+
+    kind, key = _negative_cache_key(uuid, username)
+    if negativeCache.contains(kind, key):
+        return None
+
+    p = await _get_player(uuid, username, use_mojang)
+    if p is None:
+        negativeCache.add(kind, key)
+    return p
+
+
+async def _get_player(uuid: str | None, username: str | None, use_mojang: bool,
+                      latencies: collections.deque = None) -> MinecraftPlayer | None:
+    if username is not None:
         if use_mojang:
-            request = f"/users/profiles/minecraft/{username}"
+            path = f"/users/profiles/minecraft/{username}"
         else:
-            request = f"/api/player/minecraft/{username}"
-    elif (uuid is not None) and (username is None):
+            path = f"/api/player/minecraft/{username}"
+    else:
         # alternative: https://sessionserver.mojang.com/session/minecraft/profile/{uuid}\
         if use_mojang:
-            request = f"/users/profile/{uuid}"
+            path = f"/user/profile/{uuid}"
         else:
-            request = f"/api/player/minecraft/{uuid}"
-    else:
-        raise TypeError("Exactly one argument (either uuid or username) must be provided.")
+            path = f"/api/player/minecraft/{uuid}"
 
     headers = {}
 
     if use_mojang:
         session = sessionManager.get_session(_mojang_api_session_id)
         rate_limiter = _mojang_rate_limit
+        host = "api.mojang.com"
     else:
         session = sessionManager.get_session(_player_api)
         rate_limiter = _ashcon_rate_limit
+        host = "playerdb.co"
         # add a user-agent header
         headers["User-Agent"] = f"Email({os.getenv('EMAIL')})"
 
-    with rate_limiter:
-        async with session.get(request, headers=headers) as resp:
-            if resp.status == HTTPStatus.NOT_FOUND:
-                return None
+    async def request() -> MinecraftPlayer | None:
+        start = time.perf_counter()
+        try:
+            async with session.get(path, headers=headers) as resp:
+                if resp.status == HTTPStatus.NOT_FOUND:
+                    return None
 
-            resp.raise_for_status()
+                resp.raise_for_status()
 
-            if resp.status == HTTPStatus.NO_CONTENT:
-                return None
-            json = await resp.json()
+                if resp.status == HTTPStatus.NO_CONTENT:
+                    return None
+                json = await resp.json()
+
+                if use_mojang:
+                    return MinecraftPlayer(json["id"], json["name"])
+                else:
+                    data = json["data"]["player"]
+                    return MinecraftPlayer(data["id"], data["username"])
+        finally:
+            # Also count failed and cancelled requests, otherwise a slow api would only record its fast responses
+            if latencies is not None:
+                latencies.append(time.perf_counter() - start)
+
+    return await _lookup_policy.call(host, request, rate_limiter)
 
-            if use_mojang:
-                return MinecraftPlayer(json["id"], json["name"])
-            else:
-                data = json["data"]["player"]
-                return MinecraftPlayer(data["id"], data["username"])
 
 def calculate_remaining_calls() -> int:
     """
@@ -69,11 +109,134 @@ def calculate_remaining_calls() -> int:
     """
     return _mojang_rate_limit.calculate_remaining_calls()
 
+
 async def wait_on_rate_limit():
     wait_time = _mojang_rate_limit.get_time_until_next_free()
     await asyncio.sleep(wait_time + 1)
 
 
+class _Provider:
+    # Hedge delay used until enough latency samples were collected
+    DEFAULT_HEDGE_DELAY = 1.0
+    MIN_SAMPLES = 20
+
+    def __init__(self, host: str, rate_limit: rateLimit.RateLimit, use_mojang: bool):
+        """
+        A player api that can resolve single players, see get_player.
+        """
+        self.host = host
+        self.rate_limit = rate_limit
+        self.use_mojang = use_mojang
+        self._latencies = collections.deque(maxlen=200)
+
+    @property
+    def remaining_calls(self) -> int:
+        return self.rate_limit.calculate_remaining_calls()
+
+    def available(self) -> bool:
+        return self.remaining_calls > 0 and \
+            retryPolicy.get_breaker(self.host).state != retryPolicy.CircuitBreaker.OPEN
+
+    def can_hedge(self) -> bool:
+        """
+        Hedged requests may only use the upper half of the budget so they can't starve non-hedged lookups.
+        """
+        return self.available() and self.remaining_calls >= self.rate_limit.get_max_calls() / 2
+
+    def hedge_delay(self) -> float:
+        """
+        The 95th percentile of the recent response times of the api.
+        """
+        if len(self._latencies) < self.MIN_SAMPLES:
+            return self.DEFAULT_HEDGE_DELAY
+        return sorted(self._latencies)[int(len(self._latencies) * 0.95)]
+
+    async def get_player(self, uuid: str | None, username: str | None) -> MinecraftPlayer | None:
+        """
+        Look up a player, recording the response time of every request sent to the api. Lookups rejected by the rate
+        limit or the circuit breaker aren't recorded.
+        """
+        return await _get_player(uuid, username, self.use_mojang, self._latencies)
+
+
+_providers = (
+    _Provider("playerdb.co", _ashcon_rate_limit, use_mojang=False),
+    _Provider("api.mojang.com", _mojang_rate_limit, use_mojang=True),
+)
+
+
+def calculate_remaining_lookups() -> int:
+    """
+    Calculate the remaining single player lookups over all player apis.
+    """
+    return sum(p.remaining_calls for p in _providers if p.available())
+
+
+async def resolve_player(*, uuid: str = None, username: str = None) -> MinecraftPlayer | None:
+    """
+    Get a player via either their uuid or their username from the player api with the most remaining requests.
+    If it hasn't responded after its 95th percentile response time the request is hedged to the next api with enough
+    remaining requests, and on errors it fails over to the next api. The first found player wins and the remaining
+    requests are cancelled.
+    May raise a RatelimitException, CircuitOpenException or ClientResponseError if no api could be reached.
+
+    :return: A player object if the player exists otherwise None.
+    """
+    if (uuid is None) == (username is None):
+        raise TypeError("Exactly one argument (either uuid or username) must be provided.")
+
+    kind, key = _negative_cache_key(uuid, username)
+    if negativeCache.contains(kind, key):
+        return None
+
+    providers = sorted((p for p in _providers if p.available()), key=lambda p: p.remaining_calls, reverse=True)
+    if len(providers) == 0:
+        raise rateLimit.RateLimitException("No player api available!")
+
+    pending: set[asyncio.Task] = set()
+    last_provider = None
+    launched_at = 0.0
+    last_ex = None
+
+    def launch():
+        nonlocal last_provider, launched_at
+        last_provider = providers.pop(0)
+        launched_at = time.perf_counter()
+        pending.add(asyncio.create_task(last_provider.get_player(uuid, username)))
+
+    launch()
+    try:
+        while pending:
+            timeout = None
+            if providers and providers[0].can_hedge():
+                # Hedge once the last request is running for longer than the hedge delay
+                timeout = max(launched_at + last_provider.hedge_delay() - time.perf_counter(), 0)
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                launch()
+                continue
+
+            for task in done:
+                pending.discard(task)
+                if task.exception() is None:
+                    if task.result() is not None:
+                        return task.result()
+                else:
+                    last_ex = task.exception()
+                    if providers:
+                        launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if last_ex is not None:
+        raise last_ex
+
+    negativeCache.add(kind, key)
+    return None
+
+
 async def get_players(usernames: list[str]) -> dict[str, MinecraftPlayer]:
     """
     Get the minecraft uuids of up to 10 users via the usernames.
@@ -83,15 +246,80 @@ async def get_players(usernames: list[str]) -> dict[str, MinecraftPlayer]:
     if len(usernames) > 10:
         raise TypeError("usernames list can't contain more than 10 items!")
 
-    json = '[' + ','.join([f'"{name}"' for name in usernames]) + ']'
-
     session = sessionManager.get_session(_mc_services_api_session_id)
-    with _mc_services_rate_limit:
-        async with session.post(f"/minecraft/profile/lookup/bulk/byname", json=json) as resp:
+
+    async def request() -> dict[str, MinecraftPlayer]:
+        async with session.post(f"/minecraft/profile/lookup/bulk/byname", json=usernames) as resp:
             resp.raise_for_status()
 
             return {player["name"]: MinecraftPlayer(player["id"], player["name"]) for player in await resp.json()}
 
+    return await _lookup_policy.call("api.minecraftservices.com", request, _mc_services_rate_limit)
+
+
+# Time in seconds to collect name lookups before they are sent as bulk requests
+BATCH_WINDOW = 0.05
+_BATCH_SIZE = 10
+
+_pending_names: dict[str, asyncio.Future] = {}
+_batch_tasks: set[asyncio.Task] = set()
+
+
+async def _resolve_batch(futures: dict[str, asyncio.Future]):
+    try:
+        players = await get_players(list(futures.keys()))
+    except Exception as ex:
+        for fut in futures.values():
+            if not fut.done():
+                fut.set_exception(ex)
+        return
+
+    # The api returns the names with their actual capitalization
+    players = {name.lower(): p for name, p in players.items()}
+    for name, fut in futures.items():
+        if name not in players:
+            negativeCache.add(negativeCache.MINECRAFT_NAME, name)
+        if not fut.done():
+            fut.set_result(players.get(name))
+
+
+async def _flush_pending_names():
+    await asyncio.sleep(BATCH_WINDOW)
+
+    pending = list(_pending_names.items())
+    _pending_names.clear()
+
+    await asyncio.gather(*(_resolve_batch(dict(pending[i:i + _BATCH_SIZE]))
+                           for i in range(0, len(pending), _BATCH_SIZE)))
+
+
+async def lookup_name(username: str) -> MinecraftPlayer | None:
+    """
+    Get a player via their username using the bulk lookup endpoint. Lookups made within a short time window are
+    collected and resolved with as few bulk requests as possible. Concurrent lookups of the same name share a request.
+    Names that weren't found are remembered for a while (see negativeCache).
+    May raise a RatelimitException, CircuitOpenException or ClientResponseError.
+
+    :return: A player object if the player exists otherwise None.
+    """
+    if negativeCache.contains(negativeCache.MINECRAFT_NAME, username):
+        return None
+
+    name = username.lower()
+    fut = _pending_names.get(name)
+    if fut is None:
+        if len(_pending_names) == 0:
+            # First lookup of the window
+            task = asyncio.create_task(_flush_pending_names())
+            _batch_tasks.add(task)
+            task.add_done_callback(_batch_tasks.discard)
+
+        fut = asyncio.get_running_loop().create_future()
+        _pending_names[name] = fut
+
+    # Shield the shared future so a cancelled caller doesn't cancel the lookup for the others
+    return await asyncio.shield(fut)
+
 
 def uuid_to_avatar_url(uuid: str) -> str:
     """
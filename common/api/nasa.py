@@ -2,11 +2,14 @@ import os
 from dataclasses import dataclass
 
 import common.utils.misc
-from . import sessionManager, rateLimit
+from . import sessionManager, rateLimit, retryPolicy
 
 _nasa_rate_limit = rateLimit.RateLimit(1000, 60)
 
-_nasa_api_session_id = sessionManager.register_session("https://api.nasa.gov")
+_nasa_api_session_id = sessionManager.register_session(
+    "https://api.nasa.gov",
+    sessionManager.PoolProfile(limit=4, keepalive_timeout=60, total_timeout=10)
+)
 
 
 @dataclass(frozen=True)
@@ -26,11 +29,10 @@ async def get_random_apod() -> APOD:
     :return: The URL of the image.
     """
     session = sessionManager.get_session(_nasa_api_session_id)
-    with _nasa_rate_limit:
+
+    async def request() -> APOD:
         async with session.get("/planetary/apod",
-                               params={"api_key": os.getenv('NASA_API_KEY'), "count": 1},
-                               timeout=10
-                               ) as resp:
+                               params={"api_key": os.getenv('NASA_API_KEY'), "count": 1}) as resp:
             resp.raise_for_status()
 
             json = await resp.json()
@@ -43,3 +45,5 @@ async def get_random_apod() -> APOD:
                     c = c[1:]
                 json["copyright"] = c
             return common.utils.misc.dataclass_from_dict(APOD, json)
+
+    return await retryPolicy.DEFAULT_POLICY.call("api.nasa.gov", request, _nasa_rate_limit)
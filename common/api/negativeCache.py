@@ -0,0 +1,125 @@
+import collections
+import time
+from dataclasses import dataclass
+
+# Kinds of failed lookups and the time in seconds they are remembered for
+MINECRAFT_NAME = "minecraft name"
+MINECRAFT_UUID = "minecraft uuid"
+WYNNCRAFT_PLAYER = "wynncraft player"
+WYNNCRAFT_CHARACTER = "wynncraft character"
+WYNNCRAFT_GUILD = "wynncraft guild"
+WYNNCRAFT_GUILD_TAG = "wynncraft guild tag"
+
+TTLS = {
+    MINECRAFT_NAME: 1800,
+    MINECRAFT_UUID: 3600,
+    WYNNCRAFT_PLAYER: 600,
+    WYNNCRAFT_CHARACTER: 600,
+    WYNNCRAFT_GUILD: 600,
+    WYNNCRAFT_GUILD_TAG: 600,
+}
+# Kinds whose keys keep their case, e.g. guild tags are only unique with their capitalization
+CASE_SENSITIVE = frozenset({WYNNCRAFT_GUILD_TAG})
+
+
+@dataclass(frozen=True)
+class KindStats:
+    kind: str
+    size: int
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class NegativeCache:
+    def __init__(self, ttls: dict[str, float], maxsize: int = 10000, case_sensitive: frozenset[str] = frozenset()):
+        """
+        Remembers lookups that didn't find anything (e.g. unknown players) so they aren't repeated until their TTL
+        expires. Keys are case-insensitive unless their kind is case-sensitive. If the cache is full the oldest entries
+        are evicted first.
+
+        :param ttls: The kinds of lookups mapped to the time in seconds their failures are cached for.
+        :param maxsize: The maximum amount of entries over all kinds.
+        :param case_sensitive: The kinds whose keys keep their case.
+        """
+        self._ttls = ttls
+        self._maxsize = maxsize
+        self._case_sensitive = case_sensitive
+        self._entries: collections.OrderedDict[tuple[str, str], float] = collections.OrderedDict()
+        self._hits = collections.Counter()
+        self._misses = collections.Counter()
+
+    def _key(self, kind: str, key: str) -> tuple[str, str]:
+        return kind, key if kind in self._case_sensitive else key.lower()
+
+    def contains(self, kind: str, key: str) -> bool:
+        """
+        Check whether a lookup is known to fail.
+        """
+        k = self._key(kind, key)
+        expiry = self._entries.get(k)
+        if expiry is not None:
+            if expiry > time.monotonic():
+                self._hits[kind] += 1
+                return True
+            del self._entries[k]
+
+        self._misses[kind] += 1
+        return False
+
+    def add(self, kind: str, key: str):
+        """
+        Remember a failed lookup.
+        """
+        k = self._key(kind, key)
+        self._entries[k] = time.monotonic() + self._ttls[kind]
+        self._entries.move_to_end(k)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, kind: str, key: str):
+        """
+        Forget a failed lookup, e.g. because the name got taken.
+        """
+        self._entries.pop(self._key(kind, key), None)
+
+    def clear(self):
+        self._entries.clear()
+        self._hits.clear()
+        self._misses.clear()
+
+    def stats(self) -> list[KindStats]:
+        sizes = collections.Counter(kind for kind, _ in self._entries)
+        return [KindStats(kind, sizes[kind], self._hits[kind], self._misses[kind]) for kind in self._ttls]
+
+
+_cache = NegativeCache(TTLS, case_sensitive=CASE_SENSITIVE)
+
+
+def contains(kind: str, key: str) -> bool:
+    """
+    Check whether a lookup of the kind is known to fail.
+    """
+    return _cache.contains(kind, key)
+
+
+def add(kind: str, key: str):
+    """
+    Remember a failed lookup of the kind.
+    """
+    _cache.add(kind, key)
+
+
+def discard(kind: str, key: str):
+    _cache.discard(kind, key)
+
+
+def get_stats() -> list[KindStats]:
+    """
+    Get the size and hit rate of each kind of failed lookup.
+    """
+    return _cache.stats()
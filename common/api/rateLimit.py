@@ -29,6 +29,18 @@ class RateLimit:
         :raises RateLimitException: If the rate limit was exceeded.
          Also catches NonSuccessExceptions and checks for TOO_MANY_REQUESTS code and sets the rate limit to full if so.
         """
+        self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is ClientResponseError and exc_val.status == HTTPStatus.TOO_MANY_REQUESTS:
+            raise self.server_limited()
+
+    def acquire(self):
+        """
+        Count a call.
+
+        :raises RateLimitException: If the rate limit was exceeded.
+        """
         with self._lock:
             if self.calculate_remaining_calls() <= 0:
                 raise RateLimitException(f"Rate limit of {self._max_calls} requests per {self._period}min reached!")
@@ -36,13 +48,17 @@ class RateLimit:
             curr_time = time.time()
             self._calls.append(curr_time)
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    def server_limited(self) -> RateLimitException:
+        """
+        Set the rate limit to full after the server responded with TOO_MANY_REQUESTS.
+
+        :return: The exception to raise.
+        """
         with self._lock:
-            if exc_type is ClientResponseError and exc_val.status == HTTPStatus.TOO_MANY_REQUESTS:
-                usage = self.calculate_usage()
-                self._set_full()
-                raise RateLimitException(
-                    f"Rate limited by server! (Request amount: {usage}/{self._max_calls} per {self._period}min)")
+            usage = self.calculate_usage()
+            self._set_full()
+            return RateLimitException(
+                f"Rate limited by server! (Request amount: {usage}/{self._max_calls} per {self._period}min)")
 
     def _clear_expired_calls(self):
         curr_time = time.time()
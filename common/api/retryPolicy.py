@@ -0,0 +1,244 @@
+import asyncio
+import email.utils
+import random
+import time
+from http import HTTPStatus
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+
+from common.api.rateLimit import RateLimit, RateLimitException
+
+T = TypeVar("T")
+
+# Responses with these statuses are considered transient and the request is retried.
+RETRY_STATUSES = frozenset({
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+    520, 521, 522, 523, 524,  # Cloudflare origin errors
+})
+
+
+class CircuitOpenException(aiohttp.ClientError):
+    def __init__(self, host: str, retry_after: float):
+        """
+        Raised instead of sending a request while the circuit breaker of the host is open.
+
+        :param host: The host that is considered down.
+        :param retry_after: The time in seconds until the next request to the host is allowed.
+        """
+        super().__init__(f"Circuit breaker for {host} is open (retry in {retry_after:.0f}s).")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Tracks consecutive failures of a host. Once failure_threshold requests failed in a row the circuit opens and
+        requests fail fast for reset_timeout seconds. After that a single trial request is let through which either
+        closes the circuit again or reopens it.
+
+        :param host: The host this breaker belongs to.
+        :param failure_threshold: The amount of consecutive failures after which the circuit opens.
+        :param reset_timeout: The time in seconds to wait before sending a trial request.
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    @property
+    def retry_after(self) -> float:
+        """
+        The time in seconds until the circuit allows requests again.
+        """
+        if self.failures < self.failure_threshold:
+            return 0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0)
+
+    def before_request(self):
+        """
+        :raises CircuitOpenException: If the circuit is open or a trial request is already running.
+        """
+        match self.state:
+            case self.OPEN:
+                raise CircuitOpenException(self.host, self.retry_after)
+            case self.HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenException(self.host, self.reset_timeout)
+                self._trial_running = True
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_running = False
+
+    def record_cancelled(self):
+        self._trial_running = False
+
+    def record_failure(self):
+        self._trial_running = False
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.failures == self.failure_threshold:
+                self.times_opened += 1
+            self._opened_at = time.monotonic()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker of a host. Breakers are shared by all clients requesting the same host.
+    """
+    if host not in _breakers:
+        _breakers[host] = CircuitBreaker(host)
+    return _breakers[host]
+
+
+def get_all_breakers() -> list[CircuitBreaker]:
+    return list(_breakers.values())
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse the value of a Retry-After header.
+
+    :return: The time to wait in seconds or None if the value couldn't be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_transient(ex: Exception, retry_statuses: frozenset[int]) -> bool:
+    if isinstance(ex, CircuitOpenException):
+        return False
+    if isinstance(ex, aiohttp.ClientResponseError):
+        return ex.status in retry_statuses
+    return isinstance(ex, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+def _retry_after(ex: Exception, headers: tuple[str, ...]) -> float | None:
+    if isinstance(ex, aiohttp.ClientResponseError) and ex.headers is not None:
+        for header in headers:
+            delay = parse_retry_after(ex.headers.get(header))
+            if delay is not None:
+                return delay
+    return None
+
+
+class RetryPolicy:
+    def __init__(self, max_tries: int = 3, base_delay: float = 0.5, max_delay: float = 10,
+                 max_retry_after: float = 30, retry_statuses: frozenset[int] = RETRY_STATUSES,
+                 retry_after_headers: tuple[str, ...] = ("Retry-After",)):
+        """
+        Retries transient request failures with exponential backoff and full jitter and reports the outcome of every
+        request to the circuit breaker of the host.
+
+        :param max_tries: The maximum amount of attempts of a request.
+        :param base_delay: The backoff of the first retry in seconds. The backoff doubles on every retry.
+        :param max_delay: The upper bound of the backoff in seconds.
+        :param max_retry_after: The longest Retry-After in seconds that is waited for. Requests with a longer
+         Retry-After aren't retried.
+        :param retry_statuses: The response statuses to retry on.
+        :param retry_after_headers: The headers holding the time to wait before retrying, the first one present is
+         used. The wynncraft API sends ratelimit-reset instead of Retry-After.
+        """
+        self.max_tries = max_tries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+        self.retry_after_headers = retry_after_headers
+
+    def backoff(self, attempt: int) -> float:
+        """
+        :param attempt: The number of the failed attempt starting at 0.
+        :return: A random delay between 0 and the exponential backoff of the attempt.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(self, host: str, request: Callable[[], Awaitable[T]], rate_limit: RateLimit = None) -> T:
+        """
+        Run the request, retrying it on transient failures. Responses with a status that isn't retried (e.g. 404)
+        count as a successful contact with the host.
+
+        :param host: The host that is requested. Used to select the circuit breaker.
+        :param request: A coroutine function that sends the request and raises on failure.
+        :param rate_limit: The rate limit of the host. Every attempt counts as a call. If the host still responds with
+         TOO_MANY_REQUESTS after the last attempt the rate limit is set to full.
+        :return: The result of the request.
+        :raises CircuitOpenException: If the host is considered down.
+        :raises RateLimitException: If the rate limit was exceeded.
+        """
+        breaker = get_breaker(host)
+        attempt = 0
+        while True:
+            breaker.before_request()
+            if rate_limit is not None:
+                try:
+                    rate_limit.acquire()
+                except RateLimitException:
+                    breaker.record_cancelled()
+                    raise
+            try:
+                res = await request()
+            except asyncio.CancelledError:
+                breaker.record_cancelled()
+                raise
+            except Exception as ex:
+                if not _is_transient(ex, self.retry_statuses):
+                    breaker.record_success()
+                    raise ex
+
+                if isinstance(ex, aiohttp.ClientResponseError) and ex.status == HTTPStatus.TOO_MANY_REQUESTS:
+                    # The host is up, it just wants us to slow down
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+
+                attempt += 1
+                delay = _retry_after(ex, self.retry_after_headers)
+                if delay is None:
+                    delay = self.backoff(attempt - 1)
+                if attempt >= self.max_tries or delay > self.max_retry_after:
+                    if rate_limit is not None and isinstance(ex, aiohttp.ClientResponseError) \
+                            and ex.status == HTTPStatus.TOO_MANY_REQUESTS:
+                        raise rate_limit.server_limited() from ex
+                    raise ex
+
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            return res
+
+
+DEFAULT_POLICY = RetryPolicy()
@@ -1,21 +1,201 @@
+import asyncio
+import bisect
+import os
+from dataclasses import dataclass
+
 import aiohttp
 from aiohttp import ClientSession
 from yarl import URL
 
+from common.api import apiRecorder
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    """
+    Connection pool and timeout settings of a client session. Timeouts are in seconds, None disables the timeout.
+    """
+    limit: int = 100  # Max amount of simultaneous connections
+    limit_per_host: int = 0  # Max amount of simultaneous connections to the same host (0 for no limit)
+    keepalive_timeout: float = 15  # Time to keep idle connections open for reuse
+    dns_cache_ttl: int | None = 300  # Time to cache resolved DNS entries (None caches forever)
+    total_timeout: float | None = 300
+    connect_timeout: float | None = None
+    read_timeout: float | None = None
+
+
+DEFAULT_PROFILE = PoolProfile()
+
+# Upper bounds of the request latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+
+
+class SessionStats:
+    def __init__(self, name: str):
+        """
+        Request statistics of a client session.
+
+        :param name: The name of the session (usually the base url).
+        """
+        self.name = name
+        self.requests = 0
+        self.failed_requests = 0
+        self.in_flight = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.latency_histogram = [0] * len(LATENCY_BUCKETS)
+        self._latency_sum = 0.0
+        self._transports: set[asyncio.BaseTransport] = set()
+
+    def _observe(self, latency: float):
+        self.requests += 1
+        self._latency_sum += latency
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    @property
+    def open_connections(self) -> int:
+        """
+        The amount of open connections of the session (idle and in use).
+        """
+        self._transports = {t for t in self._transports if not t.is_closing()}
+        return len(self._transports)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """
+        The share of requests that reused an already open connection.
+        """
+        total = self.new_connections + self.reused_connections
+        return self.reused_connections / total if total > 0 else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self._latency_sum / self.requests if self.requests > 0 else 0.0
+
+    def latency_percentile(self, p: float) -> float:
+        """
+        Estimate a latency percentile from the histogram.
+
+        :param p: The percentile in the range [0, 1].
+        :return: The upper bound of the bucket containing the percentile.
+        """
+        if self.requests == 0:
+            return 0.0
+        target = p * self.requests
+        count = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.latency_histogram):
+            count += n
+            if count >= target:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+
 _sessions: dict[int, ClientSession] = {}
 _session_urls: dict[int, str | URL | None] = {}
+_session_profiles: dict[int, PoolProfile] = {}
+_session_stats: dict[int, SessionStats] = {}
 _initialized = False
 _next_id = 0
 
 
-def register_session(base_url: str | URL = None) -> int:
+def _create_trace_config(stats: SessionStats) -> aiohttp.TraceConfig:
+    async def on_request_start(session, ctx, params):
+        ctx.start = asyncio.get_running_loop().time()
+        stats.in_flight += 1
+
+    async def on_request_end(session, ctx, params):
+        stats.in_flight -= 1
+        stats._observe(asyncio.get_running_loop().time() - ctx.start)
+
+    async def on_request_exception(session, ctx, params):
+        stats.in_flight -= 1
+        stats.failed_requests += 1
+
+    async def on_connection_create_end(session, ctx, params):
+        stats.new_connections += 1
+
+    async def on_connection_reuseconn(session, ctx, params):
+        stats.reused_connections += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
+def _base_url(session_id: int) -> str | URL | None:
+    """
+    If the API_OVERRIDE_URL env variable is set, all sessions with a base url send their requests there instead, e.g.
+    to the local stand-in server (python -m benchmarks.apiServer).
+    """
+    base_url = _session_urls[session_id]
+    override = os.getenv("API_OVERRIDE_URL")
+    return override if override and base_url is not None else base_url
+
+
+class _TrackingConnector(aiohttp.TCPConnector):
+    def __init__(self, stats: SessionStats, **kwargs):
+        """
+        A TCPConnector that passes the transport of every connection it hands out to the session stats, so the open
+        connections can be counted without reading the connector internals (the trace events don't carry the
+        connection).
+        """
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def connect(self, req, traces, timeout) -> aiohttp.connector.Connection:
+        conn = await super().connect(req, traces, timeout)
+        if conn.transport is not None:
+            self._stats._transports.add(conn.transport)
+        return conn
+
+
+def _create_session(session_id: int) -> ClientSession:
+    profile = _session_profiles[session_id]
+    stats = _session_stats[session_id]
+
+    connector = _TrackingConnector(
+        stats,
+        limit=profile.limit,
+        limit_per_host=profile.limit_per_host,
+        keepalive_timeout=profile.keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=profile.dns_cache_ttl,
+    )
+
+    return aiohttp.ClientSession(
+        _base_url(session_id),
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=profile.total_timeout,
+            connect=profile.connect_timeout,
+            sock_read=profile.read_timeout
+        ),
+        trace_configs=[_create_trace_config(stats)],
+        response_class=apiRecorder.RecordingResponse if apiRecorder.is_recording() else aiohttp.ClientResponse,
+    )
+
+
+def register_session(base_url: str | URL = None, profile: PoolProfile = DEFAULT_PROFILE) -> int:
+    """
+    Register a client session. The session is created once init_sessions is called.
+
+    :param base_url: The base url of all requests made with the session.
+    :param profile: The connection pool settings of the session.
+    :return: The ID of the session.
+    """
     global _next_id
     curr_id = _next_id
     _next_id += 1
 
     _session_urls[curr_id] = base_url
+    _session_profiles[curr_id] = profile
+    _session_stats[curr_id] = SessionStats(str(base_url))
     if _initialized:
-        _sessions[curr_id] = aiohttp.ClientSession(base_url)
+        _sessions[curr_id] = _create_session(curr_id)
 
     return curr_id
 
@@ -30,19 +210,43 @@ def get_session(session_id: int) -> ClientSession:
     return _sessions[session_id]
 
 
+def get_stats(session_id: int) -> SessionStats:
+    """
+    Get the request statistics of a session.
+    """
+    if session_id not in _session_stats:
+        raise ValueError(f"There is no session with ID {session_id}.")
+
+    return _session_stats[session_id]
+
+
+def get_all_stats() -> list[SessionStats]:
+    """
+    Get the request statistics of all registered sessions.
+    """
+    return list(_session_stats.values())
+
+
 async def init_sessions():
     global _initialized
     if _initialized:
         raise RuntimeWarning("init_sessions() should only be called once")
     _initialized = True
 
-    for s_id, url in _session_urls.items():
-        _sessions[s_id] = aiohttp.ClientSession(url)
+    # Record all responses for replaying them later (python -m benchmarks.replayServer)
+    record_file = os.getenv("API_RECORD_FILE")
+    if record_file:
+        apiRecorder.start(record_file)
+
+    for s_id in _session_urls:
+        _sessions[s_id] = _create_session(s_id)
 
 
 async def close():
     for session in _sessions.values():
         await session.close()
+    _sessions.clear()
+    apiRecorder.stop()
 
     global _initialized
     _initialized = False
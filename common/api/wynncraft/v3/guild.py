@@ -1,11 +1,13 @@
 import aiohttp
 from async_lru import alru_cache
 
+from common.api import negativeCache
 from common.api.wynncraft.v3 import session
 from common.types.wynncraft import GuildStats, Territory, WynncraftGuild
+from common.utils import cache
 
 
-@alru_cache(maxsize=None, ttl=600)
+@cache.cached(ttl=600, maxsize=500, max_bytes=32 * 2 ** 20)
 async def stats(*, name: str = None, tag: str = None) -> GuildStats:
     """
     Get guild stats by either the tag or name. Exactly one of the arguments must be provided.
@@ -13,32 +15,89 @@ async def stats(*, name: str = None, tag: str = None) -> GuildStats:
     :param name: The name of the guild.
     :param tag: The tag of the guild.
     :returns: A :obj:`GuildStats` object.
+    :raises UnknownGuildException: if the guild wasn't found.
+    """
+    return await fetch_stats(name=name, tag=tag)
+
+
+async def fetch_stats(*, name: str = None, tag: str = None) -> GuildStats:
+    """
+    Request guild stats like stats, but the result is not cached. Used to crawl guilds without evicting the cached
+    guilds of commands.
+
     :raises UnknownGuildException: if the guild wasn't found.
     """
     if (name is None) and (tag is not None):
         guild_url = f"/guild/prefix/{tag}"
+        # Tags are only unique with their capitalization
+        kind = negativeCache.WYNNCRAFT_GUILD_TAG
     elif (name is not None) and (tag is None):
         guild_url = f"/guild/{name}"
+        kind = negativeCache.WYNNCRAFT_GUILD
     else:
         raise TypeError("Exactly one argument (either name or tag) must be provided.")
 
+    if negativeCache.contains(kind, guild_url):
+        raise UnknownGuildException(f'Guild with {f"name={name}" if tag is None else f"tag={tag}"} not found.')
+
     try:
         data = await session.get(guild_url, identifier='uuid')
         return GuildStats.from_json(data)
     except aiohttp.ClientResponseError as e:
         if e.status == 404:
+            negativeCache.add(kind, guild_url)
             raise UnknownGuildException(f'Guild with {f"name={name}" if tag is None else f"tag={tag}"} not found.')
         raise e
 
 
+class GuildDirectory:
+    def __init__(self, guilds: list[WynncraftGuild]):
+        """
+        All wynncraft guilds indexed by their lowercase name and tag.
+        """
+        self.guilds = guilds
+        self._by_name: dict[str, WynncraftGuild] = {}
+        self._by_tag: dict[str, list[WynncraftGuild]] = {}
+        for g in guilds:
+            self._by_name[g.name.lower()] = g
+            self._by_tag.setdefault(g.tag.lower(), []).append(g)
+
+    def get_by_name(self, name: str) -> WynncraftGuild | None:
+        return self._by_name.get(name.lower())
+
+    def get_by_tag(self, tag: str) -> list[WynncraftGuild]:
+        """
+        Tags are only unique with their capitalization, so multiple guilds may match.
+        """
+        return self._by_tag.get(tag.lower(), [])
+
+    def find(self, s: str) -> tuple[WynncraftGuild]:
+        """
+        Returns any guilds whose tag or name matches the provided string (case-insensitive).
+        """
+        by_name = self.get_by_name(s)
+        by_tag = self.get_by_tag(s)
+        if by_name is None:
+            return tuple(by_tag)
+        return (by_name,) + tuple(g for g in by_tag if g is not by_name)
+
+
 @alru_cache(ttl=3600)
-async def list_guilds() -> list[WynncraftGuild]:
+async def directory() -> GuildDirectory:
     """
-    Request a list of all wynncraft guilds.
+    Request a list of all wynncraft guilds and index them.
     """
     data: dict = await session.get("/guild/list/guild")
 
-    return [WynncraftGuild(name, g['prefix']) for name, g in data.items() if name != "" and g['prefix'] is not None]
+    return GuildDirectory(
+        [WynncraftGuild(name, g['prefix']) for name, g in data.items() if name != "" and g['prefix'] is not None])
+
+
+async def list_guilds() -> list[WynncraftGuild]:
+    """
+    Request a list of all wynncraft guilds.
+    """
+    return (await directory()).guilds
 
 
 @alru_cache(ttl=10)
@@ -51,20 +110,13 @@ async def list_territories() -> dict[str, Territory]:
     return {k: Territory.from_json(v) for k, v in data.items()}
 
 
-def _match(g, s):
-    return g.name.lower() == s or g.tag.lower() == s
-
-
-@alru_cache(ttl=60)
 async def find(s: str) -> tuple[WynncraftGuild]:
     """
     Returns any guilds whose tag or name matches the provided string (case-insensitive).
 
     :return: A tuple of guilds.
     """
-    s = s.lower()
-    guilds: list[WynncraftGuild] = await list_guilds()
-    return tuple(g for g in guilds if _match(g, s))
+    return (await directory()).find(s)
 
 
 class UnknownGuildException(Exception):
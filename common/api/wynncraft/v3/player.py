@@ -1,12 +1,14 @@
-import time
+from datetime import datetime
 
 import aiohttp.client_exceptions
 from async_lru import alru_cache
 
 import common.utils.misc
+from common.api import negativeCache
 from common.api.wynncraft.v3 import session
 from common.types.enums import PlayerIdentifier
-from common.types.wynncraft import PlayerStats, CharacterShort, AbilityNode
+from common.types.wynncraft import PlayerStats, CharacterShort, AbilityNode, TrackedPlayerStats
+from common.utils import cache
 
 
 class UnknownPlayerException(Exception):
@@ -17,30 +19,54 @@ class HiddenProfileException(Exception):
     pass
 
 
-@alru_cache(maxsize=None, ttl=120)
+async def _get_player_json(uuid: str, url: str, **params: str) -> dict:
+    uuid = common.utils.misc.format_uuid(uuid, dashed=True)
+    if negativeCache.contains(negativeCache.WYNNCRAFT_PLAYER, uuid):
+        raise UnknownPlayerException(f'Player {uuid} not found.')
+
+    try:
+        return await session.get(f"/player/{uuid}{url}", **params)
+    except aiohttp.client_exceptions.ClientResponseError as ex:
+        if ex.status == 404:
+            negativeCache.add(negativeCache.WYNNCRAFT_PLAYER, uuid)
+            raise UnknownPlayerException(f'Player {uuid} not found.')
+        else:
+            raise ex
+
+
+async def _get_stats_json(uuid: str, full_result: bool) -> dict:
+    return await _get_player_json(uuid, "", fullResult=str(full_result))
+
+
+@cache.cached(ttl=120, maxsize=2000, max_bytes=32 * 2 ** 20,
+              fallback_keys=lambda args: [] if args["full_result"] else [{**args, "full_result": True}])
 async def stats(uuid: str, full_result: bool = False) -> PlayerStats:
     """
     Request public statistical information about a player.
     :param uuid: The uuid of the player to retrieve the stats of.
-    :param full_result: If True, the character list is included in the result.
+    :param full_result: If True, the character list is included in the result. A cached full result is also returned
+     if full_result is False.
     :returns: A Stats object.
     :raises ValueError: if the uuid is not in a valid format.
     :raises UnknownPlayerException: if the player wasn't found.
     """
-    uuid = common.utils.misc.format_uuid(uuid, dashed=True)
+    return PlayerStats.from_json(await _get_stats_json(uuid, full_result))
 
-    try:
-        data = await session.get(f"/player/{uuid}", fullResult=str(full_result))
-    except aiohttp.client_exceptions.ClientResponseError as ex:
-        if ex.status == 404:
-            raise UnknownPlayerException(f'Player {uuid} not found.')
-        else:
-            raise ex
 
-    return PlayerStats.from_json(data)
+async def tracked_stats(uuid: str) -> TrackedPlayerStats:
+    """
+    Request the stats of a player that are stored by the stat tracker. The response is projected directly onto the
+    tracked columns instead of being decoded into a full PlayerStats object. The result is not cached.
+    :param uuid: The uuid of the player to retrieve the stats of.
+    :returns: A TrackedPlayerStats object with the current time as record time.
+    :raises ValueError: if the uuid is not in a valid format.
+    :raises UnknownPlayerException: if the player wasn't found.
+    """
+    data = await _get_stats_json(uuid, False)
+    return TrackedPlayerStats.from_stats_json(data, datetime.utcnow())
 
 
-@alru_cache(maxsize=None, ttl=120)
+@cache.cached(ttl=120, maxsize=1000, max_bytes=8 * 2 ** 20)
 async def characters(uuid: str) -> dict[str, CharacterShort]:
     """
     Request a list of short info on a players characters.
@@ -49,20 +75,11 @@ async def characters(uuid: str) -> dict[str, CharacterShort]:
     :raises ValueError: if the uuid is not in a valid format.
     :raises UnknownPlayerException: if the player wasn't found.
     """
-    uuid = common.utils.misc.format_uuid(uuid, dashed=True)
-
-    try:
-        data = await session.get(f"/player/{uuid}/characters")
-    except aiohttp.client_exceptions.ClientResponseError as ex:
-        if ex.status == 404:
-            raise UnknownPlayerException(f'Player {uuid} not found.')
-        else:
-            raise ex
-
+    data = await _get_player_json(uuid, "/characters")
     return {uuid: CharacterShort.from_json(data) for uuid, data in data.items()}
 
 
-@alru_cache(maxsize=None, ttl=600)
+@cache.cached(ttl=600, maxsize=500, max_bytes=32 * 2 ** 20)
 async def abilities(player_uuid: str, character_uuid: str) -> list[AbilityNode]:
     """
     Request the ability map of the specified character.
@@ -74,10 +91,15 @@ async def abilities(player_uuid: str, character_uuid: str) -> list[AbilityNode]:
     :raises HiddenProfileException: if the player has chosen to hide their profile.
     """
     player_uuid = common.utils.misc.format_uuid(player_uuid, dashed=True)
+    character_key = f"{player_uuid}/{character_uuid}"
+    if negativeCache.contains(negativeCache.WYNNCRAFT_CHARACTER, character_key):
+        raise UnknownPlayerException(f'Player {player_uuid} or character with uuid {character_uuid} not found.')
+
     try:
         data = await session.get(f"/player/{player_uuid}/characters/{character_uuid}/abilities")
     except aiohttp.client_exceptions.ClientResponseError as ex:
         if ex.status == 400 or ex.status == 404:
+            negativeCache.add(negativeCache.WYNNCRAFT_CHARACTER, character_key)
             raise UnknownPlayerException(f'Player {player_uuid} or character with uuid {character_uuid} not found.')
         elif ex.status == 403:
             raise HiddenProfileException(f'{player_uuid} has hidden their profile.')
@@ -89,14 +111,7 @@ async def abilities(player_uuid: str, character_uuid: str) -> list[AbilityNode]:
 
 @alru_cache(ttl=30)
 async def _online_players(identifier: PlayerIdentifier = PlayerIdentifier.USERNAME) -> dict:
-    try:
-        return await session.get(f"/player", identifier=identifier)
-    except aiohttp.client_exceptions.ClientResponseError as ex:
-        if ex.status == 524:
-            time.sleep(1)
-            return await session.get(f"/player", identifier=identifier)
-        else:
-            raise ex
+    return await session.get(f"/player", identifier=identifier)
 
 
 async def player_list(identifier: PlayerIdentifier = PlayerIdentifier.USERNAME) -> dict[str, str]:
@@ -2,10 +2,17 @@ import time
 
 from common.api.rateLimit import RateLimit
 from common.types.jsonable import JsonType
-from common.api import sessionManager, reservableRateLimit
+from common.api import sessionManager, reservableRateLimit, retryPolicy
 
 _rate_limit = reservableRateLimit.ReservableRateLimit(120, 1)
-_v3_session_id = sessionManager.register_session("https://api.wynncraft.com")
+# Most workers query the wynncraft API, so allow enough parallel connections for them and keep those alive
+# between worker loop iterations. Full player stats can be large so the read timeout is generous.
+_v3_session_id = sessionManager.register_session(
+    "https://api.wynncraft.com",
+    sessionManager.PoolProfile(limit=32, limit_per_host=32, keepalive_timeout=60, total_timeout=60,
+                               connect_timeout=5, read_timeout=30)
+)
+_policy = retryPolicy.RetryPolicy(max_tries=3, base_delay=1, retry_after_headers=("Retry-After", "ratelimit-reset"))
 _rl_reset = 0
 _last_req_time = 0
 
@@ -13,22 +20,26 @@ _last_req_time = 0
 async def get(url: str, **params: str) -> JsonType:
     """
     Send a GET request to the wynncraft API V3. This has a ratelimit of 180 requests per minute.
+    Transient errors (e.g. 5xx or timeouts) are retried with backoff.
     :param url: The url of the request. Must start with '/'.
     :param params: Additional request parameters.
     :return: the response in json format.
     """
-    with _rate_limit:
-        session = sessionManager.get_session(_v3_session_id)
-        async with session.get(f"/v3{url}", params=params, raise_for_status=True) as resp:
-            global _rl_reset, _last_req_time
-            _last_req_time = time.time()
-            _rl_reset = resp.headers.get("ratelimit-reset")
-            _rl_reset = int(_rl_reset) if _rl_reset else 0
-            remaining = resp.headers.get("x-ratelimit-remaining-minute")
-            remaining = int(remaining) if remaining else 0
-            _rate_limit.update_remaining(remaining)
+    return await _policy.call("api.wynncraft.com", lambda: _get(url, params), _rate_limit)
 
-            return await resp.json()
+
+async def _get(url: str, params: dict[str, str]) -> JsonType:
+    session = sessionManager.get_session(_v3_session_id)
+    async with session.get(f"/v3{url}", params=params, raise_for_status=True) as resp:
+        global _rl_reset, _last_req_time
+        _last_req_time = time.time()
+        _rl_reset = resp.headers.get("ratelimit-reset")
+        _rl_reset = int(_rl_reset) if _rl_reset else 0
+        remaining = resp.headers.get("x-ratelimit-remaining-minute")
+        remaining = int(remaining) if remaining else 0
+        _rate_limit.update_remaining(remaining)
+
+        return await resp.json()
 
 
 def reserve(amount: int) -> RateLimit:
@@ -40,6 +51,13 @@ def reserve(amount: int) -> RateLimit:
     return _rate_limit.reserve(amount)
 
 
+def get_rate_limit() -> RateLimit:
+    """
+    :return: The rate limit shared by all requests to the wynncraft API.
+    """
+    return _rate_limit
+
+
 def calculate_remaining_requests():
     return _rate_limit.calculate_remaining_calls()
 
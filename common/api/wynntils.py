@@ -2,11 +2,14 @@ from dataclasses import dataclass
 
 from async_lru import alru_cache
 
-from . import sessionManager, rateLimit
+from . import sessionManager, rateLimit, retryPolicy
 
 _athena_rate_limit = rateLimit.RateLimit(20, 1)
 
-_athena_api_session_id = sessionManager.register_session("https://athena.wynntils.com/")
+_athena_api_session_id = sessionManager.register_session(
+    "https://athena.wynntils.com/",
+    sessionManager.PoolProfile(limit=4, total_timeout=30, connect_timeout=5)
+)
 
 
 @dataclass(frozen=True)
@@ -19,7 +22,8 @@ class Guild:
 @alru_cache(ttl=600)
 async def get_guilds() -> list[Guild]:
     session = sessionManager.get_session(_athena_api_session_id)
-    with _athena_rate_limit:
+
+    async def request() -> list[Guild]:
         async with session.get("/cache/get/guildList") as resp:
             resp.raise_for_status()
 
@@ -27,12 +31,19 @@ async def get_guilds() -> list[Guild]:
 
             return [Guild(g["_id"], g["prefix"], g.get("color", None)) for g in json]
 
+    return await retryPolicy.DEFAULT_POLICY.call("athena.wynntils.com", request, _athena_rate_limit)
+
 
 @alru_cache(ttl=600)
+async def _guild_colors() -> dict[str, str]:
+    return {g.name.lower(): g.color for g in await get_guilds() if g.color}
+
+
 async def get_guild_color(name: str) -> str | None:
-    guilds = await get_guilds()
-    for g in guilds:
-        if g.name == name:
-            return g.color
+    """
+    Get the color wynntils uses for a guild.
 
-    return None
+    :param name: The name of the guild (case-insensitive).
+    :return: The color as hex string (e.g. '#ff00ff') or None if the guild has no color.
+    """
+    return (await _guild_colors()).get(name.lower())
@@ -2,6 +2,7 @@ import discord
 from discord import app_commands
 
 import common.logging
+import workers.eventBridge
 import workers.guildUpdater
 import workers.presenceUpdater
 from common.botConfig import BotConfig
@@ -80,7 +81,10 @@ class BotInstance(discord.Client):
 
             common.logging.info("Subscribing to workers...")
             workers.presenceUpdater.add_client(self)
-            workers.guildUpdater.add_guild(self.config.GUILD_NAME, self._guild_logger)
+            if workers.eventBridge.tracking_enabled():
+                workers.guildUpdater.add_guild(self.config.GUILD_NAME, self._guild_logger)
+            else:
+                workers.eventBridge.add_logger(self.config.GUILD_NAME, self._guild_logger)
 
             common.logging.info("Syncing commands...")
             await self.sync_commands()
@@ -120,5 +124,6 @@ class BotInstance(discord.Client):
     async def close(self) -> None:
         workers.presenceUpdater.remove_client(self)
         workers.guildUpdater.remove_guild(self.config.GUILD_NAME)
+        workers.eventBridge.remove_logger(self.config.GUILD_NAME)
 
         await super().close()
@@ -10,8 +10,8 @@ import common.api.wynncraft.v3.guild
 import common.api.wynncraft.v3.player
 import common.api.wynntils
 import common.botInstance
+import common.guildRosters
 import common.logging
-import common.storage.usernameData
 import common.types.wynncraft
 import common.utils.command
 import common.utils.misc
@@ -74,21 +74,14 @@ async def _create_guild_embed(guild: WynncraftGuild, color: int):
     embed.add_field(name="", value="⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯", inline=False)
 
     player_worlds = await common.api.wynncraft.v3.player.player_list(identifier=PlayerIdentifier.UUID)
-    online_players = {common.utils.misc.format_uuid(p.uuid): p for p in
-                      await common.storage.usernameData.get_players(uuids=list(player_worlds.keys()))}
-
-    online_members = [(f"{5 * _star}{online_players[uuid].name}", player_worlds[uuid])
-                      for uuid in guild_stats.members.owner.keys() if uuid in online_players] \
-                     + [(f"{4 * _star}{online_players[uuid].name}", player_worlds[uuid])
-                        for uuid in guild_stats.members.chief.keys() if uuid in online_players] \
-                     + [(f"{3 * _star}{online_players[uuid].name}", player_worlds[uuid])
-                        for uuid in guild_stats.members.strategist.keys() if uuid in online_players] \
-                     + [(f"{2 * _star}{online_players[uuid].name}", player_worlds[uuid])
-                        for uuid in guild_stats.members.captain.keys() if uuid in online_players] \
-                     + [(f"{1 * _star}{online_players[uuid].name}", player_worlds[uuid])
-                        for uuid in guild_stats.members.recruiter.keys() if uuid in online_players] \
-                     + [(f"{0 * _star}{online_players[uuid].name}", player_worlds[uuid])
-                        for uuid in guild_stats.members.recruit.keys() if uuid in online_players]
+    roster = common.guildRosters.from_stats(guild_stats)
+
+    online_members = []
+    for uuid, rank in roster.ranks.items():
+        world = player_worlds.get(common.utils.misc.format_uuid(uuid))
+        if world is not None:
+            stars = (len(common.guildRosters.RANKS) - 1 - common.guildRosters.RANKS.index(rank)) * _star
+            online_members.append((f"{stars}{roster.usernames[uuid]}", world))
 
     table_builder = tableBuilder.TableBuilder.from_str('l   r')
     [table_builder.add_row(*t) for t in online_members]
@@ -9,7 +9,6 @@ from discord.app_commands.models import Choice
 
 import common.utils.command
 import common.utils.misc
-import common.api.wynncraft.v3.guild
 import common.api.wynncraft.v3.player
 import common.api.wynncraft.v3.types
 import common.storage.playerTrackerData
@@ -70,21 +69,6 @@ async def _create_rel_warcount_embed(timeframe: common.utils.command.Timeframe,
     return await _create_warcount_embed(warcounts, t, timeframe, guild)
 
 
-async def _guild_autocomplete(
-        interaction: discord.Interaction,
-        current: str,
-) -> list[Choice[str]]:
-    if len(current) > 1:
-        if not common.utils.command.GUILD_RE.fullmatch(current):
-            return []
-        guilds = await common.api.wynncraft.v3.guild.list_guilds()
-        return [Choice(name=guild.name, value=guild.name) for guild in guilds
-                if current.lower() in guild.tag.lower()
-                or current.lower() in guild.name.lower()][0:25]
-
-    return []
-
-
 async def _date_autocomplete(
         interaction: discord.Interaction,
         current: str,
@@ -120,7 +104,7 @@ class WarcountCommand(hybridCommand.HybridCommand):
                     required=False,
                     default=None,
                     ptype=discord.AppCommandOptionType.string,
-                    autocomplete=_guild_autocomplete,
+                    autocomplete=common.utils.command.guild_autocomplete,
                 ),
                 hybridCommand.CommandParam(
                     "start", "[optional] start date.",
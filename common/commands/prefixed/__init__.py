@@ -1,5 +1,6 @@
 from .activityCommand import ActivityCommand
 from .configCommand import ConfigCommand
+from .debugCommand import DebugCommand
 from .evalCommand import EvalCommand
 from .playtimeCommand import PlaytimeCommand
 from .seenCommand import SeenCommand
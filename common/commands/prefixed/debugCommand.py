@@ -0,0 +1,172 @@
+from datetime import datetime
+
+from discord import Permissions, Embed
+
+from common.api import sessionManager, retryPolicy, negativeCache
+from common.commands import command
+from common.commands.commandEvent import PrefixedCommandEvent
+from common.utils import tableBuilder, cache
+from workers import eventBridge, loopStats, queueWorker
+
+
+def _sessions_embed(color: int) -> Embed:
+    tb = tableBuilder.TableBuilder.from_str('l  r  r  r  r  r  r')
+    tb.add_row("Session", "Reqs", "Errs", "Open", "Reuse", "Mean", "p95")
+    tb.add_seperator_row()
+    for stats in sessionManager.get_all_stats():
+        tb.add_row(
+            stats.name.removeprefix("https://").rstrip("/"),
+            stats.requests,
+            stats.failed_requests,
+            stats.open_connections,
+            f"{stats.reuse_ratio:.0%}",
+            f"{stats.mean_latency * 1000:.0f}ms",
+            f"≤{stats.latency_percentile(0.95) * 1000:.0f}ms",
+        )
+
+    return Embed(
+        title="HTTP Sessions",
+        description=f"```\n{tb.build()}\n```",
+        color=color
+    )
+
+
+def _circuits_embed(color: int) -> Embed:
+    tb = tableBuilder.TableBuilder.from_str('l  l  r  r  r')
+    tb.add_row("Host", "State", "Fails", "Opened", "Retry in")
+    tb.add_seperator_row()
+    for breaker in retryPolicy.get_all_breakers():
+        tb.add_row(
+            breaker.host,
+            breaker.state,
+            breaker.failures,
+            breaker.times_opened,
+            f"{breaker.retry_after:.0f}s",
+        )
+
+    return Embed(
+        title="Circuit Breakers",
+        description=f"```\n{tb.build()}\n```",
+        color=color
+    )
+
+
+def _format_bytes(n: int) -> str:
+    return f"{n / 2 ** 20:.1f}MiB" if n >= 2 ** 20 else f"{n / 2 ** 10:.0f}KiB"
+
+
+def _caches_embed(color: int) -> Embed:
+    tb = tableBuilder.TableBuilder.from_str('l  r  r  r  r')
+    tb.add_row("Cache", "Entries", "Size", "Evicted", "Hit rate")
+    tb.add_seperator_row()
+    for stats in cache.get_all_stats():
+        tb.add_row(
+            stats.name,
+            f"{stats.entries}/{stats.maxsize if stats.maxsize is not None else '-'}",
+            f"{_format_bytes(stats.bytes)}/{_format_bytes(stats.max_bytes)}" if stats.max_bytes is not None else "-",
+            stats.evictions,
+            f"{stats.hit_rate:.0%}",
+        )
+
+    neg_tb = tableBuilder.TableBuilder.from_str('l  r  r  r  r')
+    neg_tb.add_row("Negative cache", "Size", "Hits", "Misses", "Hit rate")
+    neg_tb.add_seperator_row()
+    for stats in negativeCache.get_stats():
+        neg_tb.add_row(stats.kind, stats.size, stats.hits, stats.misses, f"{stats.hit_rate:.0%}")
+
+    return Embed(
+        title="Caches",
+        description=f"```\n{tb.build()}\n```\n```\n{neg_tb.build()}\n```",
+        color=color
+    )
+
+
+def _format_seconds(t: float) -> str:
+    if t < 60:
+        return f"{t:.1f}s" if t < 10 else f"{t:.0f}s"
+    if t < 3600:
+        return f"{t / 60:.0f}m"
+    return f"{t / 3600:.1f}h"
+
+
+def _workers_embed(color: int) -> Embed:
+    tb = tableBuilder.TableBuilder.from_str('l  r  r  r  r  r  r  r')
+    tb.add_row("Queue", "Depth", "Oldest", "Tasks/s", "Done", "Failed", "Paused", "RL wait")
+    tb.add_seperator_row()
+    failures = []
+    for stats in queueWorker.get_all_stats():
+        tb.add_row(
+            stats.name,
+            stats.depth,
+            _format_seconds(stats.oldest_age),
+            f"{stats.throughput:.2f}",
+            stats.succeeded,
+            sum(stats.failures.values()),
+            _format_seconds(stats.paused_for) + (f" ({max(stats.backoff.values())})" if stats.backoff else ""),
+            _format_seconds(stats.rate_limit_wait),
+        )
+        if stats.failures:
+            failures.append(f"{stats.name}: " + ", ".join(f"{cls} {n}" for cls, n in stats.failures.items()))
+
+    now = datetime.now().astimezone()
+    loop_tb = tableBuilder.TableBuilder.from_str('l  l  r  r  r  r  r')
+    loop_tb.add_row("Loop", "State", "Runs", "Failed", "Last", "Mean", "Next in")
+    loop_tb.add_seperator_row()
+    for stats in loopStats.get_all_stats():
+        loop_tb.add_row(
+            stats.name,
+            "running" if stats.running else "stopped",
+            stats.runs,
+            sum(stats.failures.values()),
+            _format_seconds(stats.last_duration),
+            _format_seconds(stats.mean_duration),
+            _format_seconds(max((stats.next_run - now).total_seconds(), 0)) if stats.next_run is not None else "-",
+        )
+        if stats.failures:
+            failures.append(f"{stats.name}: " + ", ".join(f"{cls} {n}" for cls, n in stats.failures.items()))
+
+    description = f"```\n{tb.build()}\n```\n```\n{loop_tb.build()}\n```"
+    if failures:
+        description += "\n**Failures**\n" + "\n".join(f"- {f}" for f in failures)
+    if not eventBridge.tracking_enabled():
+        description += "\n*Tracking runs in the tracker process, its workers aren't shown.*"
+
+    return Embed(
+        title="Workers",
+        description=description,
+        color=color
+    )
+
+
+class DebugCommand(command.Command):
+    def __init__(self):
+        super().__init__(
+            name="debug",
+            aliases=("diag",),
+            usage=f"debug <sessions|circuits|caches|workers>",
+            description="Show internal diagnostics.\n"
+                        "- ``sessions``: HTTP connection pool and request latency stats\n"
+                        "- ``circuits``: Circuit breaker state of the requested API hosts\n"
+                        "- ``caches``: Size and hit rate of the API caches\n"
+                        "- ``workers``: Queue depth, throughput, errors and backoff of the workers",
+            req_perms=Permissions().none(),
+            permission_lvl=command.PermissionLevel.DEV
+        )
+
+    async def _execute(self, event: PrefixedCommandEvent):
+        if len(event.args) < 2:
+            await self.man(event)
+            return
+
+        match event.args[1].lower():
+            case "sessions":
+                await event.reply(embed=_sessions_embed(event.bot.config.DEFAULT_COLOR))
+            case "circuits":
+                await event.reply(embed=_circuits_embed(event.bot.config.DEFAULT_COLOR))
+            case "caches":
+                await event.reply(embed=_caches_embed(event.bot.config.DEFAULT_COLOR))
+            case "workers":
+                await event.reply(embed=_workers_embed(event.bot.config.DEFAULT_COLOR))
+            case _:
+                await event.reply_error(f"Invalid option: {event.args[1]}.\n"
+                                        f"Valid options are: ``sessions``, ``circuits``, ``caches``, ``workers``")
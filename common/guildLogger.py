@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from discord import Embed, TextChannel
 from discord.utils import escape_markdown
 
 import common.logging
 import common.utils.misc
-from common import botInstance
 from common.storage import guildMemberLogData
 from common.types.enums import LogEntryType
 
+if TYPE_CHECKING:
+    # Only needed for annotations, importing it here would make the tracker process load the bot
+    from common import botInstance
+
 
 class GuildLogger:
     def __init__(self, bot: botInstance.BotInstance):
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import common.api.wynncraft.v3.guild
+from common.types.wynncraft import GuildStats
+
+# The ranks of the member lists of a guild, highest first
+RANKS = ("owner", "chief", "strategist", "captain", "recruiter", "recruit")
+# The amount of rosters of untracked guilds that are kept
+MAX_FETCHED = 500
+
+
+@dataclass(frozen=True)
+class GuildRoster:
+    """
+    The members of a guild indexed by their undashed lowercase uuid.
+    """
+    name: str
+    ranks: dict[str, str]  # Member uuids mapped to their rank, highest rank first
+    usernames: dict[str, str]
+    online: dict[str, str]  # Online member uuids mapped to their server, highest rank first
+    uuids: frozenset[str]
+
+    @classmethod
+    def from_stats(cls, guild_stats: GuildStats) -> 'GuildRoster':
+        ranks = {}
+        usernames = {}
+        online = {}
+        for rank in RANKS:
+            for uuid, member in getattr(guild_stats.members, rank).items():
+                uuid = uuid.replace("-", "").lower()
+                ranks[uuid] = rank
+                usernames[uuid] = member.username
+                if member.online:
+                    online[uuid] = member.server
+
+        return cls(guild_stats.name, ranks, usernames, online, frozenset(ranks))
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid.replace("-", "").lower() in self.uuids
+
+    def rank(self, uuid: str) -> str | None:
+        return self.ranks.get(uuid.replace("-", "").lower())
+
+
+def join_times(guild_stats: GuildStats, default: datetime) -> dict[str, datetime]:
+    """
+    Get the times the members of a guild joined it.
+
+    :param default: The time used for members without a valid join time.
+    :return: The undashed lowercase uuids of the members mapped to their naive UTC join time.
+    """
+    times = {}
+    for rank in RANKS:
+        for uuid, member in getattr(guild_stats.members, rank).items():
+            try:
+                joined = datetime.fromisoformat(member.joined).astimezone(timezone.utc).replace(tzinfo=None)
+            except (TypeError, ValueError):
+                joined = default
+            times[uuid.replace("-", "").lower()] = joined
+    return times
+
+
+# Rosters of the guilds tracked by the guild updater
+_rosters: dict[str, GuildRoster] = {}
+# Rosters of other guilds with the stats they were created from, oldest first
+_fetched: dict[str, tuple[GuildStats, GuildRoster]] = {}
+
+
+def update(name: str, guild_stats: GuildStats):
+    """
+    Replace the roster of a tracked guild. Called by the guild updater after each refresh.
+    """
+    _rosters[name] = GuildRoster.from_stats(guild_stats)
+
+
+def remove(name: str):
+    _rosters.pop(name, None)
+
+
+def get(name: str) -> GuildRoster | None:
+    """
+    Get the roster of a tracked guild as of the last guild update.
+
+    :return: The roster or None if the guild isn't tracked or wasn't updated yet.
+    """
+    return _rosters.get(name)
+
+
+def from_stats(guild_stats: GuildStats) -> GuildRoster:
+    """
+    Get the roster of guild stats that were already requested.
+    """
+    fetched = _fetched.get(guild_stats.name)
+    # The guild stats are cached, only index them again once they changed
+    if fetched is None or fetched[0] is not guild_stats:
+        fetched = (guild_stats, GuildRoster.from_stats(guild_stats))
+        _fetched.pop(guild_stats.name, None)
+        _fetched[guild_stats.name] = fetched
+        if len(_fetched) > MAX_FETCHED:
+            _fetched.pop(next(iter(_fetched)))
+    return fetched[1]
+
+
+async def fetch(name: str) -> GuildRoster:
+    """
+    Get the roster of a guild. Tracked guilds are served from the guild updater, other guilds are requested.
+
+    :raises UnknownGuildException: if the guild wasn't found.
+    """
+    roster = _rosters.get(name)
+    if roster is not None:
+        return roster
+
+    return from_stats(await common.api.wynncraft.v3.guild.stats(name=name))
@@ -0,0 +1,46 @@
+from collections.abc import Collection
+
+from . import manager
+
+
+async def get_roster(guild: str) -> dict[str, str] | None:
+    """
+    Get the stored members of a guild.
+
+    :param guild: The name of the guild.
+    :return: The undashed lowercase uuids of the members mapped to their rank or None if no roster is stored.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT uuid, rank FROM guild_members
+            WHERE guild = ?
+        """, (guild,))
+
+    rows = await res.fetchall()
+    if len(rows) == 0:
+        return None
+    return {row["uuid"]: row["rank"] for row in rows}
+
+
+async def update_roster(guild: str, changed: dict[str, str], removed: Collection[str]):
+    """
+    Write the changes of a guild's members.
+
+    :param guild: The name of the guild.
+    :param changed: Members that joined or changed their rank mapped to their rank.
+    :param removed: Members that left.
+    """
+    if len(changed) == 0 and len(removed) == 0:
+        return
+
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.executemany("""
+            DELETE FROM guild_members
+            WHERE guild = ? AND uuid = ?
+        """, [(guild, uuid) for uuid in removed])
+    await cur.executemany("""
+            REPLACE INTO guild_members (guild, uuid, rank)
+            VALUES (?, ?, ?)
+        """, [(guild, uuid, rank) for uuid, rank in changed.items()])
+    await con.commit()
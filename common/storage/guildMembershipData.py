@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from . import manager
+
+
+async def sync_roster(guild: str, members: dict[str, datetime], time: datetime) -> tuple[set[str], set[str]]:
+    """
+    Update the membership history of a guild with its current members. Members without an open membership get one
+    starting at their join time, open memberships of players that aren't members anymore are closed at the given time.
+
+    :param guild: The name of the guild.
+    :param members: The undashed lowercase uuids of the current members mapped to the time they joined.
+    :param time: The time the members were requested.
+    :return: The uuids of the players that joined and left since the last sync.
+    """
+    con = manager.get_connection()
+    cur = await con.cursor()
+    res = await cur.execute("""
+            SELECT uuid FROM guild_membership
+            WHERE guild = ? AND left IS NULL
+        """, (guild,))
+    current = {row["uuid"] for row in await res.fetchall()}
+
+    joined = members.keys() - current
+    left = current - members.keys()
+    if len(joined) == 0 and len(left) == 0:
+        return set(), set()
+
+    await cur.executemany("""
+            INSERT OR IGNORE INTO guild_membership (guild, uuid, joined)
+            VALUES (?, ?, ?)
+        """, [(guild, uuid, min(members[uuid], time).isoformat(" ")) for uuid in joined])
+    await cur.executemany("""
+            UPDATE guild_membership SET left = ?
+            WHERE guild = ? AND uuid = ? AND left IS NULL
+        """, [(time.isoformat(" "), guild, uuid) for uuid in left])
+    await con.commit()
+
+    return joined, left
+
+
+async def has_history(guild: str) -> bool:
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT 1 FROM guild_membership
+            WHERE guild = ?
+            LIMIT 1
+        """, (guild,))
+
+    return await res.fetchone() is not None
+
+
+async def get_members(guild: str, after: datetime, before: datetime) -> tuple[str, ...]:
+    """
+    Get the players that were in a guild at any time between two times.
+
+    :return: The undashed lowercase uuids of the players.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT DISTINCT uuid FROM guild_membership
+            WHERE guild = ?
+            AND joined <= ?
+            AND (left IS NULL OR left >= ?)
+        """, (guild, before.isoformat(" "), after.isoformat(" ")))
+
+    return tuple(row["uuid"] for row in await res.fetchall())
+
+
+async def get_history(uuid: str) -> list[tuple[str, datetime, datetime | None]]:
+    """
+    Get the guilds a player was in.
+
+    :return: A list of the guild names with the time the player joined and left (None if still in the guild), oldest
+     first.
+    """
+    uuid = uuid.replace("-", "").lower()
+
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT guild, joined, left FROM guild_membership
+            WHERE uuid = ?
+            ORDER BY joined
+        """, (uuid,))
+
+    return [(row["guild"], datetime.fromisoformat(row["joined"]),
+             datetime.fromisoformat(row["left"]) if row["left"] is not None else None)
+            for row in await res.fetchall()]
@@ -4,12 +4,17 @@ import common.types.enums
 _con: aiosqlite.Connection = None
 
 
-async def init_database():
+async def init_database(path: str = "./data/NiaBot.db"):
     global _con
     if _con is not None:
         raise RuntimeError("init_database() was already called")
-    _con = await aiosqlite.connect("./data/NiaBot.db")
+    _con = await aiosqlite.connect(path)
     _con.row_factory = aiosqlite.Row
+    # The bot and the tracker process (python -m workers) share the database. WAL lets them read while the other
+    # writes and the busy timeout makes concurrent writers wait instead of failing.
+    await _con.execute("PRAGMA journal_mode=WAL")
+    await _con.execute("PRAGMA synchronous=NORMAL")
+    await _con.execute("PRAGMA busy_timeout=5000")
 
     cur = await _con.cursor()
     await cur.executescript(f"""
@@ -85,6 +90,51 @@ async def init_database():
                         PRIMARY KEY (uuid, record_time)
                     );
                     CREATE INDEX IF NOT EXISTS wars_idx ON player_tracking (uuid, record_time, wars) WHERE wars > 0;
+                    CREATE TABLE IF NOT EXISTS task_queue (
+                        queue TEXT NOT NULL,
+                        task_key TEXT NOT NULL,
+                        attempts INTEGER DEFAULT 0 NOT NULL,
+                        enqueued DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                        PRIMARY KEY (queue, task_key)
+                    );
+                    CREATE TABLE IF NOT EXISTS guild_members (
+                        guild TEXT NOT NULL,
+                        uuid TEXT NOT NULL COLLATE NOCASE,
+                        rank TEXT NOT NULL,
+                        PRIMARY KEY (guild, uuid)
+                    ) WITHOUT ROWID;
+                    CREATE TABLE IF NOT EXISTS guild_membership (
+                        guild TEXT NOT NULL,
+                        uuid TEXT NOT NULL COLLATE NOCASE,
+                        joined DATETIME NOT NULL,
+                        left DATETIME,
+                        PRIMARY KEY (guild, uuid, joined)
+                    ) WITHOUT ROWID;
+                    CREATE INDEX IF NOT EXISTS membership_uuid_idx ON guild_membership (uuid);
+                    CREATE TABLE IF NOT EXISTS territory_captures (
+                        capture_time DATETIME NOT NULL,
+                        territory TEXT NOT NULL,
+                        old_guild TEXT,
+                        new_guild TEXT
+                    );
+                    CREATE INDEX IF NOT EXISTS captures_territory_idx ON territory_captures (territory, capture_time);
+                    CREATE INDEX IF NOT EXISTS captures_guild_idx ON territory_captures (new_guild, capture_time);
+                    CREATE TABLE IF NOT EXISTS online_population (
+                        sample_time DATETIME NOT NULL,
+                        resolution INTEGER NOT NULL,
+                        total INTEGER NOT NULL,
+                        worlds TEXT NOT NULL,
+                        PRIMARY KEY (resolution, sample_time)
+                    ) WITHOUT ROWID;
+                    CREATE TABLE IF NOT EXISTS play_sessions (
+                        uuid TEXT NOT NULL COLLATE NOCASE,
+                        start DATETIME NOT NULL,
+                        end DATETIME,
+                        world TEXT,
+                        PRIMARY KEY (uuid, start)
+                    ) WITHOUT ROWID;
+                    CREATE INDEX IF NOT EXISTS sessions_open_idx ON play_sessions (uuid) WHERE end IS NULL;
+                    CREATE INDEX IF NOT EXISTS sessions_start_idx ON play_sessions (start);
     """)
 
 
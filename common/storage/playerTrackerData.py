@@ -1,12 +1,28 @@
+import dataclasses
+from collections.abc import Collection
 from datetime import datetime
 
 from async_lru import alru_cache
 
+from common import guildRosters
 from common.api.wynncraft.v3 import guild as guild_api
-import common.types.wynncraft
-from common.storage import manager
+from common.storage import manager, guildMembershipData
 from common.types.enums import PlayerStatsIdentifier
-from common.types.wynncraft import PlayerStats, WynncraftGuild
+from common.types.wynncraft import PlayerStats, WynncraftGuild, TrackedPlayerStats
+
+
+async def _guild_uuids(guild_name: str, after: datetime = None, before: datetime = None) -> tuple[str, ...]:
+    """
+    Get the members of a guild. If a time range is given and the membership history of the guild is recorded, the
+    players that were members at any time in the range are returned instead of the current members.
+    """
+    if (after is not None or before is not None) and await guildMembershipData.has_history(guild_name):
+        return await guildMembershipData.get_members(guild_name, after or datetime.min, before or datetime.max)
+
+    try:
+        return tuple((await guildRosters.fetch(guild_name)).uuids)
+    except guild_api.UnknownGuildException:
+        raise ValueError(f"Guild {guild_name} not found.")
 
 
 @alru_cache(ttl=600)
@@ -35,12 +51,7 @@ async def get_stats_for_guild(guild_name: str, stat: PlayerStatsIdentifier, afte
     if before is None:
         before = datetime.max
 
-    uuids = None
-    try:
-        guild_stats = await guild_api.stats(name=guild_name)
-        uuids = tuple(uuid.replace("-", "").lower() for uuid in guild_stats.members.all.keys())
-    except guild_api.UnknownGuildException:
-        raise ValueError(f"Guild {guild_name} not found.")
+    uuids = await _guild_uuids(guild_name)
 
     params = (after, before) +  (uuids if uuids is not None else ())
 
@@ -66,11 +77,7 @@ async def get_playtimes_for_guild(guild_name: str, after: datetime = None) -> di
     if after is None:
         after = datetime.min
 
-    try:
-        guild_stats = await guild_api.stats(name=guild_name)
-        uuids = tuple(uuid.replace("-", "").lower() for uuid in guild_stats.members.all.keys())
-    except guild_api.UnknownGuildException:
-        raise ValueError(f"Guild {guild_name} not found.")
+    uuids = await _guild_uuids(guild_name)
 
     if uuids is None:
         return {}
@@ -111,6 +118,57 @@ async def get_playtimes_for_guild(guild_name: str, after: datetime = None) -> di
     return {row['uuid']: row['playtime'] for row in await res.fetchall()}
 
 
+async def get_latest_playtimes(uuids: Collection[str], after: datetime, before: datetime) -> dict[str, float]:
+    """
+    Get the playtime of the latest record of each player between two times.
+
+    :param uuids: The undashed lowercase uuids of the players.
+    :param after: The earliest record time (inclusive).
+    :param before: The latest record time (exclusive).
+    :return: The uuids of the players with a record in the time range mapped to their playtime in hours.
+    """
+    uuids = tuple(uuids)
+    if len(uuids) == 0:
+        return {}
+
+    cur = await manager.get_cursor()
+    res = await cur.execute(f"""
+                SELECT a.uuid, a.playtime FROM
+                player_tracking as a
+                JOIN (SELECT uuid, max(record_time) as t
+                    FROM player_tracking
+                    WHERE record_time >= ?
+                    AND record_time < ?
+                    AND uuid IN ({', '.join('?' for _ in uuids)})
+                    GROUP BY uuid) as b
+                ON a.uuid = b.uuid AND a.record_time = b.t
+            """, (after.isoformat(" "), before.isoformat(" ")) + uuids)
+
+    return {row['uuid']: row['playtime'] for row in await res.fetchall() if row['playtime'] is not None}
+
+
+async def get_last_record_times(uuids: Collection[str]) -> dict[str, datetime]:
+    """
+    Get the time of the latest record of each player.
+
+    :param uuids: The undashed lowercase uuids of the players.
+    :return: The uuids of the players with a record mapped to the naive UTC time of their latest record.
+    """
+    uuids = tuple(uuids)
+    if len(uuids) == 0:
+        return {}
+
+    cur = await manager.get_cursor()
+    res = await cur.execute(f"""
+                SELECT uuid, max(record_time) as t
+                FROM player_tracking
+                WHERE uuid IN ({', '.join('?' for _ in uuids)})
+                GROUP BY uuid
+            """, uuids)
+
+    return {row['uuid']: datetime.fromisoformat(row['t']) for row in await res.fetchall()}
+
+
 @alru_cache(ttl=600)
 async def get_leaderboard(stat: PlayerStatsIdentifier, guild: WynncraftGuild = None, after: datetime = None,
                           before: datetime = None) -> dict[str, tuple]:
@@ -121,12 +179,7 @@ async def get_leaderboard(stat: PlayerStatsIdentifier, guild: WynncraftGuild = N
 
     uuids = None
     if guild is not None:
-        try:
-            guild_stats: common.types.wynncraft.GuildStats = await guild_api.stats(
-                name=guild.name)
-            uuids = tuple(uuid.replace("-", "").lower() for uuid in guild_stats.members.all.keys())
-        except guild_api.UnknownGuildException:
-            raise ValueError(f"Guild {guild.name} not found.")
+        uuids = await _guild_uuids(guild.name)
 
     params = (after, before) + (uuids if uuids is not None else ())
 
@@ -158,11 +211,7 @@ async def get_warcount(guild: WynncraftGuild = None) -> list[
     """
     uuids = None
     if guild is not None:
-        try:
-            guild_stats = await guild_api.stats(name=guild.name)
-            uuids = tuple(uuid.replace("-", "").lower() for uuid in guild_stats.members.all.keys())
-        except guild_api.UnknownGuildException:
-            raise ValueError(f"Guild {guild.name} not found.")
+        uuids = await _guild_uuids(guild.name)
 
     params = (uuids if uuids is not None else ())
 
@@ -190,16 +239,13 @@ async def get_warcount_relative(t_from: datetime, t_to: datetime, guild: Wynncra
     Get the realtive warcount leaderboard between two dates.
     :param t_from: The start of the time range to get the leaderboard for.
     :param t_to: The end of the time range to get the leaderboard for.
-    :param guild: The guild to get the warcount leaderboard for. If None, the global leaderboard is returned.
+    :param guild: The guild to get the warcount leaderboard for. If None, the global leaderboard is returned. Includes
+     everyone who was a member during the time range if the membership history of the guild is recorded.
     :return: A list of tuples containing the rank, uuid and warcount of the players.
     """
     uuids = None
     if guild is not None:
-        try:
-            guild_stats = await guild_api.stats(name=guild.name)
-            uuids = tuple(uuid.replace("-", "").lower() for uuid in guild_stats.members.all.keys())
-        except guild_api.UnknownGuildException:
-            raise ValueError(f"Guild {guild.name} not found.")
+        uuids = await _guild_uuids(guild.name, t_from, t_to)
 
     params = (t_from, t_to) + (uuids if uuids is not None else ())
     params = params + params
@@ -257,109 +303,29 @@ async def get_history(stat: PlayerStatsIdentifier, uuid: str) -> list[tuple[str,
     return [(row['record_time'], row['stat'], row['last_join']) for row in await res.fetchall()]
 
 
+_tracked_columns = tuple(f.name for f in dataclasses.fields(TrackedPlayerStats))
+_insert_record_query = f"""
+            INSERT INTO player_tracking ({', '.join(_tracked_columns)})
+            VALUES ({', '.join('?' for _ in _tracked_columns)})
+        """
+
+
 async def add_record(stats: PlayerStats, record_time: datetime = None):
+    """
+    Store the tracked stats of a fully decoded PlayerStats object.
+    """
     if record_time is None:
         record_time = datetime.utcnow()
 
-    has_dungeons = stats.globalData.dungeons is not None
-    has_raids = stats.globalData.raids is not None
+    await add_tracked_record(TrackedPlayerStats.from_stats(stats, record_time))
+
 
+async def add_tracked_record(stats: TrackedPlayerStats):
+    """
+    Store a row of tracked player stats.
+    """
     con = manager.get_connection()
     cur = await manager.get_cursor()
-    await cur.execute(
-        """
-            INSERT INTO player_tracking (
-                record_time,
-                uuid,
-                username,
-                rank,
-                support_rank, 
-                first_join, 
-                last_join, 
-                playtime, 
-                guild_uuid,
-                guild_name, 
-                guild_rank, 
-                wars, 
-                total_levels, 
-                killed_mobs, 
-                chests_found, 
-                dungeons_total, 
-                dungeons_ds, 
-                dungeons_ip, 
-                dungeons_ls, 
-                dungeons_uc, 
-                dungeons_ss, 
-                dungeons_ib, 
-                dungeons_gg,
-                dungeons_ur, 
-                dungeons_cds, 
-                dungeons_cip, 
-                dungeons_cls, 
-                dungeons_css, 
-                dungeons_cuc, 
-                dungeons_cgg, 
-                dungeons_cur, 
-                dungeons_cib, 
-                dungeons_ff, 
-                dungeons_eo, 
-                dungeons_ts, 
-                raids_total, 
-                raids_notg, 
-                raids_nol, 
-                raids_tcc, 
-                raids_tna, 
-                completed_quests, 
-                pvp_kills, 
-                pvp_deaths
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            record_time,
-            stats.uuid.replace("-", "").lower(),
-            stats.username,
-            stats.rank,
-            stats.supportRank,
-            stats.firstJoin,
-            stats.lastJoin,
-            stats.playtime,
-            stats.guild.uuid if stats.guild is not None else None,
-            stats.guild.name if stats.guild is not None else None,
-            stats.guild.rank if stats.guild is not None else None,
-            stats.globalData.wars,
-            stats.globalData.totalLevel,
-            stats.globalData.killedMobs,
-            stats.globalData.chestsFound,
-            stats.globalData.dungeons.total if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Decrepit Sewers', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Infested Pit', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Lost Sanctuary', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Underworld Crypt', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Sand-Swept Tomb', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Ice Barrows', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Galleon\'s Graveyard', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Undergrowth Ruins', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Decrepit Sewers', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Infested Pit', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Lost Sanctuary', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Sand-Swept Tomb', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Underworld Crypt', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Galleon\'s Graveyard',
-                                               0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Undergrowth Ruins', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Corrupted Ice Barrows', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Fallen Factory', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Eldritch Outlook', 0) if has_dungeons else 0,
-            stats.globalData.dungeons.list.get('Timelost Sanctum', 0) if has_dungeons else 0,
-            stats.globalData.raids.total if has_raids else 0,
-            stats.globalData.raids.list.get('Nest of the Grootslangs', 0) if has_raids else 0,
-            stats.globalData.raids.list.get('Orphion\'s Nexus of Light', 0) if has_raids else 0,
-            stats.globalData.raids.list.get('The Canyon Colossus', 0) if has_raids else 0,
-            stats.globalData.raids.list.get('The Nameless Anomaly', 0) if has_raids else 0,
-            stats.globalData.completedQuests,
-            stats.globalData.pvp.kills,
-            stats.globalData.pvp.deaths
-        ))
+    await cur.execute(_insert_record_query, tuple(getattr(stats, c) for c in _tracked_columns))
 
     await con.commit()
@@ -0,0 +1,113 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from . import manager
+
+# The resolutions of the samples in seconds
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+
+@dataclass(frozen=True)
+class PopulationSample:
+    time: datetime  # Naive UTC start of the sample
+    resolution: int  # The time span in seconds the sample covers, its counts are averages over that span
+    total: int
+    worlds: dict[str, int]  # Players online on each world
+
+
+def _encode_worlds(worlds: dict[str, int]) -> str:
+    return json.dumps(worlds, separators=(",", ":"))
+
+
+def _bucket(t: datetime, resolution: int) -> datetime:
+    timestamp = int(t.replace(tzinfo=timezone.utc).timestamp())
+    return datetime.fromtimestamp(timestamp // resolution * resolution, timezone.utc).replace(tzinfo=None)
+
+
+async def add_sample(time: datetime, total: int, worlds: dict[str, int]):
+    """
+    Store the online players of a minute. A sample of the same minute is replaced.
+
+    :param time: The naive UTC time of the sample.
+    :param total: The total amount of online players.
+    :param worlds: The amount of online players on each world.
+    """
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.execute("""
+            REPLACE INTO online_population (sample_time, resolution, total, worlds)
+            VALUES (?, ?, ?, ?)
+        """, (time.replace(second=0, microsecond=0).isoformat(" "), MINUTE, total, _encode_worlds(worlds)))
+    await con.commit()
+
+
+async def get_samples(after: datetime, before: datetime) -> list[PopulationSample]:
+    """
+    Get the samples between two times of all resolutions, oldest first.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT sample_time, resolution, total, worlds FROM online_population
+            WHERE sample_time >= ?
+            AND sample_time <= ?
+            ORDER BY sample_time
+        """, (after.isoformat(" "), before.isoformat(" ")))
+
+    return [PopulationSample(datetime.fromisoformat(row["sample_time"]), row["resolution"], row["total"],
+                             json.loads(row["worlds"]))
+            for row in await res.fetchall()]
+
+
+async def downsample(resolution: int, new_resolution: int, before: datetime) -> int:
+    """
+    Replace the samples of a resolution before a time by their averages over the new resolution. Only complete time
+    spans of the new resolution are downsampled.
+
+    :return: The amount of samples that were replaced.
+    """
+    before = _bucket(before, new_resolution)
+
+    con = manager.get_connection()
+    cur = await con.cursor()
+    res = await cur.execute("""
+            SELECT sample_time, total, worlds FROM online_population
+            WHERE resolution = ?
+            AND sample_time < ?
+        """, (resolution, before.isoformat(" ")))
+    rows = await res.fetchall()
+    if len(rows) == 0:
+        return 0
+
+    buckets: dict[datetime, list] = defaultdict(list)
+    for row in rows:
+        buckets[_bucket(datetime.fromisoformat(row["sample_time"]), new_resolution)].append(row)
+
+    samples = []
+    for t, bucket in buckets.items():
+        worlds: dict[str, int] = defaultdict(int)
+        for row in bucket:
+            for world, count in json.loads(row["worlds"]).items():
+                worlds[world] += count
+        samples.append((
+            t.isoformat(" "),
+            new_resolution,
+            round(sum(row["total"] for row in bucket) / len(bucket)),
+            _encode_worlds({world: round(count / len(bucket)) for world, count in worlds.items()}),
+        ))
+
+    await cur.executemany("""
+            REPLACE INTO online_population (sample_time, resolution, total, worlds)
+            VALUES (?, ?, ?, ?)
+        """, samples)
+    await cur.execute("""
+            DELETE FROM online_population
+            WHERE resolution = ?
+            AND sample_time < ?
+        """, (resolution, before.isoformat(" ")))
+    await con.commit()
+
+    return len(rows)
@@ -0,0 +1,149 @@
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import datetime
+
+from . import manager
+
+
+@dataclass(frozen=True)
+class PlaySession:
+    uuid: str
+    start: datetime  # Naive UTC
+    end: datetime | None  # None while the player is online
+    world: str | None  # The world the player was on when the session started
+
+
+def _session(row) -> PlaySession:
+    return PlaySession(row["uuid"], datetime.fromisoformat(row["start"]),
+                       datetime.fromisoformat(row["end"]) if row["end"] is not None else None, row["world"])
+
+
+async def update_sessions(started: dict[str, str], ended: Collection[str], time: datetime):
+    """
+    Start and end the sessions of players in one batch.
+
+    :param started: The undashed lowercase uuids of the players that came online mapped to their world.
+    :param ended: The undashed lowercase uuids of the players that went offline.
+    :param time: The naive UTC time of the change.
+    """
+    if len(started) == 0 and len(ended) == 0:
+        return
+
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.executemany("""
+            UPDATE play_sessions SET end = ?
+            WHERE uuid = ? AND end IS NULL
+        """, [(time.isoformat(" "), uuid) for uuid in ended])
+    await cur.executemany("""
+            INSERT OR IGNORE INTO play_sessions (uuid, start, world)
+            VALUES (?, ?, ?)
+        """, [(uuid, time.isoformat(" "), world) for uuid, world in started.items()])
+    await con.commit()
+
+
+async def get_open_sessions() -> dict[str, PlaySession]:
+    """
+    Get the sessions that weren't ended, e.g. because the tracker was stopped.
+
+    :return: The uuids of the players mapped to their open session.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT * FROM play_sessions
+            WHERE end IS NULL
+        """)
+
+    return {row["uuid"]: _session(row) for row in await res.fetchall()}
+
+
+async def get_last_change() -> datetime | None:
+    """
+    Get the time any session was last started or ended.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT max(t) AS t FROM (
+                SELECT max(start) AS t FROM play_sessions
+                UNION ALL
+                SELECT max(end) FROM play_sessions
+            )
+        """)
+
+    row = await res.fetchone()
+    return datetime.fromisoformat(row["t"]) if row is not None and row["t"] is not None else None
+
+
+async def get_sessions(uuid: str, after: datetime = None, before: datetime = None) -> list[PlaySession]:
+    """
+    Get the sessions of a player that overlap a time range, oldest first.
+    """
+    if after is None:
+        after = datetime.min
+    if before is None:
+        before = datetime.max
+    uuid = uuid.replace("-", "").lower()
+
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT * FROM play_sessions
+            WHERE uuid = ?
+            AND start <= ?
+            AND (end IS NULL OR end >= ?)
+            ORDER BY start
+        """, (uuid, before.isoformat(" "), after.isoformat(" ")))
+
+    return [_session(row) for row in await res.fetchall()]
+
+
+async def get_last_seen(uuid: str) -> datetime | None:
+    """
+    Get the time a player was last seen online.
+
+    :return: The end of the player's last session, the current time if the player is online or None if the player was
+     never seen.
+    """
+    uuid = uuid.replace("-", "").lower()
+
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT * FROM play_sessions
+            WHERE uuid = ?
+            ORDER BY start DESC
+            LIMIT 1
+        """, (uuid,))
+
+    row = await res.fetchone()
+    if row is None:
+        return None
+    session = _session(row)
+    return session.end if session.end is not None else datetime.utcnow()
+
+
+async def get_playtimes(uuids: Collection[str], after: datetime, before: datetime) -> dict[str, float]:
+    """
+    Get the time players were online in a time range.
+
+    :param uuids: The undashed lowercase uuids of the players.
+    :return: The uuids of the players that were online in the time range mapped to their online time in seconds.
+    """
+    uuids = tuple(uuids)
+    if len(uuids) == 0:
+        return {}
+
+    cur = await manager.get_cursor()
+    res = await cur.execute(f"""
+            SELECT uuid, start, end FROM play_sessions
+            WHERE uuid IN ({', '.join('?' for _ in uuids)})
+            AND start <= ?
+            AND (end IS NULL OR end >= ?)
+        """, uuids + (before.isoformat(" "), after.isoformat(" ")))
+
+    now = datetime.utcnow()
+    playtimes: dict[str, float] = {}
+    for row in await res.fetchall():
+        start = max(datetime.fromisoformat(row["start"]), after)
+        end = min(datetime.fromisoformat(row["end"]) if row["end"] is not None else now, before)
+        if end > start:
+            playtimes[row["uuid"]] = playtimes.get(row["uuid"], 0.0) + (end - start).total_seconds()
+    return playtimes
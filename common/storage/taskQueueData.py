@@ -0,0 +1,65 @@
+from collections.abc import Collection
+
+from . import manager
+
+
+async def add_all(queue: str, keys: Collection[str]):
+    """
+    Persist multiple queued tasks in one transaction. Tasks with a key that is already queued are ignored.
+    """
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.executemany("""
+            INSERT OR IGNORE INTO task_queue (queue, task_key)
+            VALUES (?, ?)
+        """, [(queue, key) for key in keys])
+    await con.commit()
+
+
+async def remove(queue: str, key: str):
+    """
+    Remove a task after it was processed or dropped.
+    """
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.execute("""
+            DELETE FROM task_queue
+            WHERE queue = ? AND task_key = ?
+        """, (queue, key))
+    await con.commit()
+
+
+async def remove_all(queue: str, keys: Collection[str]):
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.executemany("""
+            DELETE FROM task_queue
+            WHERE queue = ? AND task_key = ?
+        """, [(queue, key) for key in keys])
+    await con.commit()
+
+
+async def set_attempts(queue: str, key: str, attempts: int):
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.execute("""
+            UPDATE task_queue SET attempts = ?
+            WHERE queue = ? AND task_key = ?
+        """, (attempts, queue, key))
+    await con.commit()
+
+
+async def get_all(queue: str) -> list[tuple[str, int]]:
+    """
+    Get all persisted tasks of a queue, oldest first.
+
+    :return: A list of the task keys and their amount of failed attempts.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT task_key, attempts FROM task_queue
+            WHERE queue = ?
+            ORDER BY rowid
+        """, (queue,))
+
+    return [(row["task_key"], row["attempts"]) for row in await res.fetchall()]
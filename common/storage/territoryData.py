@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from . import manager
+
+
+@dataclass(frozen=True)
+class TerritoryCapture:
+    time: datetime  # Naive UTC
+    territory: str
+    old_guild: str | None  # None if the territory had no known owner
+    new_guild: str | None
+
+
+async def add_captures(captures: list[TerritoryCapture]):
+    if len(captures) == 0:
+        return
+
+    con = manager.get_connection()
+    cur = await con.cursor()
+    await cur.executemany("""
+            INSERT INTO territory_captures (capture_time, territory, old_guild, new_guild)
+            VALUES (?, ?, ?, ?)
+        """, [(c.time.isoformat(" "), c.territory, c.old_guild, c.new_guild) for c in captures])
+    await con.commit()
+
+
+async def get_owners() -> dict[str, str | None]:
+    """
+    Get the owner of each territory as of the latest stored capture.
+
+    :return: The territories mapped to the name of the guild owning them.
+    """
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT a.territory, a.new_guild FROM
+            territory_captures AS a
+            JOIN (SELECT territory, max(capture_time) AS t
+                FROM territory_captures
+                GROUP BY territory) AS b
+            ON a.territory = b.territory AND a.capture_time = b.t
+        """)
+
+    return {row["territory"]: row["new_guild"] for row in await res.fetchall()}
+
+
+async def get_captures(guild: str, after: datetime = None, before: datetime = None) -> list[TerritoryCapture]:
+    """
+    Get the territories a guild captured or lost between two times, oldest first.
+    """
+    if after is None:
+        after = datetime.min
+    if before is None:
+        before = datetime.max
+
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT capture_time, territory, old_guild, new_guild FROM territory_captures
+            WHERE (new_guild = ? OR old_guild = ?)
+            AND capture_time >= ?
+            AND capture_time <= ?
+            ORDER BY capture_time
+        """, (guild, guild, after.isoformat(" "), before.isoformat(" ")))
+
+    return [TerritoryCapture(datetime.fromisoformat(row["capture_time"]), row["territory"], row["old_guild"],
+                             row["new_guild"])
+            for row in await res.fetchall()]
+
+
+async def get_capture_leaderboard(after: datetime = None, before: datetime = None) -> list[tuple[int, str, int]]:
+    """
+    Get the guilds that captured the most territories from other guilds between two times.
+
+    :return: A list of tuples containing the rank, guild name and amount of captures.
+    """
+    if after is None:
+        after = datetime.min
+    if before is None:
+        before = datetime.max
+
+    cur = await manager.get_cursor()
+    res = await cur.execute("""
+            SELECT row_number() over () as rank, new_guild, captures FROM (
+                SELECT new_guild, count(*) as captures
+                FROM territory_captures
+                WHERE old_guild IS NOT NULL
+                AND new_guild IS NOT NULL
+                AND capture_time >= ?
+                AND capture_time <= ?
+                GROUP BY new_guild
+                ORDER BY captures DESC
+                LIMIT 100
+            )
+        """, (after.isoformat(" "), before.isoformat(" ")))
+
+    return [(row["rank"], row["new_guild"], row["captures"]) for row in await res.fetchall()]
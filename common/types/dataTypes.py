@@ -10,7 +10,7 @@ class MinecraftPlayer(NamedTuple):
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Point2D(SimpleJsonable):
     x: int
     z: int
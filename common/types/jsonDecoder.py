@@ -0,0 +1,210 @@
+import dataclasses
+import sys
+import types
+from typing import Any, Callable, Type
+
+from common.types.jsonable import Jsonable, JsonType, JsonBaseType
+
+Decoder = Callable[[JsonType], Any]
+
+# Dataclass field metadata key marking fields whose strings should be interned
+INTERN = "intern"
+
+_decoders: dict[Any, Decoder] = {}
+_compiling: set[type] = set()
+
+
+def get_decoder(cls: Any) -> Decoder:
+    """
+    Get the compiled decoder for the specified type. Decoders are compiled once per type and cached.
+
+    :param cls: The type to decode json objects into. Can be a dataclass, a Jsonable, a generic list/dict or a base type.
+    :return: A function converting a json object into an instance of cls.
+    """
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        decoder = _compile(cls)
+        _decoders[cls] = decoder
+    return decoder
+
+
+def decode(cls: Type[Any], json_obj: JsonType) -> Any:
+    """
+    Convert a json object to an instance of cls using the compiled decoder for cls.
+    """
+    return get_decoder(cls)(json_obj)
+
+
+def _fallback(cls: Any) -> Decoder:
+    # The reflective conversion handles every shape the specialized decoders don't expect.
+    def decoder(json_obj):
+        return Jsonable.json_to_cls(cls, json_obj)
+
+    return decoder
+
+
+def _compile(cls: Any) -> Decoder:
+    if cls is str or cls is int or cls is bool:
+        def decoder(json_obj):
+            if json_obj is None or type(json_obj) is cls:
+                return json_obj
+            return Jsonable.json_to_cls(cls, json_obj)
+
+        return decoder
+
+    if cls is float:
+        def decoder(json_obj):
+            t = type(json_obj)
+            if json_obj is None or t is float:
+                return json_obj
+            if t is int:
+                return float(json_obj)
+            return Jsonable.json_to_cls(cls, json_obj)
+
+        return decoder
+
+    if cls is dict or cls is list:
+        def decoder(json_obj):
+            if json_obj is None or type(json_obj) is cls:
+                return json_obj
+            return Jsonable.json_to_cls(cls, json_obj)
+
+        return decoder
+
+    if isinstance(cls, types.UnionType):
+        if all(isinstance(arg, type) and issubclass(arg, JsonBaseType) for arg in cls.__args__):
+            def decoder(json_obj):
+                if json_obj is None or isinstance(json_obj, cls):
+                    return json_obj
+                return Jsonable.json_to_cls(cls, json_obj)
+
+            return decoder
+        return _fallback(cls)
+
+    if isinstance(cls, types.GenericAlias):
+        if cls.__origin__ is dict and len(cls.__args__) == 2:
+            return _compile_dict(cls, get_decoder(cls.__args__[1]))
+        if cls.__origin__ is list and len(cls.__args__) == 1:
+            return _compile_list(cls, get_decoder(cls.__args__[0]))
+        return _fallback(cls)
+
+    if isinstance(cls, type) and issubclass(cls, Jsonable):
+        if dataclasses.is_dataclass(cls) and _uses_default_from_json(cls):
+            return _compile_dataclass(cls)
+
+        from_json = cls.from_json
+
+        def decoder(json_obj):
+            if json_obj is None:
+                return None
+            if type(json_obj) is dict or type(json_obj) is list:
+                return from_json(json_obj)
+            return Jsonable.json_to_cls(cls, json_obj)
+
+        return decoder
+
+    return _fallback(cls)
+
+
+def _compile_dict(cls: Any, value_decoder: Decoder) -> Decoder:
+    def decoder(json_obj):
+        if type(json_obj) is dict:
+            return {k: value_decoder(v) for k, v in json_obj.items()}
+        if json_obj is None:
+            return None
+        return Jsonable.json_to_cls(cls, json_obj)
+
+    return decoder
+
+
+def _compile_list(cls: Any, item_decoder: Decoder) -> Decoder:
+    def decoder(json_obj):
+        if type(json_obj) is list:
+            return [item_decoder(j) for j in json_obj]
+        if json_obj is None:
+            return None
+        return Jsonable.json_to_cls(cls, json_obj)
+
+    return decoder
+
+
+def _intern(v):
+    t = type(v)
+    if t is str:
+        return sys.intern(v)
+    if t is dict:
+        return {sys.intern(k) if type(k) is str else k: x for k, x in v.items()}
+    if t is list:
+        return [sys.intern(x) if type(x) is str else x for x in v]
+    return v
+
+
+def _interning(decoder: Decoder) -> Decoder:
+    def interning_decoder(json_obj):
+        return _intern(decoder(json_obj))
+
+    return interning_decoder
+
+
+def _uses_default_from_json(cls: type) -> bool:
+    from common.types.jsonableDataclass import JsonableDataclass
+
+    return issubclass(cls, JsonableDataclass) and cls.from_json.__func__ is JsonableDataclass.from_json.__func__
+
+
+def _compile_dataclass(cls: type) -> Decoder:
+    """
+    Generate a decoder function for a JsonableDataclass. The generated code reads every field directly from the json
+    dict and passes it through the compiled decoder of the field type, so no reflection happens per decoded object.
+    """
+    if cls in _compiling:
+        # Recursive type, resolve the decoder lazily once compilation finished
+        return lambda json_obj: _decoders[cls](json_obj)
+    _compiling.add(cls)
+
+    try:
+        namespace = {"cls": cls, "fallback": Jsonable.json_to_cls}
+        args = []
+        for i, f in enumerate(dataclasses.fields(cls)):
+            if not f.init:
+                continue
+            decoder = get_decoder(f.type)
+            if f.metadata.get(INTERN, False):
+                decoder = _interning(decoder)
+            namespace[f"d{i}"] = decoder
+            args.append(f"{f.name}=d{i}(get({f.name!r}))")
+
+        source = (
+            "def decode(json_obj):\n"
+            "    if type(json_obj) is not dict:\n"
+            "        if json_obj is None:\n"
+            "            return None\n"
+            "        if type(json_obj) is list:\n"
+            f"            raise TypeError('Cannot decode a json array into {cls.__qualname__}.')\n"
+            "        return fallback(cls, json_obj)\n"
+            "    get = json_obj.get\n"
+            f"    return cls({', '.join(args)})\n"
+        )
+        exec(compile(source, f"<decoder {cls.__qualname__}>", "exec"), namespace)
+    finally:
+        _compiling.discard(cls)
+
+    return namespace["decode"]
+
+
+def decode_reflective(cls: Any, json_obj: JsonType) -> Any:
+    """
+    Reference implementation of the conversion which inspects the dataclass fields of every decoded object.
+    The compiled decoders must produce the same result. Used for verification and benchmarking.
+    """
+    if isinstance(cls, type) and dataclasses.is_dataclass(cls) and _uses_default_from_json(cls) \
+            and isinstance(json_obj, dict):
+        fieldtypes = {f.name: f.type for f in dataclasses.fields(cls)}
+        return cls(**{f: decode_reflective(fieldtypes[f], json_obj.get(f, None)) for f in fieldtypes})
+
+    if isinstance(cls, types.GenericAlias) and isinstance(json_obj, dict) and cls.__origin__ is dict:
+        return {k: decode_reflective(cls.__args__[1], v) for k, v in json_obj.items()}
+    if isinstance(cls, types.GenericAlias) and isinstance(json_obj, list) and cls.__origin__ is list:
+        return [decode_reflective(cls.__args__[0], j) for j in json_obj]
+
+    return Jsonable.json_to_cls(cls, json_obj)
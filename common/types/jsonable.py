@@ -8,6 +8,8 @@ T = TypeVar("T")
 
 
 class Jsonable(ABC):
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def from_json(cls, json_obj: JsonType):
@@ -1,24 +1,20 @@
 import dataclasses
 
+from common.types import jsonDecoder
 from common.types.jsonable import Jsonable, JsonType
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class JsonableDataclass(Jsonable):
     @classmethod
     def from_json(cls, json_obj: dict[str, JsonType]):
-        fieldtypes = {f.name: f.type for f in dataclasses.fields(cls)}
+        # The conversion function for each dataclass is generated once and cached (see jsonDecoder).
+        return jsonDecoder.get_decoder(cls)(json_obj)
 
-        fields = {}
-        for f in fieldtypes:
-            fields[f] = Jsonable.json_to_cls(fieldtypes[f], json_obj.get(f, None))
 
-        # unknown = set(json_obj.keys()) - set(fieldtypes.keys())
-        # missing = set(fieldtypes.keys()) - set(json_obj.keys())
-        #
-        # if unknown:
-        #     logging.debug(f"Unknown fields: {unknown}")
-        # if missing:
-        #     logging.debug(f"Missing fields: {missing}")
-
-        return cls(**fields)
+def interned() -> dataclasses.Field:
+    """
+    Field specifier for fields whose strings repeat across many objects (e.g. ranks or server names).
+    Decoded strings of the field are interned, for dicts the keys and for lists the items are interned.
+    """
+    return dataclasses.field(metadata={jsonDecoder.INTERN: True})
@@ -5,6 +5,8 @@ class SimpleJsonable(Jsonable):
     """
     A simple implementation of Jsonable.
     """
+    __slots__ = ()
+
     @classmethod
     def from_json(cls, json_obj: JsonType):
         if json_obj is None:
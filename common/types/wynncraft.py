@@ -1,12 +1,46 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import NamedTuple
 
 from common.types.dataTypes import Point2D
-from common.types.jsonableDataclass import JsonableDataclass
-
-
-@dataclass(frozen=True)
+from common.types.jsonableDataclass import JsonableDataclass, interned
+
+
+# player_tracking columns mapped to the dungeon/raid names in the stats response
+TRACKED_DUNGEONS = {
+    "dungeons_ds": "Decrepit Sewers",
+    "dungeons_ip": "Infested Pit",
+    "dungeons_ls": "Lost Sanctuary",
+    "dungeons_uc": "Underworld Crypt",
+    "dungeons_ss": "Sand-Swept Tomb",
+    "dungeons_ib": "Ice Barrows",
+    "dungeons_gg": "Galleon's Graveyard",
+    "dungeons_ur": "Undergrowth Ruins",
+    "dungeons_cds": "Corrupted Decrepit Sewers",
+    "dungeons_cip": "Corrupted Infested Pit",
+    "dungeons_cls": "Corrupted Lost Sanctuary",
+    "dungeons_css": "Corrupted Sand-Swept Tomb",
+    "dungeons_cuc": "Corrupted Underworld Crypt",
+    "dungeons_cgg": "Corrupted Galleon's Graveyard",
+    "dungeons_cur": "Corrupted Undergrowth Ruins",
+    "dungeons_cib": "Corrupted Ice Barrows",
+    "dungeons_ff": "Fallen Factory",
+    "dungeons_eo": "Eldritch Outlook",
+    "dungeons_ts": "Timelost Sanctum",
+}
+TRACKED_RAIDS = {
+    "raids_notg": "Nest of the Grootslangs",
+    "raids_nol": "Orphion's Nexus of Light",
+    "raids_tcc": "The Canyon Colossus",
+    "raids_tna": "The Nameless Anomaly",
+}
+
+
+@dataclass(frozen=True, slots=True)
 class TrackedPlayerStats:
+    """
+    The stats of a player that are stored in the player_tracking table. Fields are in column order.
+    """
     record_time: str  # datetime in ISO8601 format
     uuid: str
     username: str
@@ -15,6 +49,7 @@ class TrackedPlayerStats:
     first_join: str  # datetime in ISO8601 format
     last_join: str  # datetime in ISO8601 format
     playtime: float
+    guild_uuid: str
     guild_name: str
     guild_rank: str
     wars: int
@@ -50,8 +85,80 @@ class TrackedPlayerStats:
     pvp_kills: int
     pvp_deaths: int
 
-
-@dataclass(frozen=True)
+    @classmethod
+    def from_stats_json(cls, json_obj: dict, record_time: datetime):
+        """
+        Project a raw player stats response onto the tracked columns without decoding the full PlayerStats tree.
+        """
+        global_data = json_obj.get("globalData")
+        guild = json_obj.get("guild")
+        dungeons = global_data.get("dungeons")
+        raids = global_data.get("raids")
+        dungeon_list = dungeons.get("list") if dungeons is not None else None
+        raid_list = raids.get("list") if raids is not None else None
+        pvp = global_data.get("pvp")
+
+        return cls(
+            record_time.isoformat(" "),
+            json_obj.get("uuid").replace("-", "").lower(),
+            json_obj.get("username"),
+            json_obj.get("rank"),
+            json_obj.get("supportRank"),
+            json_obj.get("firstJoin"),
+            json_obj.get("lastJoin"),
+            json_obj.get("playtime"),
+            guild.get("uuid") if guild is not None else None,
+            guild.get("name") if guild is not None else None,
+            guild.get("rank") if guild is not None else None,
+            global_data.get("wars"),
+            global_data.get("totalLevel"),
+            global_data.get("killedMobs"),
+            global_data.get("chestsFound"),
+            dungeons.get("total") if dungeons is not None else 0,
+            *(dungeon_list.get(name, 0) if dungeons is not None else 0 for name in TRACKED_DUNGEONS.values()),
+            raids.get("total") if raids is not None else 0,
+            *(raid_list.get(name, 0) if raids is not None else 0 for name in TRACKED_RAIDS.values()),
+            global_data.get("completedQuests"),
+            pvp.get("kills"),
+            pvp.get("deaths"),
+        )
+
+    @classmethod
+    def from_stats(cls, stats: 'PlayerStats', record_time: datetime):
+        """
+        Get the tracked columns of an already decoded PlayerStats object.
+        """
+        global_data = stats.globalData
+        dungeons = global_data.dungeons
+        raids = global_data.raids
+
+        return cls(
+            record_time.isoformat(" "),
+            stats.uuid.replace("-", "").lower(),
+            stats.username,
+            stats.rank,
+            stats.supportRank,
+            stats.firstJoin,
+            stats.lastJoin,
+            stats.playtime,
+            stats.guild.uuid if stats.guild is not None else None,
+            stats.guild.name if stats.guild is not None else None,
+            stats.guild.rank if stats.guild is not None else None,
+            global_data.wars,
+            global_data.totalLevel,
+            global_data.killedMobs,
+            global_data.chestsFound,
+            dungeons.total if dungeons is not None else 0,
+            *(dungeons.list.get(name, 0) if dungeons is not None else 0 for name in TRACKED_DUNGEONS.values()),
+            raids.total if raids is not None else 0,
+            *(raids.list.get(name, 0) if raids is not None else 0 for name in TRACKED_RAIDS.values()),
+            global_data.completedQuests,
+            global_data.pvp.kills,
+            global_data.pvp.deaths,
+        )
+
+
+@dataclass(frozen=True, slots=True)
 class GuildStats(JsonableDataclass):
     uuid: str
     name: str
@@ -62,15 +169,15 @@ class GuildStats(JsonableDataclass):
     wars: int
     created: str
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class MemberList(JsonableDataclass):
         total: int
 
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class GuildMember(JsonableDataclass):
             username: str
             online: bool
-            server: str | None
+            server: str | None = interned()
             contributed: int
             contributionRank: int
             joined: str
@@ -90,7 +197,7 @@ class GuildStats(JsonableDataclass):
     online: int
     banner: dict
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class SeasonRank(JsonableDataclass):
         rating: int
         finalTerritories: int
@@ -98,18 +205,18 @@ class GuildStats(JsonableDataclass):
     seasonRanks: dict[str, SeasonRank]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Territory(JsonableDataclass):
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Guild(JsonableDataclass):
-        uuid: str
-        name: str
-        prefix: str
+        uuid: str = interned()
+        name: str = interned()
+        prefix: str = interned()
 
     guild: Guild
     acquired: str
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Location(JsonableDataclass):
         start: Point2D
         end: Point2D
@@ -117,9 +224,9 @@ class Territory(JsonableDataclass):
     location: Location
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CharacterStats(JsonableDataclass):
-    type: str
+    type: str = interned()
     nickname: str
     level: int
     xp: int
@@ -135,48 +242,48 @@ class CharacterStats(JsonableDataclass):
     deaths: int
     discoveries: int
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Pvp(JsonableDataclass):
         kills: int
         deaths: int
 
     pvp: Pvp
-    gamemode: list[str]
-    skillPoints: dict[str, int]
+    gamemode: list[str] = interned()
+    skillPoints: dict[str, int] = interned()
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Profession(JsonableDataclass):
         level: int
         xpPercent: int
 
-    professions: dict[str, Profession]
+    professions: dict[str, Profession] = interned()
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Dungeons(JsonableDataclass):
         total: int
-        list: dict[str, int]  # dungeon name: completions
+        list: dict[str, int] = interned()  # dungeon name: completions
 
     dungeons: Dungeons
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Raids(JsonableDataclass):
         total: int
-        list: dict[str, int]  # raid name: completions
+        list: dict[str, int] = interned()  # raid name: completions
 
     raids: Raids
     quests: list[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlayerStats(JsonableDataclass):
     username: str
     online: bool
-    server: str
+    server: str = interned()
     uuid: str
-    rank: str
-    rankBadge: str  # URL to the badge SVG in the Wynncraft CDN (only path)
+    rank: str = interned()
+    rankBadge: str = interned()  # URL to the badge SVG in the Wynncraft CDN (only path)
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class LegacyRankColour(JsonableDataclass):
         def __init__(self, main=None, sub=None, color=None):
             if color is None:
@@ -190,45 +297,45 @@ class PlayerStats(JsonableDataclass):
         sub: str
 
     legacyRankColour: LegacyRankColour
-    shortenedRank: str
-    supportRank: str
+    shortenedRank: str = interned()
+    supportRank: str = interned()
     firstJoin: str
     lastJoin: str
     playtime: float
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Guild(JsonableDataclass):
-        uuid: str
-        name: str
-        prefix: str
-        rank: str
-        rankStars: str
+        uuid: str = interned()
+        name: str = interned()
+        prefix: str = interned()
+        rank: str = interned()
+        rankStars: str = interned()
 
     guild: Guild
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class GlobalData(JsonableDataclass):
         wars: int
         totalLevel: int
         killedMobs: int
         chestsFound: int
 
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class Dungeons(JsonableDataclass):
             total: int
-            list: dict[str, int]  # dungeon name: completions
+            list: dict[str, int] = interned()  # dungeon name: completions
 
         dungeons: Dungeons
 
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class Raids(JsonableDataclass):
             total: int
-            list: dict[str, int]  # raid name: completions
+            list: dict[str, int] = interned()  # raid name: completions
 
         raids: Raids
         completedQuests: int
 
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class Pvp(JsonableDataclass):
             kills: int
             deaths: int
@@ -238,14 +345,14 @@ class PlayerStats(JsonableDataclass):
     globalData: GlobalData
 
     forumLink: int
-    ranking: dict[str, int]  # ranking type: rank
+    ranking: dict[str, int] = interned()  # ranking type: rank
     publicProfile: bool
     characters: dict[str, CharacterStats]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CharacterShort(JsonableDataclass):
-    type: str
+    type: str = interned()
     nickname: str
     level: int
     xp: int
@@ -254,22 +361,22 @@ class CharacterShort(JsonableDataclass):
     gamemode: list[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AbilityMap(JsonableDataclass):
     pages: int
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class AbilityMapPiece(JsonableDataclass):
         type: str
 
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class Coordinates(JsonableDataclass):
             x: int
             y: int
 
         coordinates: Coordinates
 
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class Meta(JsonableDataclass):
             icon: str  # Minecraft legacy item id e.g. 275:67
             page: int
@@ -281,22 +388,22 @@ class AbilityMap(JsonableDataclass):
     map: list[AbilityMapPiece]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AbilityNode(JsonableDataclass):
     type: str
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Coordinates(JsonableDataclass):
         x: int
         y: int
 
     coordinates: Coordinates
 
-    @dataclass(frozen=True)
+    @dataclass(frozen=True, slots=True)
     class Meta(JsonableDataclass):
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class Icon(JsonableDataclass):
-            @dataclass(frozen=True)
+            @dataclass(frozen=True, slots=True)
             class IconValue(JsonableDataclass):
                 id: str
                 name: str
@@ -0,0 +1,223 @@
+import asyncio
+import collections
+import functools
+import inspect
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Awaitable, TypeVar, Hashable
+
+T = TypeVar("T")
+
+_ATOMIC_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Estimate the memory in bytes retained by an object, including everything it references.
+    Objects referenced multiple times are only counted once.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+
+        if isinstance(o, _ATOMIC_TYPES) or isinstance(o, type):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        else:
+            if hasattr(o, "__dict__"):
+                stack.append(o.__dict__)
+            for cls in type(o).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(o, slot):
+                        stack.append(getattr(o, slot))
+    return size
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    name: str
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    max_bytes: int | None
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class _Entry:
+    __slots__ = ("value", "expiry", "size")
+
+    def __init__(self, value, expiry: float, size: int):
+        self.value = value
+        self.expiry = expiry
+        self.size = size
+
+
+class AsyncCache:
+    def __init__(self, func: Callable[..., Awaitable[T]], name: str, ttl: float | None, maxsize: int | None,
+                 max_bytes: int | None, fallback_keys: Callable[[dict[str, Any]], list[dict[str, Any]]] | None):
+        """
+        A least recently used cache of the results of a coroutine function, see cached.
+        """
+        self.func = func
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._signature = inspect.signature(func)
+        self._fallback_keys = fallback_keys
+        self._entries: collections.OrderedDict[Hashable, _Entry] = collections.OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _arguments(self, args: tuple, kwargs: dict) -> dict[str, Any]:
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return bound.arguments
+
+    @staticmethod
+    def _key(arguments: dict[str, Any]) -> Hashable:
+        return tuple(arguments.items())
+
+    def _get(self, key: Hashable) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expiry < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _put(self, key: Hashable, value):
+        if key in self._entries:
+            self._remove(key)
+
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = _Entry(value, expiry, size)
+        self._bytes += size
+
+        while self._entries and ((self.maxsize is not None and len(self._entries) > self.maxsize)
+                                 or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def _load(self, key: Hashable, arguments: dict[str, Any]):
+        value = await self.func(**arguments)
+        self._put(key, value)
+        return value
+
+    def _load_done(self, key: Hashable, fut: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if not fut.cancelled():
+            # Retrieve the exception in case all callers were cancelled
+            fut.exception()
+
+    async def __call__(self, *args, **kwargs):
+        arguments = self._arguments(args, kwargs)
+        key = self._key(arguments)
+
+        entry = self._get(key)
+        if entry is None and self._fallback_keys is not None:
+            for alt in self._fallback_keys(arguments):
+                entry = self._get(self._key(alt))
+                if entry is not None:
+                    break
+        if entry is not None:
+            self.hits += 1
+            return entry.value
+
+        fut = self._in_flight.get(key)
+        if fut is None:
+            self.misses += 1
+            fut = asyncio.ensure_future(self._load(key, arguments))
+            self._in_flight[key] = fut
+            fut.add_done_callback(functools.partial(self._load_done, key))
+        else:
+            self.hits += 1
+
+        # Shield the shared request so a cancelled caller doesn't cancel it for the others
+        return await asyncio.shield(fut)
+
+    def cache_invalidate(self, *args, **kwargs) -> bool:
+        """
+        Remove the cached result of the arguments.
+
+        :return: True if a result was removed.
+        """
+        key = self._key(self._arguments(args, kwargs))
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def cache_clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.name, len(self._entries), self._bytes, self.hits, self.misses, self.evictions,
+                          self.maxsize, self.max_bytes)
+
+
+_caches: list[AsyncCache] = []
+
+
+def cached(ttl: float | None = None, maxsize: int | None = 128, max_bytes: int | None = None,
+           fallback_keys: Callable[[dict[str, Any]], list[dict[str, Any]]] = None, name: str = None):
+    """
+    Cache the results of a coroutine function. Calls with the same arguments share a single in-flight request and
+    exceptions aren't cached. Once a bound is exceeded the least recently used results are evicted.
+
+    :param ttl: The time in seconds results are cached for. None caches until evicted.
+    :param maxsize: The maximum amount of cached results. None for no limit.
+    :param max_bytes: The maximum estimated memory usage of the cached results (see estimate_size). None for no limit.
+    :param fallback_keys: Maps the arguments of a call (with defaults applied) to other arguments whose cached
+     result can be returned instead if the call itself isn't cached. E.g. a result that includes more data.
+    :param name: The name of the cache shown in the statistics. Defaults to the qualified name of the function.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> AsyncCache:
+        c = AsyncCache(func, name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}", ttl, maxsize,
+                       max_bytes, fallback_keys)
+        functools.update_wrapper(c, func)
+        _caches.append(c)
+        return c
+
+    return decorator
+
+
+def get_all_stats() -> list[CacheStats]:
+    """
+    Get the statistics of all caches created with cached.
+    """
+    return [c.stats() for c in _caches]
@@ -1,5 +1,6 @@
 import asyncio
 
+import aiohttp
 from async_lru import alru_cache
 
 import common.api.minecraft
@@ -9,7 +10,7 @@ from common.types.dataTypes import MinecraftPlayer
 
 
 async def _get_and_store_from_api(*, uuid: str = None, username: str = None) -> MinecraftPlayer | None:
-    p = await common.api.minecraft.get_player(uuid=uuid, username=username)
+    p = await common.api.minecraft.resolve_player(uuid=uuid, username=username)
     if p is not None:
         await common.storage.usernameData.update(*p)
     return p
@@ -24,10 +25,31 @@ async def get_player(*, uuid: str = None, username: str = None) -> MinecraftPlay
     return await _get_and_store_from_api(uuid=uuid, username=username)
 
 
-# TODO improve
+# Bound the amount of single lookups running at once so large uncached lists don't burst the player apis
+_lookup_semaphore = asyncio.Semaphore(10)
+
+
+async def _get_and_store_bounded(*, uuid: str = None, username: str = None) -> MinecraftPlayer | None:
+    async with _lookup_semaphore:
+        return await _get_and_store_from_api(uuid=uuid, username=username)
+
+
+async def _get_and_store_by_name(username: str) -> MinecraftPlayer | None:
+    try:
+        p = await common.api.minecraft.lookup_name(username)
+    except (aiohttp.ClientError, common.api.rateLimit.RateLimitException):
+        # Bulk lookups unavailable, fall back to single lookups
+        return await _get_and_store_bounded(username=username)
+
+    if p is not None:
+        await common.storage.usernameData.update(*p)
+    return p
+
+
 async def get_players(*, uuids: list[str] = None, usernames: list[str] = None) -> list[MinecraftPlayer]:
     """
     Get a list of players by uuids and names.
+    Unknown names are resolved with batched bulk lookups, unknown uuids with single lookups.
 
     :return: A list containing all players that were found.
     """
@@ -45,15 +67,12 @@ async def get_players(*, uuids: list[str] = None, usernames: list[str] = None) -
     unkown_uuids = set(uuids) - known_uuids
     unknown_names = set(usernames) - known_names
 
-    if len(unkown_uuids) + len(unknown_names) > common.api.minecraft.calculate_remaining_calls():
+    if len(unkown_uuids) > common.api.minecraft.calculate_remaining_lookups():
         raise common.api.rateLimit.RateLimitException("API usage would exceed ratelimit!")
 
-    if len(unkown_uuids) > 0:
-        stored += [p for p in (await asyncio.gather(*(_get_and_store_from_api(uuid=uuid) for uuid in unkown_uuids))) if
-                   p is not None]
-    if len(unknown_names) > 0:
-        stored += [p for p in
-                   (await asyncio.gather(*(_get_and_store_from_api(username=name) for name in unknown_names))) if
-                   p is not None]
+    found = await asyncio.gather(
+        *(_get_and_store_bounded(uuid=uuid) for uuid in unkown_uuids),
+        *(_get_and_store_by_name(name) for name in unknown_names)
+    )
 
-    return stored
\ No newline at end of file
+    return stored + [p for p in found if p is not None]
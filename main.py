@@ -7,12 +7,12 @@ import common.api.sessionManager
 import common.logging
 import common.storage.manager
 import common.storage.playtimeData
-import workers.guildUpdater
+import workers.eventBridge
 import workers.playtimeTracker
 import workers.presenceUpdater
-import workers.statTracker
-import workers.usernameUpdater
+import workers.tracking
 import workers.guildIndexer
+import workers.onlineTracker
 from common.commands.hybrid import *
 from common.commands.prefixed import *
 from dotenv import load_dotenv
@@ -30,6 +30,7 @@ def add_commands(bot):
     bot.add_commands(
         ActivityCommand(),
         ConfigCommand(),
+        DebugCommand(),
         EvalCommand(),
         PlaytimeCommand(),
         SeenCommand(),
@@ -54,23 +55,26 @@ class MewoBot(BotInstance):
 
 def start_workers():
     common.logging.info("Starting workers...")
-    workers.playtimeTracker.update_playtimes.start()
-    workers.presenceUpdater.update_presence.start()
-    workers.guildUpdater.guild_updater.start()
-    workers.usernameUpdater.start()
-    workers.statTracker.start()
+    workers.presenceUpdater.start()
     workers.guildIndexer.update_index.start()
     common.logging.info("Guild indexer started.")
+    if workers.eventBridge.tracking_enabled():
+        workers.tracking.start_tracking()
+    else:
+        common.logging.info("Tracking disabled, receiving guild events from the tracker process.")
+        workers.eventBridge.event_receiver.start()
+    workers.onlineTracker.start()
 
 
-def stop_workers():
+async def stop_workers():
     common.logging.info("Stopping workers...")
+    workers.onlineTracker.stop()
+    if workers.eventBridge.tracking_enabled():
+        await workers.tracking.stop_tracking()
+    else:
+        workers.eventBridge.event_receiver.stop()
     workers.guildIndexer.update_index.stop()
-    workers.statTracker.stop()
-    workers.usernameUpdater.stop()
-    workers.guildUpdater.guild_updater.stop()
-    workers.presenceUpdater.update_presence.stop()
-    workers.playtimeTracker.update_playtimes.stop()
+    workers.presenceUpdater.stop()
 
 
 async def main():
@@ -99,7 +103,8 @@ async def main():
             start_workers()
 
             today = datetime.now(timezone.utc).date()
-            if (await common.storage.playtimeData.get_first_date_after(today)) is None:
+            if (workers.eventBridge.tracking_enabled()
+                    and (await common.storage.playtimeData.get_first_date_after(today)) is None):
                 await workers.playtimeTracker.update_playtimes()
 
     except (KeyboardInterrupt, SystemExit, asyncio.CancelledError) as e:
@@ -108,7 +113,7 @@ async def main():
         common.logging.error(exc_info=e)
     finally:
         common.logging.info("Shutting down...")
-        stop_workers()
+        await stop_workers()
 
         await mewobot.close()
         await niabot.close()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from benchmarks import apiServer, replayServer
+from common.api import apiRecorder, minecraft, negativeCache, sessionManager
+from common.api.wynncraft.v3 import guild, player
+from common.types.enums import PlayerIdentifier
+
+
+async def _start(app: web.Application) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+async def _requests() -> tuple:
+    online = await player.player_list(PlayerIdentifier.UUID)
+    uuid = sorted(online)[0]
+    stats = await player.stats(uuid)
+    try:
+        await guild.stats(name="Not a guild")
+        missing_guild = False
+    except guild.UnknownGuildException:
+        missing_guild = True
+    mc_player = await minecraft.get_player(uuid=uuid, use_mojang=True)
+    return online, stats, missing_guild, mc_player
+
+
+class TestApiRecorder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "recording.jsonl.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _clear_caches(self):
+        player.stats.cache_clear()
+        guild.stats.cache_clear()
+        player._online_players.cache_clear()
+        negativeCache._cache.clear()
+
+    async def _run(self, app: web.Application, **env: str) -> tuple:
+        self._clear_caches()
+        runner, url = await _start(app)
+        try:
+            with mock.patch.dict(os.environ, {"API_OVERRIDE_URL": url, **env}):
+                await sessionManager.init_sessions()
+                try:
+                    return await _requests()
+                finally:
+                    await sessionManager.close()
+        finally:
+            await runner.cleanup()
+
+    async def test_record_and_replay(self):
+        recorded = await self._run(apiServer.create_app(apiServer.WorldConfig(players=100, guilds=5)),
+                                   API_RECORD_FILE=self.path)
+        self.assertFalse(apiRecorder.is_recording())
+
+        records = apiRecorder.load(self.path)
+        self.assertEqual([r["status"] for r in records], [200, 200, 404, 200])
+        self.assertIn("x-ratelimit-remaining-minute", records[1]["headers"])
+
+        replay = replayServer.create_app(records, replayServer.ReplayConfig(sequential=True))
+        self.assertEqual(await self._run(replay), recorded)
+
+    def test_replay_clock(self):
+        records = [{"t": t, "latency": 0, "method": "GET", "url": "http://x/v3/player?identifier=uuid", "status": 200,
+                    "headers": {}, "body": str(t)} for t in (0, 10, 20)]
+        replay = replayServer.Replay(records, replayServer.ReplayConfig(speed=100))
+        key = replayServer.request_key("GET", "/v3/player?identifier=uuid")
+
+        self.assertEqual(replay.find(key)["t"], 0)
+        with mock.patch("time.monotonic", return_value=replay._start + 0.15):
+            self.assertEqual(replay.find(key)["t"], 10)
+        with mock.patch("time.monotonic", return_value=replay._start + 1):
+            self.assertEqual(replay.find(key)["t"], 20)
+        self.assertIsNone(replay.find(replayServer.request_key("GET", "/v3/guild/x")))
@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from common.api import minecraft, negativeCache, retryPolicy
+from common.types.dataTypes import MinecraftPlayer
+
+_PLAYER = MinecraftPlayer("069a79f444e94726a5befca90e38aaf5", "Notch")
+
+
+def _fake_api(playerdb_delay: float, mojang_delay: float, playerdb_result=_PLAYER, mojang_result=_PLAYER):
+    calls = {"playerdb": 0, "mojang": 0, "cancelled": 0}
+
+    async def get_player(uuid, username, use_mojang, latencies):
+        name = "mojang" if use_mojang else "playerdb"
+        calls[name] += 1
+        try:
+            await asyncio.sleep(mojang_delay if use_mojang else playerdb_delay)
+        except asyncio.CancelledError:
+            calls["cancelled"] += 1
+            raise
+        finally:
+            latencies.append(0)
+        res = mojang_result if use_mojang else playerdb_result
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+    return get_player, calls
+
+
+class TestResolvePlayer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        retryPolicy._breakers.clear()
+        negativeCache._cache.clear()
+        for p in minecraft._providers:
+            p._latencies.clear()
+        self.hedge_delay = mock.patch.object(minecraft._Provider, "DEFAULT_HEDGE_DELAY", 0.05)
+        self.hedge_delay.start()
+
+    def tearDown(self):
+        self.hedge_delay.stop()
+
+    async def test_primary_wins(self):
+        fake, calls = _fake_api(0, 1)
+        with mock.patch.object(minecraft, "_get_player", fake):
+            self.assertEqual(await minecraft.resolve_player(username="Notch"), _PLAYER)
+        self.assertEqual(calls, {"playerdb": 1, "mojang": 0, "cancelled": 0})
+
+    async def test_hedge_wins_and_loser_is_cancelled(self):
+        fake, calls = _fake_api(1, 0)
+        with mock.patch.object(minecraft, "_get_player", fake):
+            self.assertEqual(await minecraft.resolve_player(username="Notch"), _PLAYER)
+            await asyncio.sleep(0)
+        self.assertEqual(calls, {"playerdb": 1, "mojang": 1, "cancelled": 1})
+        # The latency of the cancelled request is recorded too
+        self.assertEqual([len(p._latencies) for p in minecraft._providers], [1, 1])
+
+    async def test_failover(self):
+        fake, calls = _fake_api(0, 0, playerdb_result=aiohttp.ServerDisconnectedError())
+        with mock.patch.object(minecraft, "_get_player", fake):
+            self.assertEqual(await minecraft.resolve_player(uuid=_PLAYER.uuid), _PLAYER)
+        self.assertEqual(calls["mojang"], 1)
+
+    async def test_not_found(self):
+        fake, calls = _fake_api(0, 0, playerdb_result=None)
+        with mock.patch.object(minecraft, "_get_player", fake):
+            self.assertIsNone(await minecraft.resolve_player(username="Notch"))
+            self.assertIsNone(await minecraft.resolve_player(username="notch"))
+            self.assertIsNone(await minecraft.get_player(username="Notch"))
+        self.assertEqual(calls, {"playerdb": 1, "mojang": 0, "cancelled": 0})
+
+    async def test_rejected_not_recorded(self):
+        provider = minecraft._providers[0]
+        breaker = retryPolicy.get_breaker(provider.host)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        provider._latencies.extend([0.5] * provider.MIN_SAMPLES)
+
+        with mock.patch.object(minecraft.sessionManager, "get_session"):
+            with self.assertRaises(retryPolicy.CircuitOpenException):
+                await provider.get_player(None, "Notch")
+        self.assertEqual(list(provider._latencies), [0.5] * provider.MIN_SAMPLES)
+
+    async def test_all_failed(self):
+        fake, _ = _fake_api(0, 0, playerdb_result=aiohttp.ServerDisconnectedError(),
+                            mojang_result=aiohttp.ServerDisconnectedError())
+        with mock.patch.object(minecraft, "_get_player", fake):
+            with self.assertRaises(aiohttp.ServerDisconnectedError):
+                await minecraft.resolve_player(username="Notch")
+
+
+class TestLookupName(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        negativeCache._cache.clear()
+
+    async def test_batching(self):
+        requests = []
+
+        async def get_players(usernames):
+            requests.append(usernames)
+            return {name.capitalize(): MinecraftPlayer(f"uuid-{name}", name.capitalize())
+                    for name in usernames if name != "missing"}
+
+        names = [f"player{i}" for i in range(23)] + ["missing", "Player0"]
+        with mock.patch.object(minecraft, "get_players", get_players):
+            players = await asyncio.gather(*(minecraft.lookup_name(name) for name in names))
+
+        self.assertEqual([len(r) for r in requests], [10, 10, 4])
+        self.assertEqual(players[5], MinecraftPlayer("uuid-player5", "Player5"))
+        self.assertIsNone(players[23])
+        self.assertEqual(players[24], players[0])
+
+        with mock.patch.object(minecraft, "get_players", get_players):
+            self.assertIsNone(await minecraft.lookup_name("Missing"))
+        self.assertEqual(len(requests), 3)
+
+    async def test_errors_fan_out(self):
+        async def get_players(usernames):
+            raise aiohttp.ServerDisconnectedError()
+
+        with mock.patch.object(minecraft, "get_players", get_players):
+            res = await asyncio.gather(minecraft.lookup_name("a"), minecraft.lookup_name("b"), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, aiohttp.ServerDisconnectedError) for r in res))
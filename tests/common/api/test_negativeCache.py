@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+import aiohttp
+from multidict import CIMultiDict
+
+from common.api import negativeCache
+from common.api.wynncraft.v3 import guild
+
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = negativeCache.NegativeCache({"name": 60, "guild": 10, "tag": 10}, maxsize=3,
+                                                 case_sensitive=frozenset({"tag"}))
+
+    def test_contains(self):
+        self.assertFalse(self.cache.contains("name", "Notch"))
+        self.cache.add("name", "Notch")
+        self.assertTrue(self.cache.contains("name", "notch"))
+        self.assertFalse(self.cache.contains("guild", "notch"))
+
+        self.cache.discard("name", "NOTCH")
+        self.assertFalse(self.cache.contains("name", "Notch"))
+
+        stats = {s.kind: s for s in self.cache.stats()}
+        self.assertEqual((stats["name"].hits, stats["name"].misses), (1, 2))
+        self.assertAlmostEqual(stats["name"].hit_rate, 1 / 3)
+
+    def test_expiry(self):
+        with mock.patch("time.monotonic", return_value=100):
+            self.cache.add("guild", "Nerfuria")
+            self.cache.add("name", "Notch")
+        with mock.patch("time.monotonic", return_value=120):
+            self.assertFalse(self.cache.contains("guild", "Nerfuria"))
+            self.assertTrue(self.cache.contains("name", "Notch"))
+
+    def test_size_bound(self):
+        for name in ("a", "b", "c", "d"):
+            self.cache.add("name", name)
+        self.assertFalse(self.cache.contains("name", "a"))
+        self.assertTrue(self.cache.contains("name", "d"))
+        self.assertEqual(sum(s.size for s in self.cache.stats()), 3)
+
+    def test_case_sensitive(self):
+        self.cache.add("tag", "NIA")
+        self.assertTrue(self.cache.contains("tag", "NIA"))
+        self.assertFalse(self.cache.contains("tag", "Nia"))
+
+
+class TestGuildTags(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        negativeCache._cache.clear()
+
+    async def test_tags_differing_in_case(self):
+        async def get(url, **params):
+            if url == "/guild/prefix/NIA":
+                raise aiohttp.ClientResponseError(None, (), status=404, headers=CIMultiDict())
+            return {"name": "Nerfuria"}
+
+        with (mock.patch.object(guild.session, "get", get),
+              mock.patch.object(guild.GuildStats, "from_json", side_effect=lambda data: data["name"])):
+            with self.assertRaises(guild.UnknownGuildException):
+                await guild.fetch_stats(tag="NIA")
+            self.assertEqual(await guild.fetch_stats(tag="Nia"), "Nerfuria")
+            with self.assertRaises(guild.UnknownGuildException):
+                await guild.fetch_stats(tag="NIA")
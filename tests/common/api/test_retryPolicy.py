@@ -0,0 +1,107 @@
+import unittest
+
+import aiohttp
+from multidict import CIMultiDict
+
+from common.api import rateLimit, retryPolicy
+
+
+def _response_error(status: int, headers: dict = None) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status, headers=CIMultiDict(headers or {}))
+
+
+class _FlakyRequest:
+    def __init__(self, *errors: Exception, result=None):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+class TestRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        retryPolicy._breakers.clear()
+        self.policy = retryPolicy.RetryPolicy(max_tries=3, base_delay=0, max_retry_after=1)
+
+    async def test_retries_transient_errors(self):
+        request = _FlakyRequest(_response_error(524), aiohttp.ServerDisconnectedError(), result="ok")
+        self.assertEqual(await self.policy.call("example.com", request), "ok")
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(retryPolicy.get_breaker("example.com").failures, 0)
+
+    async def test_does_not_retry_client_errors(self):
+        request = _FlakyRequest(_response_error(404), result="ok")
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await self.policy.call("example.com", request)
+        self.assertEqual(request.calls, 1)
+
+    async def test_retry_after(self):
+        request = _FlakyRequest(_response_error(503, {"Retry-After": "0"}), result="ok")
+        self.assertEqual(await self.policy.call("example.com", request), "ok")
+
+        request = _FlakyRequest(_response_error(429, {"Retry-After": "120"}), result="ok")
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await self.policy.call("example.com", request)
+        self.assertEqual(request.calls, 1)
+
+    async def test_rate_limit_per_attempt(self):
+        limit = rateLimit.RateLimit(2, 1)
+        request = _FlakyRequest(_response_error(503), _response_error(503), result="ok")
+        with self.assertRaises(rateLimit.RateLimitException):
+            await self.policy.call("example.com", request, limit)
+        self.assertEqual(request.calls, 2)
+
+        # A host still responding with TOO_MANY_REQUESTS fills the rate limit
+        limit = rateLimit.RateLimit(10, 1)
+        request = _FlakyRequest(*(_response_error(429) for _ in range(3)))
+        with self.assertRaises(rateLimit.RateLimitException):
+            await self.policy.call("example.com", request, limit)
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(limit.calculate_remaining_calls(), 0)
+
+    async def test_retry_after_headers(self):
+        policy = retryPolicy.RetryPolicy(max_tries=3, base_delay=0, max_retry_after=1,
+                                         retry_after_headers=("Retry-After", "ratelimit-reset"))
+        request = _FlakyRequest(_response_error(429, {"ratelimit-reset": "120"}), result="ok")
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await policy.call("example.com", request)
+        self.assertEqual(request.calls, 1)
+
+        request = _FlakyRequest(_response_error(429, {"ratelimit-reset": "0"}), result="ok")
+        self.assertEqual(await policy.call("example.com", request), "ok")
+
+    async def test_circuit_breaker(self):
+        breaker = retryPolicy.get_breaker("down.example.com")
+        breaker.reset_timeout = 60
+        request = _FlakyRequest(*(aiohttp.ClientConnectionError() for _ in range(breaker.failure_threshold)))
+
+        for _ in range(breaker.failure_threshold):
+            try:
+                await self.policy.call("down.example.com", request)
+            except aiohttp.ClientError:
+                pass
+
+        self.assertEqual(request.calls, breaker.failure_threshold)
+        self.assertEqual(breaker.state, retryPolicy.CircuitBreaker.OPEN)
+        calls = request.calls
+        with self.assertRaises(retryPolicy.CircuitOpenException) as cm:
+            await self.policy.call("down.example.com", request)
+        self.assertEqual(request.calls, calls)
+        self.assertGreater(cm.exception.retry_after, 0)
+
+        # After the reset timeout a trial request closes the circuit again
+        breaker.reset_timeout = 0
+        self.assertEqual(breaker.state, retryPolicy.CircuitBreaker.HALF_OPEN)
+        self.assertIsNone(await self.policy.call("down.example.com", request))
+        self.assertEqual(breaker.state, retryPolicy.CircuitBreaker.CLOSED)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(retryPolicy.parse_retry_after("5"), 5)
+        self.assertEqual(retryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        self.assertIsNone(retryPolicy.parse_retry_after("soon"))
+        self.assertIsNone(retryPolicy.parse_retry_after(None))
@@ -0,0 +1,94 @@
+import os
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from benchmarks import apiServer
+from common.api import minecraft, sessionManager
+from common.api.wynncraft.v3 import guild, player
+from common.types.enums import PlayerIdentifier
+
+
+class TestSessionManager(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app = web.Application()
+        app.router.add_get("/ping", lambda r: web.json_response({"pong": True}))
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+
+        # Don't leave the test session registered for the other tests
+        self.registry = [mock.patch.dict(d) for d in (sessionManager._session_urls, sessionManager._session_profiles,
+                                                       sessionManager._session_stats)]
+        for patch in self.registry:
+            patch.start()
+        self.session_id = sessionManager.register_session(
+            f"http://127.0.0.1:{port}",
+            sessionManager.PoolProfile(limit=2, keepalive_timeout=30, total_timeout=5)
+        )
+        await sessionManager.init_sessions()
+
+    async def asyncTearDown(self):
+        await sessionManager.close()
+        for patch in self.registry:
+            patch.stop()
+        await self.runner.cleanup()
+
+    async def test_stats(self):
+        session = sessionManager.get_session(self.session_id)
+        self.assertEqual(session.timeout.total, 5)
+
+        for _ in range(4):
+            async with session.get("/ping") as resp:
+                self.assertEqual(await resp.json(), {"pong": True})
+
+        stats = sessionManager.get_stats(self.session_id)
+        self.assertEqual(stats.requests, 4)
+        self.assertEqual(stats.in_flight, 0)
+        self.assertEqual(stats.new_connections, 1)
+        self.assertEqual(stats.reused_connections, 3)
+        self.assertEqual(stats.open_connections, 1)
+        self.assertAlmostEqual(stats.reuse_ratio, 0.75)
+        self.assertEqual(sum(stats.latency_histogram), 4)
+        self.assertIn(stats, sessionManager.get_all_stats())
+
+        await sessionManager.close()
+        self.assertEqual(stats.open_connections, 0)
+
+
+class TestApiOverride(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.runner = web.AppRunner(apiServer.create_app(apiServer.WorldConfig(players=200, guilds=10)))
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+
+        self.env = mock.patch.dict(os.environ, {"API_OVERRIDE_URL": f"http://127.0.0.1:{port}"})
+        self.env.start()
+        await sessionManager.init_sessions()
+
+    async def asyncTearDown(self):
+        await sessionManager.close()
+        self.env.stop()
+        await self.runner.cleanup()
+
+    async def test_standin_server(self):
+        online = await player.player_list(PlayerIdentifier.UUID)
+        self.assertEqual(len(online), 20)
+
+        uuid = next(iter(online))
+        stats = await player.stats(uuid)
+        self.assertEqual(stats.uuid, uuid)
+        self.assertTrue(stats.online)
+
+        guilds = await guild.list_guilds()
+        self.assertEqual(len(guilds), 10)
+        self.assertEqual((await guild.stats(name=guilds[0].name)).name, guilds[0].name)
+
+        players = await minecraft.get_players([stats.username, "not a player"])
+        self.assertEqual(list(players), [stats.username])
+        self.assertEqual((await minecraft.get_player(uuid=uuid)).name, stats.username)
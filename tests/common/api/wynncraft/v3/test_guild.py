@@ -60,3 +60,16 @@ class TestGuild(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(guilds), 0)
         print(guilds)
 
+
+class TestGuildDirectory(unittest.TestCase):
+    def test_find(self):
+        nerfuria = common.types.wynncraft.WynncraftGuild("Nerfuria", "Nia")
+        nia_lower = common.types.wynncraft.WynncraftGuild("Nia Fanclub", "NIA")
+        nia = common.types.wynncraft.WynncraftGuild("Nia", "Nif")
+        directory = guild.GuildDirectory([nerfuria, nia_lower, nia])
+
+        self.assertEqual(directory.find("nerfuria"), (nerfuria,))
+        self.assertEqual(directory.find("nia"), (nia, nerfuria, nia_lower))
+        self.assertEqual(directory.find("NIF"), (nia,))
+        self.assertEqual(directory.find("X"), ())
+        self.assertEqual(directory.get_by_name("NERFURIA"), nerfuria)
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import tests.test_main
+from common.storage import guildMembershipData
+
+
+class TestGuildMembershipData(tests.test_main.TempDatabaseTestCase):
+    async def test_membership_intervals(self):
+        t1 = datetime(2024, 1, 1)
+        t2 = datetime(2024, 2, 1)
+        t3 = datetime(2024, 3, 1)
+
+        self.assertFalse(await guildMembershipData.has_history("Test"))
+        joined, left = await guildMembershipData.sync_roster("Test", {"a": datetime(2023, 6, 1), "b": t1}, t1)
+        self.assertEqual((joined, left), ({"a", "b"}, set()))
+        self.assertTrue(await guildMembershipData.has_history("Test"))
+
+        joined, left = await guildMembershipData.sync_roster("Test", {"a": datetime(2023, 6, 1), "c": t2}, t2)
+        self.assertEqual((joined, left), ({"c"}, {"b"}))
+        # b rejoins
+        await guildMembershipData.sync_roster("Test", {"a": datetime(2023, 6, 1), "b": t3, "c": t2}, t3)
+
+        self.assertEqual(set(await guildMembershipData.get_members("Test", datetime(2023, 7, 1), datetime(2023, 8, 1))),
+                         {"a"})
+        self.assertEqual(set(await guildMembershipData.get_members("Test", datetime(2024, 2, 10), datetime(2024, 2, 20))),
+                         {"a", "c"})
+        self.assertEqual(await guildMembershipData.get_history("b"), [("Test", t1, t2), ("Test", t3, None)])
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import tests.test_main
+from common.storage import populationData
+
+
+class TestPopulationData(tests.test_main.TempDatabaseTestCase):
+    async def test_downsample(self):
+        await populationData.add_sample(datetime(2024, 1, 1, 10, 0, 30), 100, {"WC1": 60, "WC2": 40})
+        await populationData.add_sample(datetime(2024, 1, 1, 10, 1, 10), 120, {"WC1": 80, "WC3": 40})
+        await populationData.add_sample(datetime(2024, 1, 1, 11, 5), 50, {"WC1": 50})
+
+        # Only the complete hour is downsampled
+        replaced = await populationData.downsample(populationData.MINUTE, populationData.HOUR,
+                                                   datetime(2024, 1, 1, 11, 30))
+        self.assertEqual(replaced, 2)
+
+        samples = await populationData.get_samples(datetime(2024, 1, 1), datetime(2024, 1, 2))
+        self.assertEqual(samples, [
+            populationData.PopulationSample(datetime(2024, 1, 1, 10), populationData.HOUR, 110,
+                                            {"WC1": 70, "WC2": 20, "WC3": 20}),
+            populationData.PopulationSample(datetime(2024, 1, 1, 11, 5), populationData.MINUTE, 50, {"WC1": 50}),
+        ])
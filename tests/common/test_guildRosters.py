@@ -0,0 +1,45 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from common import guildRosters
+
+
+def _member(username: str, server: str = None) -> SimpleNamespace:
+    return SimpleNamespace(username=username, online=server is not None, server=server)
+
+
+def _guild(name: str) -> SimpleNamespace:
+    members = {rank: {} for rank in guildRosters.RANKS}
+    members["owner"] = {"0000-AA": _member("Owner", "WC1")}
+    members["recruit"] = {"0000-BB": _member("Recruit"), "0000-CC": _member("Other", "WC2")}
+    return SimpleNamespace(name=name, members=SimpleNamespace(**members))
+
+
+class TestGuildRosters(unittest.IsolatedAsyncioTestCase):
+    def test_roster(self):
+        roster = guildRosters.GuildRoster.from_stats(_guild("Test"))
+
+        self.assertEqual(roster.uuids, {"0000aa", "0000bb", "0000cc"})
+        self.assertIn("0000-AA", roster)
+        self.assertEqual(roster.rank("0000-BB"), "recruit")
+        self.assertEqual(roster.usernames["0000cc"], "Other")
+        self.assertEqual(roster.online, {"0000aa": "WC1", "0000cc": "WC2"})
+
+    async def test_fetch(self):
+        tracked = _guild("Tracked")
+        guildRosters.update("Tracked", tracked)
+        other = _guild("Other")
+
+        with mock.patch("common.api.wynncraft.v3.guild.stats", new_callable=mock.AsyncMock,
+                        return_value=other) as stats:
+            self.assertIs(await guildRosters.fetch("Tracked"), guildRosters.get("Tracked"))
+            stats.assert_not_called()
+
+            roster = await guildRosters.fetch("Other")
+            # Not indexed again while the cached stats are the same
+            self.assertIs(await guildRosters.fetch("Other"), roster)
+            self.assertEqual(stats.call_count, 2)
+
+        guildRosters.remove("Tracked")
+        self.assertIsNone(guildRosters.get("Tracked"))
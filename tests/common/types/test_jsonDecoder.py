@@ -0,0 +1,47 @@
+import random
+import unittest
+
+from benchmarks import payloads
+from common.types import jsonDecoder
+from common.types.dataTypes import Point2D
+from common.types.wynncraft import PlayerStats, GuildStats, Territory, CharacterShort
+
+
+class TestJsonDecoder(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(0)
+
+    def test_player_stats(self):
+        for full_result in (False, True):
+            data = payloads.player_stats(self.rng, full_result=full_result, guild=("uuid", "Nerfuria", "Nia"))
+            stats = PlayerStats.from_json(data)
+            self.assertIsInstance(stats, PlayerStats)
+            self.assertIsInstance(stats.globalData, PlayerStats.GlobalData)
+            self.assertEqual(stats, jsonDecoder.decode_reflective(PlayerStats, data))
+
+    def test_guild_stats(self):
+        data = payloads.guild_stats(self.rng)
+        stats = GuildStats.from_json(data)
+        self.assertIsInstance(next(iter(stats.members.all.values())), GuildStats.MemberList.GuildMember)
+        self.assertEqual(stats, jsonDecoder.decode_reflective(GuildStats, data))
+
+    def test_territory(self):
+        data = payloads.territories(self.rng, [("uuid", "Nerfuria", "Nia")], amount=1)
+        territory = Territory.from_json(next(iter(data.values())))
+        self.assertIsInstance(territory.location.start, Point2D)
+
+    def test_conversions(self):
+        data = payloads.character_short(self.rng)
+        data["xp"] = None
+        data["level"] = "12"
+        character = CharacterShort.from_json(data)
+        self.assertIsNone(character.xp)
+        self.assertEqual(character.level, 12)
+
+        stats = jsonDecoder.decode(PlayerStats, {"playtime": 12, "guild": None})
+        self.assertIsInstance(stats.playtime, float)
+        self.assertIsNone(stats.guild)
+
+        self.assertEqual(jsonDecoder.decode(dict[str, int], {"a": 1}), {"a": 1})
+        self.assertEqual(jsonDecoder.decode(list[float], [1, 2.5]), [1.0, 2.5])
+        self.assertIs(jsonDecoder.get_decoder(PlayerStats), jsonDecoder.get_decoder(PlayerStats))
@@ -0,0 +1,54 @@
+import dataclasses
+import json
+import random
+import sys
+import unittest
+from datetime import datetime
+
+from benchmarks import payloads
+from common.types.wynncraft import PlayerStats, TrackedPlayerStats, GuildStats
+
+
+class TestTrackedPlayerStats(unittest.TestCase):
+    def test_projection_matches_full_decode(self):
+        rng = random.Random(1)
+        record_time = datetime(2024, 6, 1, 12, 30)
+        for guild in (None, ("uuid", "Nerfuria", "Nia")):
+            data = payloads.player_stats(rng, guild=guild)
+            projected = TrackedPlayerStats.from_stats_json(data, record_time)
+            decoded = TrackedPlayerStats.from_stats(PlayerStats.from_json(data), record_time)
+
+            self.assertEqual(projected, decoded)
+            self.assertEqual(projected.record_time, "2024-06-01 12:30:00")
+            self.assertNotIn("-", projected.uuid)
+
+    def test_missing_dungeons(self):
+        data = payloads.player_stats(random.Random(2))
+        data["globalData"]["dungeons"] = None
+        data["globalData"]["raids"] = None
+        projected = TrackedPlayerStats.from_stats_json(data, datetime(2024, 6, 1))
+
+        self.assertEqual(projected.dungeons_total, 0)
+        self.assertEqual(projected.raids_tna, 0)
+
+
+class TestGuildStats(unittest.TestCase):
+    def test_slots_and_asdict(self):
+        data = json.loads(json.dumps(payloads.guild_stats(random.Random(3))))
+        stats = GuildStats.from_json(data)
+        member = next(iter(stats.members.all.values()))
+
+        self.assertFalse(hasattr(stats, "__dict__"))
+        self.assertFalse(hasattr(member, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            stats.name = "X"
+
+        # guild rosters are stored via asdict and loaded again with from_json
+        self.assertEqual(GuildStats.from_json(json.loads(json.dumps(dataclasses.asdict(stats)))), stats)
+
+    def test_interned_strings(self):
+        rng = random.Random(4)
+        members = [GuildStats.from_json(json.loads(json.dumps(payloads.guild_stats(rng, member_count=50))))
+                   for _ in range(2)]
+        servers = [m.server for g in members for m in g.members.all.values() if m.server is not None]
+        self.assertIs(sys.intern(servers[0]), servers[0])
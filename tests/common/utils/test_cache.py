@@ -0,0 +1,84 @@
+import asyncio
+import random
+import unittest
+
+from benchmarks import payloads
+from common.types.wynncraft import PlayerStats
+from common.utils import cache
+
+
+class TestCache(unittest.IsolatedAsyncioTestCase):
+    async def test_lru_eviction(self):
+        calls = []
+
+        @cache.cached(maxsize=2)
+        async def f(x: int, y: int = 0):
+            calls.append(x)
+            return x + y
+
+        self.assertEqual(await f(1), 1)
+        self.assertEqual(await f(1, y=0), 1)
+        await f(2)
+        await f(1)
+        await f(3)  # evicts 2
+        await f(1)
+        await f(2)
+        self.assertEqual(calls, [1, 2, 3, 2])
+
+        stats = f.stats()
+        self.assertEqual((stats.entries, stats.hits, stats.misses, stats.evictions), (2, 3, 4, 2))
+
+    async def test_byte_budget(self):
+        @cache.cached(maxsize=None, max_bytes=2000)
+        async def f(n: int):
+            return "x" * n
+
+        await f(900)
+        await f(901)
+        self.assertEqual(f.stats().entries, 2)
+        await f(902)
+        self.assertEqual(f.stats().entries, 2)
+        self.assertLessEqual(f.stats().bytes, 2000)
+        self.assertTrue(f.cache_invalidate(902))
+        self.assertEqual(f.stats().entries, 1)
+
+    async def test_fallback_keys(self):
+        calls = []
+
+        @cache.cached(fallback_keys=lambda args: [] if args["full"] else [{**args, "full": True}])
+        async def f(x: int, full: bool = False):
+            calls.append((x, full))
+            return x, full
+
+        self.assertEqual(await f(1, full=True), (1, True))
+        self.assertEqual(await f(1), (1, True))
+        self.assertEqual(await f(2), (2, False))
+        self.assertEqual(await f(2, True), (2, True))
+        self.assertEqual(calls, [(1, True), (2, False), (2, True)])
+
+    async def test_shared_in_flight_request(self):
+        calls = []
+
+        @cache.cached()
+        async def f(x: int):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            if x < 0:
+                raise ValueError()
+            return x
+
+        self.assertEqual(await asyncio.gather(f(1), f(1), f(1)), [1, 1, 1])
+        self.assertEqual(calls, [1])
+
+        with self.assertRaises(ValueError):
+            await f(-1)
+        with self.assertRaises(ValueError):
+            await f(-1)
+        self.assertEqual(calls, [1, -1, -1])
+
+    def test_estimate_size(self):
+        rng = random.Random(0)
+        short = PlayerStats.from_json(payloads.player_stats(rng, full_result=False))
+        full = PlayerStats.from_json(payloads.player_stats(rng, full_result=True))
+        self.assertGreater(cache.estimate_size(short), 1000)
+        self.assertGreater(cache.estimate_size(full), 5 * cache.estimate_size(short))
@@ -1,6 +1,11 @@
+import os
+import tempfile
+import unittest
+
 import common.api.sessionManager
 import common.storage.manager
 
+
 async def start():
     await common.storage.manager.init_database()
     await common.api.sessionManager.init_sessions()
@@ -9,3 +14,16 @@ async def start():
 async def stop():
     await common.api.sessionManager.close()
     await common.storage.manager.close()
+
+
+class TempDatabaseTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    A test case with a new database in a temporary directory for each test.
+    """
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        await common.storage.manager.init_database(os.path.join(self.tmp.name, "test.db"))
+
+    async def asyncTearDown(self):
+        await common.storage.manager.close()
+        self.tmp.cleanup()
@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+
+from workers import eventBridge
+
+
+class _Logger:
+    def __init__(self):
+        self.events = []
+        self.received = asyncio.Event()
+
+    async def log_member_join(self, username: str, uuid: str):
+        self.events.append(("join", username, uuid))
+        self.received.set()
+
+    async def log_member_name_change(self, uuid: str, prev_name: str, new_name: str):
+        self.events.append(("name", uuid, prev_name, new_name))
+        self.received.set()
+
+
+class TestEventBridge(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        eventBridge._pending.clear()
+        eventBridge._receivers.clear()
+        eventBridge._loggers.clear()
+        self.added = {}
+        self.server = await eventBridge.start_server(lambda name, forwarder: self.added.update({name: forwarder}),
+                                                     port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_forwarding(self):
+        # Sent before the bot process connects
+        await eventBridge.EventForwarder("Nerfuria").log_member_join("Notch", "uuid-notch")
+        await eventBridge.EventForwarder("Other").log_member_join("jeb_", "uuid-jeb")
+
+        logger = _Logger()
+        eventBridge.add_logger("Nerfuria", logger)
+        receiver = asyncio.create_task(eventBridge.receive_events(port=self.port))
+
+        await asyncio.wait_for(logger.received.wait(), 5)
+        self.assertEqual(set(self.added), {"Nerfuria"})
+        logger.received.clear()
+
+        await self.added["Nerfuria"].log_member_name_change("uuid-notch", "Notch", "Notch2")
+        await asyncio.wait_for(logger.received.wait(), 5)
+
+        self.assertEqual(logger.events, [("join", "Notch", "uuid-notch"), ("name", "uuid-notch", "Notch", "Notch2")])
+        self.assertEqual(len(eventBridge._pending["Other"]), 1)
+
+        receiver.cancel()
@@ -0,0 +1,18 @@
+import unittest
+from unittest import mock
+
+from workers import guildCrawler
+
+
+class TestGuildCrawler(unittest.TestCase):
+    def test_crawl_interval(self):
+        self.assertEqual(guildCrawler.crawl_interval(0, 0), guildCrawler.MAX_INTERVAL)
+        self.assertLess(guildCrawler.crawl_interval(100, 0), guildCrawler.crawl_interval(10, 0))
+        self.assertLess(guildCrawler.crawl_interval(10, 3), guildCrawler.crawl_interval(10, 0))
+        self.assertEqual(guildCrawler.crawl_interval(150, 50), guildCrawler.MIN_INTERVAL)
+
+    def test_select_due(self):
+        with (mock.patch.object(guildCrawler, "_due", {"later": 200, "due": 50, "big": 50}),
+              mock.patch.object(guildCrawler, "_sizes", {"big": 100, "due": 10})):
+            self.assertEqual(guildCrawler.select_due(["later", "due", "big", "new"], 100, 10), ["new", "big", "due"])
+            self.assertEqual(guildCrawler.select_due(["later", "due", "big", "new"], 100, 2), ["new", "big"])
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import tests.test_main
+from common import guildRosters
+from common.storage import guildMemberData, guildMembershipData
+from workers import guildUpdater
+
+
+def _guild(**ranks) -> SimpleNamespace:
+    members = {rank: {} for rank in guildRosters.RANKS}
+    for rank, uuids in ranks.items():
+        members[rank] = {uuid: SimpleNamespace(username=uuid, online=False, server=None, joined=None) for uuid in uuids}
+    return SimpleNamespace(name="Test", members=SimpleNamespace(**members))
+
+
+class TestUpdateGuild(tests.test_main.TempDatabaseTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.logger = mock.AsyncMock()
+        guildUpdater.add_guild("Test", self.logger)
+
+    async def asyncTearDown(self):
+        guildUpdater.remove_guild("Test")
+        guildUpdater._rosters.pop("Test", None)
+        await super().asyncTearDown()
+
+    async def _update(self, guild_stats: SimpleNamespace):
+        with (mock.patch("common.api.wynncraft.v3.guild.stats", new_callable=mock.AsyncMock, return_value=guild_stats),
+              mock.patch.object(guildUpdater, "_get_players", new_callable=mock.AsyncMock,
+                                side_effect=lambda uuids: {uuid: f"name_{uuid}" for uuid in uuids}),
+              mock.patch.object(guildMemberData, "update_roster", wraps=guildMemberData.update_roster) as update):
+            await guildUpdater._update_guild("Test")
+        return update
+
+    async def test_roster_changes(self):
+        await self._update(_guild(owner=["A-A"], recruit=["b", "c"]))
+        self.logger.log_member_join.assert_not_called()
+        self.assertEqual(await guildMemberData.get_roster("Test"), {"aa": "owner", "b": "recruit", "c": "recruit"})
+
+        # Restart, the roster is loaded from the database
+        guildUpdater._rosters["Test"] = None
+        update = await self._update(_guild(owner=["aa"], captain=["b"], recruit=["d"]))
+
+        update.assert_called_once_with("Test", {"b": "captain", "d": "recruit"}, {"c"})
+        self.logger.log_member_join.assert_called_once_with("name_d", "d")
+        self.logger.log_member_leave.assert_called_once_with("name_c", "c")
+        self.assertEqual(await guildMemberData.get_roster("Test"), {"aa": "owner", "b": "captain", "d": "recruit"})
+        self.assertIn("d", guildUpdater.tracked_members())
+        self.assertEqual((await guildMembershipData.get_history("c"))[0][0], "Test")
+        self.assertIsNotNone((await guildMembershipData.get_history("c"))[0][2])
+
+    async def test_name_changes(self):
+        await self._update(_guild(owner=["a-a"]))
+        name_logger = guildUpdater.NameChangeLogger("Test")
+
+        await name_logger.name_changed("b", "old", "new")
+        self.logger.log_member_name_change.assert_not_called()
+        await name_logger.name_changed("A-A", "old", "new")
+        self.logger.log_member_name_change.assert_called_once_with("A-A", "old", "new")
@@ -0,0 +1,29 @@
+import asyncio
+import unittest
+
+from discord.ext import tasks
+
+from workers import loopStats
+
+
+class TestLoopStats(unittest.IsolatedAsyncioTestCase):
+    async def test_track_loop(self):
+        runs = 0
+
+        @tasks.loop(seconds=0.01, count=3)
+        async def loop():
+            nonlocal runs
+            runs += 1
+            if runs == 3:
+                raise ValueError()
+
+        loopStats.track_loop("test", loop)
+        task = loop.start()
+        with self.assertRaises(ValueError):
+            await asyncio.wait_for(task, 1)
+
+        stats = next(s for s in loopStats.get_all_stats() if s.name == "test")
+        self.assertFalse(stats.running)
+        self.assertEqual(stats.runs, 3)
+        self.assertEqual(stats.failures, {"ValueError": 1})
+        self.assertIsNotNone(stats.last_run)
@@ -0,0 +1,112 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import tests.test_main
+from common.storage import sessionData
+from common.types.enums import PlayerIdentifier
+from workers import onlineTracker
+
+_T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(uuids: list[str], minutes: float = 0) -> onlineTracker.OnlineSnapshot:
+    return onlineTracker.OnlineSnapshot(
+        time=_T0 + timedelta(minutes=minutes),
+        total=len(uuids),
+        uuids={uuid: "WC1" for uuid in uuids},
+        usernames={uuid.upper(): "WC1" for uuid in uuids},
+    )
+
+
+class _Recorder(onlineTracker.OnlineSubscriber):
+    def __init__(self, identifiers=frozenset({PlayerIdentifier.UUID}), restore=False):
+        self.identifiers = identifiers
+        self.restore = restore
+        self.diffs = []
+
+    async def online_changed(self, diff):
+        self.diffs.append(diff)
+
+
+class _Failing(onlineTracker.OnlineSubscriber):
+    async def online_changed(self, diff):
+        raise ValueError()
+
+
+class TestOnlineTracker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        onlineTracker._subscribers.clear()
+        onlineTracker._snapshot = None
+
+    def test_diff(self):
+        first = onlineTracker.compute_diff(None, _snapshot(["a", "b"]))
+        self.assertEqual(first.joined_uuids, {"a", "b"})
+        self.assertEqual(first.left_uuids, set())
+
+        diff = onlineTracker.compute_diff(first.snapshot, _snapshot(["b", "c"], 1))
+        self.assertEqual(diff.joined_uuids, {"c"})
+        self.assertEqual(diff.left_uuids, {"a"})
+        self.assertEqual(diff.joined_usernames, {"C"})
+        self.assertEqual(diff.left_usernames, {"A"})
+
+    def test_interval(self):
+        prev = _snapshot([str(i) for i in range(100)])
+        quiet = onlineTracker.compute_diff(prev, _snapshot([str(i) for i in range(100)], 1))
+        busy = onlineTracker.compute_diff(prev, _snapshot([str(i) for i in range(50, 150)], 1))
+        normal = onlineTracker.compute_diff(prev, _snapshot([str(i) for i in range(3, 103)], 1))
+
+        self.assertEqual(onlineTracker.next_interval(quiet, 100), onlineTracker.MAX_INTERVAL)
+        self.assertEqual(onlineTracker.next_interval(busy, 100), onlineTracker.MIN_INTERVAL)
+        self.assertAlmostEqual(onlineTracker.next_interval(normal, 100), 50)
+        self.assertEqual(onlineTracker.next_interval(busy, 0), onlineTracker.MAX_INTERVAL)
+
+    async def test_poll(self):
+        requested = []
+
+        async def player_list(identifier):
+            requested.append(identifier)
+            return {"a": "WC1"} if identifier == PlayerIdentifier.UUID else {"A": "WC1"}
+
+        uuids_only, with_names = _Recorder(), _Recorder(frozenset(PlayerIdentifier))
+        onlineTracker.subscribe(_Failing())
+        onlineTracker.subscribe(uuids_only)
+
+        with mock.patch.object(onlineTracker.common.api.wynncraft.v3.player, "player_list", player_list):
+            await onlineTracker._poll()
+            self.assertEqual(requested, [PlayerIdentifier.UUID])
+
+            onlineTracker.subscribe(with_names)
+            await onlineTracker._poll()
+            self.assertEqual(requested[1:], [PlayerIdentifier.UUID, PlayerIdentifier.USERNAME])
+
+        self.assertEqual(len(uuids_only.diffs), 2)
+        self.assertEqual(uuids_only.diffs[0].joined_uuids, {"a"})
+        self.assertEqual(uuids_only.diffs[1].joined_uuids, set())
+        self.assertEqual(with_names.diffs[0].joined_usernames, {"A"})
+        self.assertEqual(onlineTracker.latest().total, 1)
+
+
+class TestRestore(tests.test_main.TempDatabaseTestCase):
+    def setUp(self):
+        onlineTracker._subscribers.clear()
+        onlineTracker._restoring.clear()
+
+    async def test_restored_diff(self):
+        await sessionData.update_sessions({"aa": "WC1", "bb": "WC2"}, (), datetime(2024, 1, 1))
+        restoring, plain = _Recorder(restore=True), _Recorder()
+        onlineTracker.subscribe(restoring)
+        onlineTracker.subscribe(plain)
+
+        first = onlineTracker.compute_diff(None, _snapshot(["AA", "c"], 10))
+        await onlineTracker._publish(first)
+        await onlineTracker._publish(onlineTracker.compute_diff(first.snapshot, _snapshot(["c"], 11)))
+
+        restored = restoring.diffs[0]
+        self.assertTrue(restored.restored)
+        self.assertEqual(restored.prev.time, _T0)
+        self.assertEqual(restored.joined_uuids, {"c"})
+        self.assertEqual(restored.left_uuids, {"bb"})
+        self.assertFalse(restoring.diffs[1].restored)
+        self.assertEqual(restoring.diffs[1].left_uuids, {"AA"})
+        self.assertEqual(plain.diffs[0], first)
@@ -0,0 +1,37 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import tests.test_main
+from common.storage import playerTrackerData, playtimeData
+from common.types.wynncraft import TrackedPlayerStats
+from workers import playtimeTracker
+from workers.onlineTracker import OnlineSnapshot
+
+
+def _record(uuid: str, record_time: datetime, playtime: float) -> TrackedPlayerStats:
+    values = {f.name: None for f in TrackedPlayerStats.__dataclass_fields__.values()}
+    values.update(record_time=record_time.isoformat(" "), uuid=uuid, username=uuid, playtime=playtime)
+    return TrackedPlayerStats(**values)
+
+
+class TestUpdateGuild(tests.test_main.TempDatabaseTestCase):
+    async def test_playtimes_from_records(self):
+        day = date(2024, 1, 2)
+        await playerTrackerData.add_tracked_record(_record("recorded", datetime(2024, 1, 1, 10), 10))
+        await playerTrackerData.add_tracked_record(_record("recorded", datetime(2024, 1, 1, 20), 12.5))
+        await playerTrackerData.add_tracked_record(_record("outdated", datetime(2023, 12, 30, 20), 5))
+        await playerTrackerData.add_tracked_record(_record("online", datetime(2024, 1, 1, 20), 7))
+
+        roster = SimpleNamespace(uuids=frozenset({"recorded", "outdated", "online"}))
+        snapshot = OnlineSnapshot(time=datetime(2024, 1, 2), total=1, uuids={"online": "WC1"})
+
+        with (mock.patch("common.guildRosters.fetch", new_callable=mock.AsyncMock, return_value=roster),
+              mock.patch("workers.onlineTracker.latest", return_value=snapshot),
+              mock.patch.object(playtimeTracker._worker, "put") as put):
+            requested = await playtimeTracker._update_guild("Test", day)
+
+        self.assertEqual(requested, 2)
+        self.assertEqual({c.args[1] for c in put.call_args_list}, {"outdated", "online"})
+        self.assertEqual((await playtimeData.get_playtime("recorded", day)).playtime, 750)
+        self.assertIsNone(await playtimeData.get_playtime("outdated", day))
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import tests.test_main
+from common.storage import populationData
+from workers import onlineTracker, populationRecorder
+
+
+def _snapshot(age: timedelta) -> onlineTracker.OnlineSnapshot:
+    return onlineTracker.OnlineSnapshot(datetime.now(timezone.utc) - age, 3, {"a": "WC1", "b": "WC1", "c": "WC2"})
+
+
+class TestPopulationRecorder(tests.test_main.TempDatabaseTestCase):
+    async def _samples(self) -> list[populationData.PopulationSample]:
+        now = datetime.utcnow()
+        return await populationData.get_samples(now - timedelta(hours=1), now + timedelta(hours=1))
+
+    async def test_record(self):
+        # The snapshot of the previous poll is recorded again if the tracker didn't poll this minute
+        with mock.patch.object(onlineTracker, "latest", return_value=_snapshot(timedelta(seconds=100))):
+            await populationRecorder.record()
+
+        samples = await self._samples()
+        self.assertEqual(len(samples), 1)
+        self.assertEqual(samples[0].resolution, populationData.MINUTE)
+        self.assertEqual((samples[0].total, samples[0].worlds), (3, {"WC1": 2, "WC2": 1}))
+
+    async def test_no_snapshot(self):
+        with mock.patch.object(onlineTracker, "latest", return_value=None):
+            await populationRecorder.record()
+        with mock.patch.object(onlineTracker, "latest", return_value=_snapshot(timedelta(minutes=10))):
+            await populationRecorder.record()
+
+        self.assertEqual(await self._samples(), [])
@@ -0,0 +1,246 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import tests.test_main
+from common.api.rateLimit import RateLimit, RateLimitException
+from common.storage import taskQueueData
+from workers.queueWorker import QueueWorker, DurableQueueWorker, RetryLater, get_all_stats
+
+
+class TestQueueWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency(self):
+        worker = QueueWorker(concurrency=4)
+        running = 0
+        max_running = 0
+
+        async def task():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for _ in range(10):
+            worker.put(task)
+        worker.start()
+        await asyncio.wait_for(worker.join(), 1)
+        worker.stop()
+
+        self.assertEqual(max_running, 4)
+
+    async def test_rate_limit_pacing(self):
+        rate_limit = RateLimit(5, 1)
+        worker = QueueWorker(concurrency=3, rate_limit=rate_limit, min_remaining=2)
+        done = []
+
+        def task(i):
+            with rate_limit:
+                done.append(i)
+
+        for i in range(5):
+            worker.put(task, i)
+        with mock.patch.object(rate_limit, "get_time_until_next_free", return_value=0):
+            worker.start()
+            await asyncio.sleep(0.05)
+        worker.stop()
+
+        # Only the budget above min_remaining is used
+        self.assertEqual(len(done), 3)
+        self.assertEqual(worker.qsize(), 2)
+
+    async def test_running_tasks_reserve_calls(self):
+        rate_limit = RateLimit(5, 1)
+        worker = QueueWorker(concurrency=4, rate_limit=rate_limit, min_remaining=2)
+        done = []
+
+        async def task(i):
+            # Only uses the rate limit after the other consumers got their tasks
+            await asyncio.sleep(0.01)
+            with rate_limit:
+                done.append(i)
+
+        with mock.patch.object(rate_limit, "get_time_until_next_free", return_value=0):
+            worker.start()
+            await asyncio.sleep(0)
+            for i in range(5):
+                worker.put(task, i)
+            await asyncio.sleep(0.05)
+        worker.stop()
+
+        self.assertEqual(len(done), 3)
+        self.assertEqual(rate_limit.calculate_remaining_calls(), 2)
+
+    async def test_rate_limited_tasks_are_requeued(self):
+        calls = []
+
+        def task():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RateLimitException()
+
+        with mock.patch.object(QueueWorker, "DEFAULT_BACKOFF", {Exception: 0}):
+            worker = QueueWorker()
+            worker.put(task)
+            worker.start()
+            await asyncio.wait_for(worker.join(), 1)
+            worker.stop()
+
+        self.assertEqual(len(calls), 2)
+
+    async def test_backoff_per_error_class(self):
+        worker = QueueWorker(backoff={ValueError: 10, Exception: 1})
+
+        worker._on_error(ValueError())
+        worker._on_error(ValueError())
+        worker._on_error(KeyError())
+        self.assertEqual(worker._error_counts, {ValueError: 2, Exception: 1})
+
+        worker._on_success()
+        self.assertEqual(worker._error_counts, {ValueError: 1})
+
+        with mock.patch("time.monotonic", return_value=0):
+            worker._paused_until = 0
+            worker._on_error(ValueError())
+        self.assertEqual(worker._paused_until, 20)
+
+
+    async def test_stats(self):
+        worker = QueueWorker(backoff={ValueError: 0}, name="test")
+
+        def task(fail: bool):
+            if fail:
+                raise ValueError()
+
+        worker.put(task, False)
+        worker.put(task, True)
+        worker.put(task, False)
+        self.assertEqual(worker.stats().depth, 3)
+
+        with mock.patch("common.logging.error"):
+            worker.start()
+            await asyncio.wait_for(worker.join(), 1)
+        stats = worker.stats()
+        worker.stop()
+
+        self.assertEqual(stats.name, "test")
+        self.assertEqual(stats.depth, 0)
+        self.assertEqual(stats.oldest_age, 0.0)
+        self.assertEqual(stats.succeeded, 2)
+        self.assertEqual(stats.failures, {"ValueError": 1})
+        self.assertAlmostEqual(stats.throughput, 3 / 60)
+        self.assertIn(stats, get_all_stats())
+
+
+class TestDurableQueueWorker(tests.test_main.TempDatabaseTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.processed = []
+
+    async def _handler(self, key: str):
+        self.processed.append(key)
+        if key == "fails":
+            raise ValueError()
+
+    def _worker(self, **kwargs) -> DurableQueueWorker:
+        return DurableQueueWorker("test", self._handler, backoff={Exception: 0}, **kwargs)
+
+    async def test_dedup_and_restore(self):
+        worker = self._worker()
+        self.assertTrue(await worker.add("a"))
+        self.assertFalse(await worker.add("a"))
+        self.assertTrue(await worker.add("b"))
+
+        # Not processed before the restart
+        restarted = self._worker()
+        restarted.start()
+        await asyncio.sleep(0.01)
+        await restarted.drain(1)
+
+        self.assertEqual(self.processed, ["a", "b"])
+        self.assertEqual(await taskQueueData.get_all("test"), [])
+
+    async def test_add_many(self):
+        worker = self._worker(max_size=3, shed_oldest=True)
+        await worker.add("a")
+        self.assertEqual(await worker.add_many(["a", "b", "c", "b", "d"]), 3)
+        self.assertEqual(worker.shed, 1)
+        self.assertEqual([k for k, _ in await taskQueueData.get_all("test")], ["b", "c", "d"])
+
+        worker.start()
+        await worker.drain(1)
+        self.assertEqual(self.processed, ["b", "c", "d"])
+
+    async def test_load_shedding(self):
+        worker = self._worker(max_size=2)
+        await worker.add("a")
+        await worker.add("b")
+        self.assertFalse(await worker.add("c"))
+
+        shedding = self._worker(max_size=2, shed_oldest=True)
+        await shedding.add("a")
+        await shedding.add("b")
+        self.assertTrue(await shedding.add("c"))
+        self.assertEqual(shedding.shed, 1)
+        self.assertEqual([k for k, _ in await taskQueueData.get_all("test")], ["b", "c"])
+
+        shedding.start()
+        await shedding.drain(1)
+        self.assertEqual(self.processed, ["b", "c"])
+
+    async def test_attempts(self):
+        worker = self._worker(max_attempts=2)
+        await worker.add("fails")
+        worker.start()
+        await worker.drain(1)
+
+        self.assertEqual(self.processed, ["fails", "fails"])
+        self.assertEqual(await taskQueueData.get_all("test"), [])
+
+    async def test_shed_while_running(self):
+        async def handler(key: str):
+            self.processed.append(key)
+            if key == "a":
+                await shedding.add("b")
+                raise ValueError()
+
+        shedding = DurableQueueWorker("test", handler, max_size=1, shed_oldest=True, backoff={Exception: 0})
+        await shedding.add("a")
+        with mock.patch("common.logging.error") as error:
+            shedding.start()
+            await shedding.drain(1)
+
+        self.assertEqual(self.processed, ["a", "b"])
+        self.assertEqual(shedding.shed, 1)
+        error.assert_not_called()
+
+    async def test_retry_later(self):
+        async def handler(key: str):
+            self.processed.append(key)
+            if len(self.processed) == 1:
+                raise RetryLater(0.01)
+
+        worker = DurableQueueWorker("test", handler)
+        await worker.add("a")
+        worker.start()
+        await asyncio.sleep(0.05)
+        await worker.drain(1)
+
+        self.assertEqual(self.processed, ["a", "a"])
+
+    async def test_stop_cancels_retries(self):
+        async def handler(key: str):
+            self.processed.append(key)
+            raise RetryLater(10)
+
+        worker = DurableQueueWorker("test", handler)
+        await worker.add("a")
+        worker.start()
+        await asyncio.sleep(0.01)
+        delayed = set(worker._delayed_tasks)
+        await worker.drain(0.1)
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(delayed), 1)
+        self.assertTrue(all(task.cancelled() for task in delayed))
+        self.assertEqual(await taskQueueData.get_all("test"), [("a", 0)])
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+import tests.test_main
+from common.storage import sessionData
+from workers import sessionRecorder
+from workers.onlineTracker import OnlineSnapshot, compute_diff, restored_snapshot
+
+
+def _snapshot(minute: int, uuids: dict[str, str]) -> OnlineSnapshot:
+    return OnlineSnapshot(time=datetime(2024, 1, 1, 12, minute, tzinfo=timezone.utc), total=len(uuids), uuids=uuids)
+
+
+class TestSessionRecorder(tests.test_main.TempDatabaseTestCase):
+    async def _run(self, snapshots: list[OnlineSnapshot]):
+        recorder = sessionRecorder._SessionRecorder()
+        # The first diff after subscribing is restored from the open sessions
+        prev = await restored_snapshot(snapshots[0])
+        for i, snapshot in enumerate(snapshots):
+            await recorder.online_changed(compute_diff(prev, snapshot, restored=i == 0))
+            prev = snapshot
+
+    async def test_sessions(self):
+        await self._run([
+            _snapshot(0, {"0000-AA": "WC1"}),
+            _snapshot(1, {"0000-AA": "WC1", "BB": "WC2"}),
+            _snapshot(5, {"BB": "WC2", "CC": "WC3"}),
+        ])
+        # Restart, CC went offline while stopped
+        await self._run([_snapshot(30, {"BB": "WC2", "DD": "WC1"})])
+
+        t = lambda minute: datetime(2024, 1, 1, 12, minute)
+        self.assertEqual(await sessionData.get_sessions("0000aa"), [sessionData.PlaySession("0000aa", t(0), t(5), "WC1")])
+        self.assertEqual(await sessionData.get_sessions("cc"), [sessionData.PlaySession("cc", t(5), t(5), "WC3")])
+        self.assertEqual(set((await sessionData.get_open_sessions()).keys()), {"bb", "dd"})
+        self.assertEqual(await sessionData.get_last_seen("0000-AA"), t(5))
+
+        playtimes = await sessionData.get_playtimes(["0000aa", "bb"], t(0), t(10))
+        self.assertEqual(playtimes, {"0000aa": 300.0, "bb": 540.0})
@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import tests.test_main
+from common.storage import playerTrackerData, sessionData
+from common.types.wynncraft import TrackedPlayerStats
+from workers import statTracker
+from workers.onlineTracker import OnlineSnapshot, compute_diff, restored_snapshot
+
+
+class TestSelectSnapshots(unittest.TestCase):
+    def test_priority_and_budget(self):
+        now = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        last_recorded = {
+            "recent": now - timedelta(hours=1),
+            "old": now - timedelta(hours=10),
+            "older": now - timedelta(hours=11),
+            "0000-AB": now - timedelta(hours=7),
+        }
+
+        self.assertEqual(statTracker.select_snapshots(last_recorded, now, {"0000ab"}, 10), ["0000-AB", "older", "old"])
+        self.assertEqual(statTracker.select_snapshots(last_recorded, now, set(), 2), ["older", "old"])
+        self.assertEqual(statTracker.select_snapshots(last_recorded, now, set(), -5), [])
+
+
+class TestRestore(tests.test_main.TempDatabaseTestCase):
+    async def test_missed_leaves(self):
+        then = datetime(2024, 1, 1)
+        now = datetime(2024, 1, 1, 6, tzinfo=timezone.utc)
+        await sessionData.update_sessions({"stayed": "WC1", "recorded": "WC1", "left": "WC1"}, (), then)
+        values = {f.name: None for f in TrackedPlayerStats.__dataclass_fields__.values()}
+        values.update(record_time=datetime(2024, 1, 1, 2).isoformat(" "), uuid="recorded", username="recorded")
+        await playerTrackerData.add_tracked_record(TrackedPlayerStats(**values))
+
+        snapshot = OnlineSnapshot(time=now, total=3, uuids={"stayed": "WC1", "recorded": "WC2", "joined": "WC2"})
+        diff = compute_diff(await restored_snapshot(snapshot), snapshot, restored=True)
+        added = []
+        with mock.patch.object(statTracker._worker, "add_many", side_effect=lambda uuids: added.extend(uuids)):
+            await statTracker._restore(diff)
+
+        self.assertEqual(added, ["left"])
+        self.assertEqual(statTracker._last_recorded, {
+            "stayed": then.replace(tzinfo=timezone.utc),
+            "recorded": datetime(2024, 1, 1, 2, tzinfo=timezone.utc),
+            "joined": now,
+        })
@@ -0,0 +1,52 @@
+from datetime import datetime
+from unittest import mock
+
+import tests.test_main
+from common.storage import territoryData
+from common.types.wynncraft import Territory
+from workers import territoryTracker
+
+
+def _territory(guild: str | None, acquired: str = "2024-01-01T12:00:00.000Z") -> Territory:
+    return Territory.from_json({
+        "guild": {"uuid": None, "name": guild, "prefix": None} if guild is not None else None,
+        "acquired": acquired,
+        "location": {"start": [0, 0], "end": [1, 1]},
+    })
+
+
+class TestTerritoryTracker(tests.test_main.TempDatabaseTestCase):
+    async def asyncTearDown(self):
+        territoryTracker._owners = None
+        territoryTracker._counts.clear()
+        await super().asyncTearDown()
+
+    def test_compute_captures(self):
+        now = datetime(2024, 1, 2)
+        captures = territoryTracker.compute_captures(
+            {"Kept": "A", "Taken": "A"},
+            {"Kept": _territory("A"), "Taken": _territory("B"), "New": _territory("C", acquired=None)},
+            now)
+
+        self.assertEqual(captures, [
+            territoryData.TerritoryCapture(datetime(2024, 1, 1, 12), "Taken", "A", "B"),
+            territoryData.TerritoryCapture(now, "New", None, "C"),
+        ])
+
+    async def _poll(self, territories: dict[str, Territory]):
+        with mock.patch("common.api.wynncraft.v3.guild.list_territories", new_callable=mock.AsyncMock,
+                        return_value=territories):
+            await territoryTracker.track_territories()
+
+    async def test_poll(self):
+        await self._poll({"T1": _territory("A"), "T2": _territory("A")})
+        self.assertEqual(territoryTracker.get_counts(), {"A": 2})
+
+        # Continues from the stored owners after a restart
+        territoryTracker._owners = None
+        await self._poll({"T1": _territory("A"), "T2": _territory("B", "2024-01-01T13:00:00.000Z")})
+
+        self.assertEqual(territoryTracker.get_counts(), {"A": 1, "B": 1})
+        self.assertEqual(await territoryData.get_owners(), {"T1": "A", "T2": "B"})
+        self.assertEqual(await territoryData.get_capture_leaderboard(), [(1, "B", 1)])
+        self.assertEqual(len(await territoryData.get_captures("A")), 3)
@@ -0,0 +1,78 @@
+import asyncio
+import glob
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+import common.api.sessionManager
+import common.logging
+import common.storage.manager
+import common.storage.playtimeData
+import workers.eventBridge
+import workers.guildUpdater
+import workers.onlineTracker
+import workers.playtimeTracker
+import workers.tracking
+from common.botConfig import BotConfig
+
+load_dotenv()
+
+
+def _configured_guilds() -> set[str]:
+    """
+    The guilds of the bots so they are tracked before the bot process connects.
+    """
+    return {BotConfig(path).GUILD_NAME for path in glob.glob("data/bot_configs/*.ini")}
+
+
+def start_workers():
+    workers.tracking.start_tracking()
+    workers.onlineTracker.start()
+
+
+async def stop_workers():
+    workers.onlineTracker.stop()
+    await workers.tracking.stop_tracking()
+
+
+async def main():
+    """
+    Run the trackers in their own process. Start the bot with DISABLE_TRACKING=1 so it receives the guild log events
+    from this process instead of tracking itself.
+    """
+    server = None
+    try:
+        common.logging.info("Booting up tracker...")
+
+        await common.storage.manager.init_database()
+        await common.api.sessionManager.init_sessions()
+
+        for name in _configured_guilds():
+            workers.guildUpdater.add_guild(name, workers.eventBridge.EventForwarder(name))
+        server = await workers.eventBridge.start_server(workers.guildUpdater.add_guild)
+
+        start_workers()
+
+        today = datetime.now(timezone.utc).date()
+        if (await common.storage.playtimeData.get_first_date_after(today)) is None:
+            await workers.playtimeTracker.update_playtimes()
+
+        await server.serve_forever()
+
+    except (KeyboardInterrupt, SystemExit, asyncio.CancelledError) as e:
+        common.logging.info("Stopped:", e.__class__.__name__)
+    except Exception as e:
+        common.logging.error(exc_info=e)
+    finally:
+        common.logging.info("Shutting down tracker...")
+        await stop_workers()
+
+        if server is not None:
+            server.close()
+        await common.api.sessionManager.close()
+        await common.storage.manager.close()
+        common.logging.info("o/")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+import asyncio
+import collections
+import json
+import os
+
+from discord.ext import tasks
+
+import common.logging
+from common.guildLogger import GuildLogger
+from workers import loopStats
+
+# The tracker process listens on this address, the bot process connects to it
+HOST = "127.0.0.1"
+DEFAULT_PORT = 47321
+# Events of a guild kept while no bot process is connected to receive them
+MAX_PENDING = 1000
+
+# The GuildLogger methods that can be called over the bridge
+_LOG_METHODS = {"log_member_join", "log_member_leave", "log_member_name_change"}
+
+
+def tracking_enabled() -> bool:
+    """
+    Whether the bot process runs the tracking workers itself. Set DISABLE_TRACKING=1 if they run in their own process
+    (python -m workers). The guild log events are then received from that process instead.
+    """
+    return os.getenv("DISABLE_TRACKING", "0").lower() not in ("1", "true", "yes")
+
+
+def _port() -> int:
+    return int(os.getenv("TRACKER_IPC_PORT", DEFAULT_PORT))
+
+
+def _encode(msg: dict) -> bytes:
+    return json.dumps(msg).encode() + b"\n"
+
+
+# Tracker process
+
+_pending: dict[str, collections.deque[dict]] = collections.defaultdict(lambda: collections.deque(maxlen=MAX_PENDING))
+_receivers: dict[str, set[asyncio.StreamWriter]] = collections.defaultdict(set)
+_send_lock = asyncio.Lock()
+
+
+class EventForwarder:
+    def __init__(self, guild_name: str):
+        """
+        Takes the place of the GuildLogger of a guild in the tracker process and forwards the log events to the bot
+        process. Events are kept until a bot process that logs the guild is connected.
+        """
+        self.guild_name = guild_name
+
+    async def _send(self, method: str, **kwargs):
+        _pending[self.guild_name].append({"type": method, "guild": self.guild_name, "args": kwargs})
+        await _flush(self.guild_name)
+
+    async def log_member_join(self, username: str, uuid: str):
+        await self._send("log_member_join", username=username, uuid=uuid)
+
+    async def log_member_leave(self, username: str, uuid: str):
+        await self._send("log_member_leave", username=username, uuid=uuid)
+
+    async def log_member_name_change(self, uuid: str, prev_name: str, new_name: str):
+        await self._send("log_member_name_change", uuid=uuid, prev_name=prev_name, new_name=new_name)
+
+
+async def _flush(guild_name: str):
+    async with _send_lock:
+        pending = _pending[guild_name]
+        while pending and _receivers[guild_name]:
+            msg = pending[0]
+            for writer in list(_receivers[guild_name]):
+                try:
+                    writer.write(_encode(msg))
+                    await writer.drain()
+                except (ConnectionError, RuntimeError):
+                    _receivers[guild_name].discard(writer)
+            if _receivers[guild_name]:
+                pending.popleft()
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, on_guild_added):
+    guilds = set()
+    try:
+        while line := await reader.readline():
+            msg = json.loads(line)
+            if msg.get("type") != "add_guild":
+                common.logging.warning(f"Unknown event bridge message: {msg}")
+                continue
+
+            name = msg["guild"]
+            guilds.add(name)
+            on_guild_added(name, EventForwarder(name))
+            _receivers[name].add(writer)
+            await _flush(name)
+    except (ConnectionError, json.JSONDecodeError) as e:
+        common.logging.warning(f"Event bridge connection failed: {e}")
+    finally:
+        for name in guilds:
+            _receivers[name].discard(writer)
+        writer.close()
+
+
+async def start_server(on_guild_added, port: int = None) -> asyncio.Server:
+    """
+    Start accepting bot processes in the tracker process.
+
+    :param on_guild_added: Called with the guild name and its EventForwarder whenever a bot process registers a guild.
+    :param port: The port to listen on. Defaults to the TRACKER_IPC_PORT env variable.
+    :return: The started server.
+    """
+    server = await asyncio.start_server(lambda r, w: _handle_connection(r, w, on_guild_added),
+                                        HOST, port if port is not None else _port())
+    common.logging.info(f"Event bridge listening on {HOST}:{server.sockets[0].getsockname()[1]}.")
+    return server
+
+
+# Bot process
+
+_loggers: dict[str, GuildLogger] = {}
+
+
+def add_logger(guild_name: str, guild_logger: GuildLogger):
+    """
+    Log the events of a guild received from the tracker process with the logger.
+    """
+    _loggers[guild_name] = guild_logger
+
+
+def remove_logger(guild_name: str):
+    _loggers.pop(guild_name, None)
+
+
+async def receive_events(port: int = None):
+    """
+    Connect to the tracker process and log the received events until the connection is closed.
+    """
+    reader, writer = await asyncio.open_connection(HOST, port if port is not None else _port())
+    try:
+        for name in _loggers:
+            writer.write(_encode({"type": "add_guild", "guild": name}))
+        await writer.drain()
+
+        while line := await reader.readline():
+            msg = json.loads(line)
+            guild_logger = _loggers.get(msg["guild"])
+            if guild_logger is None or msg["type"] not in _LOG_METHODS:
+                common.logging.warning(f"Received unexpected event from tracker process: {msg}")
+                continue
+
+            try:
+                await getattr(guild_logger, msg["type"])(**msg["args"])
+            except Exception as e:
+                common.logging.error(f"Failed to log event from tracker process: {msg}", exc_info=e)
+    finally:
+        writer.close()
+
+
+@tasks.loop(seconds=10, reconnect=True)
+async def event_receiver():
+    """
+    Receive the guild log events of the tracker process. Reconnects if the tracker process restarts.
+    """
+    try:
+        await receive_events()
+    except ConnectionError as e:
+        common.logging.debug(f"Tracker process not reachable: {e}")
+
+
+loopStats.track_loop("event_receiver", event_receiver)
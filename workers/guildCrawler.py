@@ -0,0 +1,115 @@
+import os
+import time
+from datetime import datetime
+
+from discord.ext import tasks
+
+import common.api.wynncraft.v3.guild
+import common.api.wynncraft.v3.session
+import common.guildRosters
+import common.logging
+from common.storage import guildMembershipData
+from workers import guildUpdater, loopStats
+from workers.queueWorker import QueueWorker
+
+# The share of the wynncraft API budget used by the crawler. Set GUILD_CRAWLER_BUDGET=0 to disable it.
+DEFAULT_BUDGET_SHARE = 0.25
+# The time in seconds between crawls of a guild. Large guilds and guilds with many member changes are crawled more
+# often.
+MIN_INTERVAL = 3600
+MAX_INTERVAL = 24 * 3600
+# The most guilds waiting to be crawled
+MAX_QUEUED = 100
+
+# Guild names mapped to the time.time() their next crawl is due. Guilds that weren't crawled yet are due immediately.
+_due: dict[str, float] = {}
+_sizes: dict[str, int] = {}
+
+
+def budget_share() -> float:
+    return min(max(float(os.getenv("GUILD_CRAWLER_BUDGET", DEFAULT_BUDGET_SHARE)), 0.0), 1.0)
+
+
+_rate_limit = common.api.wynncraft.v3.session.get_rate_limit()
+# Only crawl while more calls than the rest of the budget are left
+_worker = QueueWorker(rate_limit=_rate_limit, min_remaining=int(_rate_limit.get_max_calls() * (1 - budget_share())),
+                      name="guild_crawler")
+
+
+def crawl_interval(members: int, changes: int) -> float:
+    """
+    Calculate the time until a guild is crawled again.
+
+    :param members: The amount of members of the guild.
+    :param changes: The amount of members that joined or left since the last crawl.
+    """
+    priority = 1 + members / 25 + 4 * changes
+    return min(max(MAX_INTERVAL / priority, MIN_INTERVAL), MAX_INTERVAL)
+
+
+def select_due(guilds: list[str], now: float, limit: int) -> list[str]:
+    """
+    Select the guilds to crawl next, the longest overdue first and larger guilds first if equally due.
+    """
+    due = [name for name in guilds if _due.get(name, 0) <= now]
+    due.sort(key=lambda name: (_due.get(name, 0), -_sizes.get(name, 0)))
+    return due[:max(limit, 0)]
+
+
+async def _crawl(name: str):
+    try:
+        guild_stats = await common.api.wynncraft.v3.guild.fetch_stats(name=name)
+    except common.api.wynncraft.v3.guild.UnknownGuildException:
+        _due.pop(name, None)
+        _sizes.pop(name, None)
+        return
+
+    now = datetime.utcnow()
+    members = common.guildRosters.join_times(guild_stats, now)
+    joined, left = await guildMembershipData.sync_roster(name, members, now)
+
+    _sizes[name] = len(members)
+    _due[name] = time.time() + crawl_interval(len(members), len(joined) + len(left))
+
+
+@tasks.loop(seconds=60, reconnect=True)
+async def guild_crawler():
+    """
+    Crawl the rosters of all guilds and store their membership history. The guilds of the guild updater are skipped,
+    it records their history itself.
+    """
+    if not _worker.started:
+        _worker.start()
+
+    guilds = {g.name for g in await common.api.wynncraft.v3.guild.list_guilds()}
+    for name in _due.keys() - guilds:
+        _due.pop(name)
+        _sizes.pop(name, None)
+
+    now = time.time()
+    candidates = list(guilds - set(guildUpdater.tracked_guilds()))
+    for name in select_due(candidates, now, MAX_QUEUED - _worker.qsize()):
+        # Retried after the longest interval if the crawl fails
+        _due[name] = now + MAX_INTERVAL
+        _worker.put(_crawl, name)
+
+
+@guild_crawler.after_loop
+async def _stop_worker():
+    _worker.stop()
+
+
+guild_crawler.add_exception_type(Exception)
+loopStats.track_loop("guild_crawler", guild_crawler)
+
+
+def start():
+    if budget_share() <= 0:
+        common.logging.info("Guild crawler disabled.")
+        return
+    guild_crawler.start()
+    common.logging.info("Guild crawler started.")
+
+
+def stop():
+    guild_crawler.stop()
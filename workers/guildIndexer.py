@@ -3,12 +3,13 @@ from discord.ext import tasks
 import common.api.wynncraft.v3.guild
 import common.logging
 from common.utils.misc import create_inverted_index
+from workers import loopStats
 
 _index = {}
 
 
 async def _create_inverted_guild_index():
-    guilds = await common.api.wynncraft.v3.guild.list_guilds()
+    guilds = (await common.api.wynncraft.v3.guild.directory()).guilds
     guilds = [g.tag for g in guilds] + [g.name for g in guilds]
 
     return create_inverted_index(guilds, ignore_case=True, max_key_len=30, max_bucket_len=25)
@@ -29,3 +30,4 @@ async def update_index():
 
 
 update_index.add_exception_type(Exception)
+loopStats.track_loop("guild_indexer", update_index)
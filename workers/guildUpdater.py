@@ -1,24 +1,32 @@
-import dataclasses
 import json
 import os
 from collections.abc import Collection
+from datetime import datetime
 
 from discord.ext import tasks
 
 import common.api.rateLimit
+import common.api.wynncraft.v3.session
 import common.logging
-import common.logging
-import common.logging
+from common import guildRosters
 from common.api.wynncraft.v3 import guild
 from common.guildLogger import GuildLogger
+from common.storage import guildMemberData, guildMembershipData
 from common.types.wynncraft import GuildStats
 from common.utils import minecraftPlayer
-from workers import usernameUpdater
-from common.utils.misc import format_uuid
+from workers import loopStats, usernameUpdater
+from workers.eventBridge import EventForwarder
+from workers.queueWorker import QueueWorker
 
-_guilds: dict[str, GuildStats | None] = {}
+# The members of the guilds as of the previous update (undashed lowercase uuids mapped to their rank), the baseline the
+# joins and leaves are computed against. None until the roster was loaded. Use guildRosters for the current members.
+_rosters: dict[str, dict[str, str] | None] = {}
 _active_guilds: list[str] = []
-_guild_loggers: dict[str, GuildLogger] = {}
+_guild_loggers: dict[str, GuildLogger | EventForwarder] = {}
+
+# Guilds are updated concurrently. Use the wynncraft API budget but leave some for commands.
+_worker = QueueWorker(concurrency=8, rate_limit=common.api.wynncraft.v3.session.get_rate_limit(), min_remaining=20,
+                      name="guild_updater")
 
 
 class NameChangeLogger(usernameUpdater.NameChangeSubscriber):
@@ -26,31 +34,37 @@ class NameChangeLogger(usernameUpdater.NameChangeSubscriber):
         self.guild_name = guild_name
 
     async def name_changed(self, uuid: str, prev_name: str, new_name: str):
-        try:
-            g = await guild.stats(name=self.guild_name)
-        except Exception as e:
-            common.logging.error(f"Name change logger failed to fetch guild data for bot guild {self.guild_name}!", e)
+        roster = guildRosters.get(self.guild_name)
+        if roster is None or uuid not in roster:
             return
 
-        if format_uuid(uuid, dashed=True) not in g.members.all:
-            return
-
-        await _guild_loggers[self.guild_name].log_member_name_change(uuid, prev_name, new_name)
+        guild_logger = _guild_loggers.get(self.guild_name)
+        if guild_logger is not None:
+            await guild_logger.log_member_name_change(uuid, prev_name, new_name)
 
 
-def _load_guilds():
+def _load_legacy_roster(name: str) -> dict[str, str] | None:
+    """
+    Get the roster of a guild from data/guilds.json, where the guilds were stored before the guild_members table.
+    """
     try:
-        if os.path.exists(f"data/guilds.json"):
-            with open(f"data/guilds.json", 'r') as _f:
-                global _guilds
-                _guilds = {name: GuildStats.from_json(data) for name, data in json.load(_f).items()}
+        if os.path.exists("data/guilds.json"):
+            with open("data/guilds.json", 'r') as f:
+                data = json.load(f).get(name)
+            if data is not None:
+                return guildRosters.GuildRoster.from_stats(GuildStats.from_json(data)).ranks
     except Exception as e:
         common.logging.error("Failed to load stored guild stats.", exc_info=e)
+    return None
 
 
-def _store_guilds():
-    with open(f"data/guilds.json", "w") as f:
-        json.dump({name: dataclasses.asdict(data) for name, data in _guilds.items()}, f, indent=4)
+async def _load_roster(name: str) -> dict[str, str] | None:
+    roster = await guildMemberData.get_roster(name)
+    if roster is None:
+        roster = _load_legacy_roster(name)
+        if roster is not None:
+            await guildMemberData.update_roster(name, roster, ())
+    return roster
 
 
 async def _get_players(uuids: Collection[str]) -> dict[str, str]:
@@ -63,36 +77,22 @@ async def _get_players(uuids: Collection[str]) -> dict[str, str]:
     return players
 
 
-async def _get_member_updates(guild_prev: GuildStats, guild_now: GuildStats) -> tuple[dict[str, str], dict[str, str]]:
-    members_prev = {uuid.replace("-", "").lower() for uuid in guild_prev.members.all.keys()}
-    members_now = {uuid.replace("-", "").lower() for uuid in guild_now.members.all.keys()}
-
-    joined_uuids = members_now - members_prev
-    left_uuids = members_prev - members_now
-
-    joined = await _get_players(joined_uuids)
-    left = await _get_players(left_uuids)
-
-    return joined, left
-
-
-def add_guild(name: str, guild_logger: GuildLogger):
+def add_guild(name: str, guild_logger: GuildLogger | EventForwarder = None):
     """
-    Add a guild to the guild updater.
+    Add a guild to the guild updater. If the guild was already added only its logger is replaced.
 
     :param name: The name of the guild.
-    :param guild_logger: The logger to use for this guild.
+    :param guild_logger: The logger to use for this guild. In the tracker process this forwards the events to the bot.
+     If None, the members of the guild are only tracked.
     """
-    _active_guilds.append(name)
-    _guild_loggers[name] = guild_logger
+    if name not in _active_guilds:
+        _active_guilds.append(name)
+        usernameUpdater.subscribe(NameChangeLogger(name))
+    if guild_logger is not None:
+        _guild_loggers[name] = guild_logger
 
-    usernameUpdater.subscribe(NameChangeLogger(name))
-
-    if _guilds == {}:
-        _load_guilds()
-
-    if name not in _guilds:
-        _guilds[name] = None
+    if name not in _rosters:
+        _rosters[name] = None
 
 
 def remove_guild(name: str):
@@ -105,33 +105,65 @@ def remove_guild(name: str):
         _active_guilds.remove(name)
     if name in _guild_loggers:
         _guild_loggers.pop(name)
+    guildRosters.remove(name)
 
 
-async def _update_guild(name: str):
-    try:
-        try:
-            guild_now = await guild.stats(name=name)
-        except guild.UnknownGuildException:
-            common.logging.error(f"Guild {name} not found. Removing this guild from update loop.")
-            _active_guilds.remove(name)
-            return
+def tracked_guilds() -> list[str]:
+    """
+    Get the names of the guilds that are updated, i.e. the guilds of the configured bots.
+    """
+    return list(_active_guilds)
+
+
+def tracked_members() -> set[str]:
+    """
+    Get the members of the tracked guilds as of the last update.
+
+    :return: The undashed lowercase uuids of the members.
+    """
+    return {uuid
+            for name in _active_guilds if guildRosters.get(name) is not None
+            for uuid in guildRosters.get(name).uuids}
 
-        if _guilds[name] is not None:
-            joined, left = await _get_member_updates(_guilds[name], guild_now)
 
-            guild_logger = _guild_loggers[guild_now.name]
+async def _update_guild(name: str):
+    try:
+        guild_now = await guild.stats(name=name)
+    except guild.UnknownGuildException:
+        common.logging.error(f"Guild {name} not found. Removing this guild from update loop.")
+        remove_guild(name)
+        return
+
+    guildRosters.update(name, guild_now)
+    roster_now = guildRosters.get(name).ranks
+
+    now = datetime.utcnow()
+    await guildMembershipData.sync_roster(name, guildRosters.join_times(guild_now, now), now)
+    roster_prev = _rosters.get(name)
+    if roster_prev is None:
+        roster_prev = await _load_roster(name)
+
+    if roster_prev is None:
+        await guildMemberData.update_roster(name, roster_now, ())
+    else:
+        joined_uuids = roster_now.keys() - roster_prev.keys()
+        left_uuids = roster_prev.keys() - roster_now.keys()
+
+        guild_logger = _guild_loggers.get(name)
+        if guild_logger is not None and (joined_uuids or left_uuids):
+            joined = await _get_players(joined_uuids)
+            left = await _get_players(left_uuids)
 
             for uuid, pname in joined.items():
                 await guild_logger.log_member_join(pname, uuid)
             for uuid, pname in left.items():
                 await guild_logger.log_member_leave(pname, uuid)
 
-        _guilds[name] = guild_now
-    except common.api.rateLimit.RateLimitException:
-        pass
-    except Exception as e:
-        await common.logging.error(exc_info=e)
-        raise e
+        # Only write the members that changed
+        changed = {uuid: rank for uuid, rank in roster_now.items() if roster_prev.get(uuid) != rank}
+        await guildMemberData.update_roster(name, changed, left_uuids)
+
+    _rosters[name] = roster_now
 
 
 @tasks.loop(seconds=601, reconnect=True)
@@ -139,18 +171,34 @@ async def guild_updater():
     """
     Update guild information every 10 minutes. Use the `add_guild` function to add guilds to the updater.
     """
-    exc_count = 0
-    for name in _active_guilds:
+    if not _worker.started:
+        _worker.start()
+
+    names = list(_active_guilds)
+    failed = []
+
+    async def update(name: str):
         try:
             await _update_guild(name)
-        except Exception:
-            common.logging.error(f"Failed to update guild {name}.", exc_info=True)
-            exc_count += 1
+        except common.api.rateLimit.RateLimitException as e:
+            # Queued again by the worker
+            raise e
+        except Exception as e:
+            common.logging.error(f"Failed to update guild {name}.", exc_info=e)
+            failed.append(name)
 
-    if exc_count >= len(_active_guilds):
+    for name in names:
+        _worker.put(update, name)
+    await _worker.join()
+
+    if names and len(failed) >= len(names):
         raise Exception("All guild updates failed.")
 
-    _store_guilds()
+
+@guild_updater.after_loop
+async def _stop_worker():
+    _worker.stop()
 
 
 guild_updater.add_exception_type(Exception)
+loopStats.track_loop("guild_updater", guild_updater)
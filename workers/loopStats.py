@@ -0,0 +1,81 @@
+import collections
+import functools
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from discord.ext import tasks
+
+
+@dataclass(frozen=True)
+class LoopStats:
+    name: str
+    running: bool
+    runs: int
+    failures: dict[str, int]  # Failed iterations per exception class
+    last_duration: float  # Time in seconds the last iteration took
+    mean_duration: float
+    last_run: datetime | None
+    next_run: datetime | None
+
+
+class _LoopMetrics:
+    def __init__(self, name: str, loop: tasks.Loop):
+        self.name = name
+        self.loop = loop
+        self.runs = 0
+        self.failures = collections.Counter()
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.last_run: datetime | None = None
+
+    def stats(self) -> LoopStats:
+        return LoopStats(
+            name=self.name,
+            running=self.loop.is_running(),
+            runs=self.runs,
+            failures=dict(self.failures),
+            last_duration=self.last_duration,
+            mean_duration=self.total_duration / self.runs if self.runs > 0 else 0.0,
+            last_run=self.last_run,
+            next_run=self.loop.next_iteration,
+        )
+
+
+_loops: list[_LoopMetrics] = []
+
+
+def track_loop(name: str, loop: tasks.Loop) -> tasks.Loop:
+    """
+    Record the runs, durations and failures of the iterations of a worker loop.
+
+    :param name: The name of the loop shown in the statistics.
+    :return: The loop.
+    """
+    metrics = _LoopMetrics(name, loop)
+    coro = loop.coro
+
+    @functools.wraps(coro)
+    async def wrapper(*args, **kwargs):
+        metrics.last_run = datetime.now().astimezone()
+        start = time.monotonic()
+        try:
+            return await coro(*args, **kwargs)
+        except Exception as e:
+            metrics.failures[type(e).__name__] += 1
+            raise e
+        finally:
+            metrics.runs += 1
+            metrics.last_duration = time.monotonic() - start
+            metrics.total_duration += metrics.last_duration
+
+    loop.coro = wrapper
+    _loops.append(metrics)
+    return loop
+
+
+def get_all_stats() -> list[LoopStats]:
+    """
+    Get the statistics of all loops tracked with track_loop.
+    """
+    return [m.stats() for m in _loops]
@@ -0,0 +1,205 @@
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import aiohttp.client_exceptions
+from discord.ext import tasks
+
+import common.api.rateLimit
+import common.api.wynncraft.v3.player
+import common.api.wynncraft.v3.session
+import common.logging
+import common.storage.sessionData
+from common.types.enums import PlayerIdentifier
+from workers import loopStats
+
+# The poll interval in seconds and its bounds
+DEFAULT_INTERVAL = 61
+MIN_INTERVAL = 31
+MAX_INTERVAL = 121
+# The share of online players joining or leaving per minute at which the list is polled every minute
+TARGET_CHURN = 0.05
+# Poll slowly while fewer wynncraft api requests than this are left
+LOW_BUDGET = 20
+
+
+@dataclass(frozen=True)
+class OnlineSnapshot:
+    time: datetime
+    total: int
+    uuids: dict[str, str]  # Online player uuids mapped to their server
+    usernames: dict[str, str] = field(default_factory=dict)  # Only set if a subscriber needs usernames
+
+
+@dataclass(frozen=True)
+class OnlineDiff:
+    snapshot: OnlineSnapshot
+    prev: OnlineSnapshot | None  # None for the first snapshot, all online players count as joined then
+    joined_uuids: frozenset[str]
+    left_uuids: frozenset[str]
+    joined_usernames: frozenset[str]
+    left_usernames: frozenset[str]
+    restored: bool = False  # prev are the players that were online when the trackers last stopped
+
+
+class OnlineSubscriber(ABC):
+    # The identifiers the subscriber needs in the snapshots. Uuids are always included.
+    identifiers: frozenset[PlayerIdentifier] = frozenset({PlayerIdentifier.UUID})
+    # If True, the first diff after subscribing is computed against the players that were online when the trackers
+    # last stopped, so players that left in between count as left. See restored_snapshot.
+    restore: bool = False
+
+    @abstractmethod
+    async def online_changed(self, diff: OnlineDiff):
+        pass
+
+
+_subscribers: list[OnlineSubscriber] = []
+# Subscribers that get a restored diff on the next poll
+_restoring: list[OnlineSubscriber] = []
+_snapshot: OnlineSnapshot | None = None
+
+
+def subscribe(subscriber: OnlineSubscriber):
+    """
+    Subscribe to changes of the online player list. The subscriber is notified once per poll.
+    """
+    _subscribers.append(subscriber)
+    if subscriber.restore:
+        _restoring.append(subscriber)
+
+
+def unsubscribe(subscriber: OnlineSubscriber):
+    if subscriber in _subscribers:
+        _subscribers.remove(subscriber)
+    if subscriber in _restoring:
+        _restoring.remove(subscriber)
+
+
+def latest() -> OnlineSnapshot | None:
+    """
+    Get the most recent snapshot of the online players or None if the list wasn't polled yet.
+    """
+    return _snapshot
+
+
+def compute_diff(prev: OnlineSnapshot | None, snapshot: OnlineSnapshot, restored: bool = False) -> OnlineDiff:
+    prev_uuids = prev.uuids.keys() if prev is not None else set()
+    prev_usernames = prev.usernames.keys() if prev is not None else set()
+
+    return OnlineDiff(
+        snapshot=snapshot,
+        prev=prev,
+        joined_uuids=frozenset(snapshot.uuids.keys() - prev_uuids),
+        left_uuids=frozenset(prev_uuids - snapshot.uuids.keys()),
+        joined_usernames=frozenset(snapshot.usernames.keys() - prev_usernames),
+        left_usernames=frozenset(prev_usernames - snapshot.usernames.keys()),
+        restored=restored,
+    )
+
+
+async def restored_snapshot(snapshot: OnlineSnapshot) -> OnlineSnapshot:
+    """
+    Get the players that were online when the trackers last stopped, i.e. the play sessions the session recorder left
+    open. The time of the snapshot is the last change of the sessions.
+
+    :param snapshot: The current snapshot. Players that are still online are keyed like in it.
+    """
+    sessions = await common.storage.sessionData.get_open_sessions()
+    last_change = await common.storage.sessionData.get_last_change()
+    keys = {uuid.replace("-", "").lower(): uuid for uuid in snapshot.uuids}
+
+    return OnlineSnapshot(
+        time=last_change.replace(tzinfo=timezone.utc) if last_change is not None else snapshot.time,
+        total=len(sessions),
+        uuids={keys.get(uuid, uuid): session.world for uuid, session in sessions.items()},
+    )
+
+
+def next_interval(diff: OnlineDiff, remaining_requests: int) -> float:
+    """
+    Calculate the time until the next poll. The list is polled more often while many players join or leave, and less
+    often while little changes or the wynncraft api budget runs low.
+    """
+    if remaining_requests < LOW_BUDGET:
+        return MAX_INTERVAL
+    if diff.prev is None:
+        return DEFAULT_INTERVAL
+
+    minutes = max((diff.snapshot.time - diff.prev.time).total_seconds() / 60, 1 / 60)
+    changes = len(diff.joined_uuids) + len(diff.left_uuids)
+    churn = changes / max(diff.snapshot.total, 1) / minutes
+    if churn == 0:
+        return MAX_INTERVAL
+
+    return min(max(60 * TARGET_CHURN / churn, MIN_INTERVAL), MAX_INTERVAL)
+
+
+async def _fetch_snapshot() -> OnlineSnapshot:
+    need_usernames = any(PlayerIdentifier.USERNAME in s.identifiers for s in _subscribers)
+
+    if need_usernames:
+        by_uuid, by_username = await asyncio.gather(
+            common.api.wynncraft.v3.player.player_list(PlayerIdentifier.UUID),
+            common.api.wynncraft.v3.player.player_list(PlayerIdentifier.USERNAME),
+        )
+    else:
+        by_uuid = await common.api.wynncraft.v3.player.player_list(PlayerIdentifier.UUID)
+        by_username = {}
+
+    return OnlineSnapshot(
+        time=datetime.now(timezone.utc),
+        total=len(by_uuid),
+        uuids=by_uuid,
+        usernames=by_username,
+    )
+
+
+async def _publish(diff: OnlineDiff):
+    restored_diff = None
+    for subscriber in list(_subscribers):
+        try:
+            if subscriber in _restoring:
+                _restoring.remove(subscriber)
+                # Restored once before any subscriber changes the stored sessions
+                if restored_diff is None:
+                    restored_diff = compute_diff(await restored_snapshot(diff.snapshot), diff.snapshot, restored=True)
+                await subscriber.online_changed(restored_diff)
+            else:
+                await subscriber.online_changed(diff)
+        except Exception as ex:
+            common.logging.error(f"Online subscriber {type(subscriber).__name__} failed.", exc_info=ex)
+
+
+@tasks.loop(seconds=DEFAULT_INTERVAL, reconnect=True)
+async def _poll():
+    try:
+        global _snapshot
+        snapshot = await _fetch_snapshot()
+        diff = compute_diff(_snapshot, snapshot)
+        _snapshot = snapshot
+
+        await _publish(diff)
+
+        interval = next_interval(diff, common.api.wynncraft.v3.session.calculate_remaining_requests())
+        if interval != _poll.seconds:
+            _poll.change_interval(seconds=interval)
+    except common.api.rateLimit.RateLimitException:
+        pass
+    except Exception as ex:
+        common.logging.error(exc_info=ex)
+        raise ex
+
+
+_poll.add_exception_type(aiohttp.client_exceptions.ClientError, Exception)
+loopStats.track_loop("online_tracker", _poll)
+
+
+def start():
+    _poll.start()
+    common.logging.info("Online tracker worker started.")
+
+
+def stop():
+    _poll.stop()
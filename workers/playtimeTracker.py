@@ -1,5 +1,4 @@
-import asyncio
-from datetime import datetime, timezone, time
+from datetime import datetime, timezone, time, timedelta, date
 
 import aiohttp.client_exceptions
 from discord.ext import tasks
@@ -7,40 +6,79 @@ from discord.ext import tasks
 import common.api
 import common.api.wynncraft.v3.guild
 import common.api.wynncraft.v3.player
+import common.api.wynncraft.v3.session
+import common.guildRosters
 import common.logging
+import common.storage.playerTrackerData
+import workers.guildUpdater
+import workers.onlineTracker
 from common.storage.playtimeData import set_playtime
+from workers import loopStats
 from workers.queueWorker import QueueWorker
 
-_worker = QueueWorker(delay=0.5)
+# Only members without a stat tracker record on the previous day are requested. Use the wynncraft API budget for them
+# but leave some for commands.
+_worker = QueueWorker(concurrency=4, rate_limit=common.api.wynncraft.v3.session.get_rate_limit(), min_remaining=20,
+                      name="playtime_tracker")
 
 
-async def _update_playtime(uuid: str):
+async def _update_playtime(uuid: str, day: date):
     try:
-        stats = await common.api.wynncraft.v3.player.stats(uuid)
-        await set_playtime(stats.uuid, datetime.now(timezone.utc).date(), int(stats.playtime * 60))
+        stats = await common.api.wynncraft.v3.player.tracked_stats(uuid)
+        # Also store the record for the stat tracker
+        await common.storage.playerTrackerData.add_tracked_record(stats)
+        await set_playtime(stats.uuid, day, int(stats.playtime * 60))
     except common.api.wynncraft.v3.player.UnknownPlayerException:
         common.logging.error(f'Failed to fetch stats for guild member with uuid {uuid}')
 
 
-async def _update_guild(guild_name: str):
-    guild = await common.api.wynncraft.v3.guild.stats(name=guild_name)
+async def _update_guild(guild_name: str, day: date) -> int:
+    """
+    Store the playtimes of the members of a guild at the start of a day. The playtimes are taken from the latest record
+    of the stat tracker on the previous day. Members without a record that day or that are online (their record could
+    be outdated) are requested from the API.
 
-    for i, uuid in enumerate(guild.members.all.keys()):
-        if (i - 1) % 50 == 0:
-            await asyncio.sleep(60)
-        _worker.put(_update_playtime, uuid)
+    :return: The amount of members that are requested.
+    """
+    uuids = (await common.guildRosters.fetch(guild_name)).uuids
+
+    end = datetime.combine(day, time())
+    recorded = await common.storage.playerTrackerData.get_latest_playtimes(uuids, end - timedelta(days=1), end)
+
+    snapshot = workers.onlineTracker.latest()
+    online = {uuid.replace("-", "").lower() for uuid in snapshot.uuids} if snapshot is not None else set()
+
+    missing = []
+    for uuid in uuids:
+        if uuid in recorded and uuid not in online:
+            await set_playtime(uuid, day, int(recorded[uuid] * 60))
+        else:
+            missing.append(uuid)
+
+    for uuid in missing:
+        _worker.put(_update_playtime, uuid, day)
+
+    return len(missing)
 
 
 @tasks.loop(time=time(hour=0, minute=0, tzinfo=timezone.utc), reconnect=True)
 async def update_playtimes():
+    """
+    Store the daily playtimes of the members of the tracked guilds.
+    """
     try:
         if not _worker.started:
             _worker.start()
-        await _update_guild('Nerfuria')
-        await asyncio.sleep(60)
-        await _update_guild('Cat Cafe')
+
+        day = datetime.now(timezone.utc).date()
+        for guild_name in workers.guildUpdater.tracked_guilds():
+            try:
+                requested = await _update_guild(guild_name, day)
+                common.logging.debug(f"Requesting the playtimes of {requested} members of {guild_name}.")
+            except common.api.wynncraft.v3.guild.UnknownGuildException:
+                common.logging.warning(f"Guild {guild_name} not found, skipping its playtimes.")
     except Exception as ex:
-        await common.logging.error(exc_info=ex)
+        common.logging.error(exc_info=ex)
         raise ex
 
 
@@ -48,3 +86,4 @@ update_playtimes.add_exception_type(
     aiohttp.client_exceptions.ClientError,
     Exception
 )
+loopStats.track_loop("playtime_tracker", update_playtimes)
@@ -0,0 +1,65 @@
+import collections
+from datetime import datetime, timedelta, timezone
+
+from discord.ext import tasks
+
+import common.logging
+import workers.onlineTracker
+from common.storage import populationData
+from workers import loopStats
+
+# Samples of a resolution older than the retention are averaged into the next resolution
+DOWNSAMPLING = (
+    (populationData.MINUTE, populationData.HOUR, timedelta(days=7)),
+    (populationData.HOUR, populationData.DAY, timedelta(days=90)),
+)
+
+
+# Snapshots older than this aren't recorded, e.g. while the wynncraft api is down
+MAX_SNAPSHOT_AGE = timedelta(seconds=2 * workers.onlineTracker.MAX_INTERVAL)
+
+
+@tasks.loop(minutes=1, reconnect=True)
+async def record():
+    """
+    Store the latest online players once a minute. The online tracker polls every 31 to 121 seconds, so a minute
+    without a poll repeats the previous snapshot.
+    """
+    snapshot = workers.onlineTracker.latest()
+    now = datetime.now(timezone.utc)
+    if snapshot is None or now - snapshot.time > MAX_SNAPSHOT_AGE:
+        return
+
+    worlds = collections.Counter(snapshot.uuids.values())
+    await populationData.add_sample(now.replace(tzinfo=None), snapshot.total, dict(worlds))
+
+
+record.add_exception_type(Exception)
+loopStats.track_loop("population_recorder", record)
+
+
+@tasks.loop(hours=1, reconnect=True)
+async def downsample():
+    """
+    Average old samples of the online population into coarser resolutions.
+    """
+    now = datetime.utcnow()
+    for resolution, new_resolution, retention in DOWNSAMPLING:
+        replaced = await populationData.downsample(resolution, new_resolution, now - retention)
+        if replaced > 0:
+            common.logging.debug(f"Downsampled {replaced} population samples to {new_resolution}s.")
+
+
+downsample.add_exception_type(Exception)
+loopStats.track_loop("population_downsampler", downsample)
+
+
+def start():
+    record.start()
+    downsample.start()
+    common.logging.info("Population recorder started.")
+
+
+def stop():
+    downsample.stop()
+    record.stop()
@@ -1,11 +1,7 @@
-import aiohttp.client_exceptions
 import discord
 from discord import Client
-from discord.ext import tasks
 
-import common.api.rateLimit
-import common.api.wynncraft.v3.player
-import common.logging
+import workers.onlineTracker
 
 _clients: list[Client] = []
 
@@ -20,24 +16,29 @@ def remove_client(client: Client):
             return
 
 
-@tasks.loop(seconds=61, reconnect=True)
-async def update_presence():
-    try:
-        for client in _clients:
-            await client.change_presence(
-                status=discord.Status.online,
-                activity=discord.Activity(
-                    name=f"{await common.api.wynncraft.v3.player.player_count()} players play Wynncraft",
-                    type=discord.ActivityType.watching
-                )
+async def _update_presence(player_count: int):
+    for client in _clients:
+        await client.change_presence(
+            status=discord.Status.online,
+            activity=discord.Activity(
+                name=f"{player_count} players play Wynncraft",
+                type=discord.ActivityType.watching
             )
-    except Exception as ex:
-        await common.logging.error(exc_info=ex)
-        raise ex
+        )
 
 
-update_presence.add_exception_type(
-    aiohttp.client_exceptions.ClientError,
-    common.api.rateLimit.RateLimitException,
-    Exception
-)
+class _PresenceUpdater(workers.onlineTracker.OnlineSubscriber):
+    async def online_changed(self, diff: workers.onlineTracker.OnlineDiff):
+        if diff.prev is None or diff.prev.total != diff.snapshot.total:
+            await _update_presence(diff.snapshot.total)
+
+
+_subscriber = _PresenceUpdater()
+
+
+def start():
+    workers.onlineTracker.subscribe(_subscriber)
+
+
+def stop():
+    workers.onlineTracker.unsubscribe(_subscriber)
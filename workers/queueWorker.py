@@ -1,49 +1,153 @@
 import asyncio
-from typing import Callable
+import collections
+import time
+from dataclasses import dataclass
+from typing import Callable, Awaitable, Iterable
 
 import discord.utils
 
 import common.logging
+from common.api.rateLimit import RateLimit, RateLimitException
+from common.storage import taskQueueData
 
 _online_players: set[str] = set()
 _players_to_track: asyncio.Queue[str] = asyncio.Queue()
 
+# The time span in seconds the throughput of the workers is measured over
+THROUGHPUT_WINDOW = 60
+
+
+@dataclass(frozen=True)
+class QueueWorkerStats:
+    name: str
+    depth: int  # Queued tasks
+    oldest_age: float  # Time in seconds the oldest queued task is waiting for
+    throughput: float  # Finished tasks per second
+    succeeded: int
+    failures: dict[str, int]  # Failed tasks per exception class
+    backoff: dict[str, int]  # Consecutive errors per backoff class
+    paused_for: float  # Time in seconds until tasks are started again
+    rate_limit_wait: float  # Total time in seconds spent waiting for the rate limit
+
+
+_workers: list["QueueWorker"] = []
+
 
 class QueueWorker:
-    def __init__(self, delay: float = 0.0):
+    # Pause in seconds after the first of consecutive errors of an exception class, doubled for each further error
+    DEFAULT_BACKOFF: dict[type[Exception], float] = {Exception: 1}
+    MAX_BACKOFF = 3600
+
+    def __init__(self, delay: float = 0.0, concurrency: int = 1, rate_limit: RateLimit = None, min_remaining: int = 0,
+                 backoff: dict[type[Exception], float] = None, name: str = None):
         """
         A worker that processes tasks from a queue.
-        Errors are tracked and the delay between tasks is increased exponentially if consecutive errors occur.
+        Errors are tracked per exception class and the worker pauses for exponentially longer if consecutive errors of
+        the same class occur. Tasks that fail with a RateLimitException are queued again.
 
-        :param delay: The time in seconds to wait between tasks
+        :param delay: The time in seconds each consumer waits between tasks.
+        :param concurrency: The amount of tasks processed at the same time.
+        :param rate_limit: The rate limit of the API used by the tasks. Tasks are only started while more than
+         min_remaining calls are left, so the worker uses the available budget instead of a fixed delay. Each running
+         task reserves a call, so concurrent tasks can't start before their calls were counted.
+        :param min_remaining: The calls of the rate limit left for others (e.g. commands).
+        :param backoff: Exception classes mapped to the pause in seconds after the first consecutive error of the class.
+         The most specific class of an exception is used. Defaults to DEFAULT_BACKOFF.
+        :param name: The name of the worker shown in the statistics.
         """
+        self.name = name or f"queue {len(_workers)}"
         self._queue = asyncio.Queue()
-        self._error_count = 0
+        # Enqueue times of the queued tasks, oldest first
+        self._enqueued: collections.deque[float] = collections.deque()
+        self._error_counts: dict[type[Exception], int] = {}
+        self._paused_until = 0.0
         self._delay = delay
-        self._task: asyncio.Task = None
+        self._concurrency = concurrency
+        self._rate_limit = rate_limit
+        self._min_remaining = min_remaining
+        self._backoff = backoff if backoff is not None else self.DEFAULT_BACKOFF
+        self._tasks: list[asyncio.Task] = []
         self._delayed_tasks = set()
+        self._running = 0
 
-    async def _worker(self):
-        while True:
-            try:
-                await asyncio.sleep((2 ** self._error_count) - 1)
-                task, args, kwargs = await self._queue.get()
+        self._finished: collections.deque[float] = collections.deque()
+        self._succeeded = 0
+        self._failures = collections.Counter()
+        self._rate_limit_wait = 0.0
+        _workers.append(self)
+
+    def _backoff_class(self, ex: Exception) -> type[Exception] | None:
+        for cls in type(ex).__mro__:
+            if cls in self._backoff:
+                return cls
+        return None
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _on_error(self, ex: Exception):
+        cls = self._backoff_class(ex)
+        if cls is None:
+            return
+        count = self._error_counts.get(cls, 0) + 1
+        self._error_counts[cls] = count
+        self._pause(min(self._backoff[cls] * 2 ** (count - 1), self.MAX_BACKOFF))
 
-                try:
-                    await discord.utils.maybe_coroutine(task, *args, **kwargs)
-                finally:
-                    self._queue.task_done()
+    def _on_success(self):
+        for cls, count in list(self._error_counts.items()):
+            if count <= 1:
+                del self._error_counts[cls]
+            else:
+                self._error_counts[cls] = count - 1
 
-                if self._error_count > 0:
-                    self._error_count -= 1
+    async def _wait_until_ready(self):
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            elif self._rate_limit is not None and \
+                    self._rate_limit.calculate_remaining_calls() - self._running <= self._min_remaining:
+                wait = max(self._rate_limit.get_time_until_next_free(), 0.1)
+                self._rate_limit_wait += wait
+                await asyncio.sleep(wait)
+            else:
+                return
 
-                await asyncio.sleep(self._delay)
+    async def _worker(self):
+        while True:
+            # Wait before taking a task so tasks stay queued while paused
+            await self._wait_until_ready()
+            task, args, kwargs = await self._queue.get()
+            # Check again, other consumers could have started tasks while this one waited for the queue
+            await self._wait_until_ready()
+            self._enqueued.popleft()
+            self._running += 1
+            try:
+                await discord.utils.maybe_coroutine(task, *args, **kwargs)
+                self._succeeded += 1
+                self._on_success()
             except (KeyboardInterrupt, SystemExit, asyncio.CancelledError) as e:
                 raise e
+            except RateLimitException as ex:
+                self._failures[type(ex).__name__] += 1
+                common.logging.debug(f"Rate limited, retrying task later: {ex}")
+                self.put(task, *args, **kwargs)
+                if self._rate_limit is not None:
+                    self._pause(self._rate_limit.get_time_until_next_free())
+                else:
+                    self._on_error(ex)
             except Exception as ex:
+                self._failures[type(ex).__name__] += 1
                 common.logging.error(exc_info=ex)
-                if self._error_count < 12:
-                    self._error_count += 1
+                self._on_error(ex)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+                self._finished.append(time.monotonic())
+                while self._finished[-1] - self._finished[0] > THROUGHPUT_WINDOW:
+                    self._finished.popleft()
+
+            await asyncio.sleep(self._delay)
 
     def put(self, f: Callable, *args, **kwargs):
         """
@@ -54,6 +158,7 @@ class QueueWorker:
         :param kwargs: The keyword arguments to pass to the function.
         """
         self._queue.put_nowait((f, args, kwargs))
+        self._enqueued.append(time.monotonic())
 
     async def _put_delayed(self, f: Callable, delay: float, *args, **kwargs):
         await asyncio.sleep(delay)
@@ -95,26 +200,213 @@ class QueueWorker:
         """
         return self._queue.empty()
 
+    def stats(self) -> QueueWorkerStats:
+        now = time.monotonic()
+        while self._finished and now - self._finished[0] > THROUGHPUT_WINDOW:
+            self._finished.popleft()
+
+        return QueueWorkerStats(
+            name=self.name,
+            depth=self.qsize(),
+            oldest_age=now - self._enqueued[0] if self._enqueued else 0.0,
+            throughput=len(self._finished) / THROUGHPUT_WINDOW,
+            succeeded=self._succeeded,
+            failures=dict(self._failures),
+            backoff={cls.__name__: count for cls, count in self._error_counts.items()},
+            paused_for=max(self._paused_until - now, 0.0),
+            rate_limit_wait=self._rate_limit_wait,
+        )
+
     @property
     def started(self):
         """
         Return True if the worker is running, False otherwise.
         """
-        return self._task is not None
+        return len(self._tasks) > 0
 
     def start(self):
         """
         Start the worker.
         """
-        if self._task is not None:
+        if self._tasks:
             raise RuntimeError("Worker already running")
-        self._task = asyncio.create_task(self._worker())
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._concurrency)]
 
     def stop(self):
         """
         Stop the worker.
         """
-        if self._task is not None:
-            self._task.cancel()
-        self._error_count = 0
-        self._task = None
+        for task in self._tasks:
+            task.cancel()
+        # Tasks of a DurableQueueWorker waiting to be queued again stay persisted and are restored on the next start
+        for task in list(self._delayed_tasks):
+            task.cancel()
+        self._error_counts.clear()
+        self._paused_until = 0.0
+        self._tasks = []
+
+
+def get_all_stats() -> list[QueueWorkerStats]:
+    """
+    Get the statistics of all queue workers.
+    """
+    return [w.stats() for w in _workers]
+
+
+class RetryLater(Exception):
+    def __init__(self, delay: float):
+        """
+        Raised by the handler of a DurableQueueWorker to process the task again after the delay, e.g. because the API
+        is unavailable. This doesn't count as a failed attempt.
+        """
+        super().__init__(f"Retry in {delay}s")
+        self.delay = delay
+
+
+class DurableQueueWorker(QueueWorker):
+    def __init__(self, name: str, handler: Callable[[str], Awaitable], max_size: int = 10000,
+                 shed_oldest: bool = False, max_attempts: int = 3, **kwargs):
+        """
+        A QueueWorker for tasks identified by a key (e.g. a player uuid) which are persisted in the database until they
+        were processed. Tasks that are still queued when the process stops are restored on the next start, so each task
+        is processed at least once. Adding a key that is already queued or being processed does nothing.
+
+        :param name: The name of the queue in the database.
+        :param handler: Processes the task of a key.
+        :param max_size: The maximum amount of queued tasks.
+        :param shed_oldest: If the queue is full, drop the oldest task for a new one instead of dropping the new task.
+        :param max_attempts: The amount of times a failing task is tried before it is dropped.
+        :param kwargs: See QueueWorker.
+        """
+        super().__init__(name=name, **kwargs)
+        self._handler = handler
+        self._max_size = max_size
+        self._shed_oldest = shed_oldest
+        self._max_attempts = max_attempts
+        # Keys of the queued and running tasks in the order they were added, mapped to their failed attempts
+        self._keys: dict[str, int] = {}
+        self._restore_task: asyncio.Task | None = None
+        self.shed = 0
+
+    async def _drop(self, key: str):
+        self._keys.pop(key, None)
+        await taskQueueData.remove(self.name, key)
+
+    async def _process(self, key: str):
+        if key not in self._keys:
+            # Shed while queued
+            return
+
+        try:
+            await self._handler(key)
+        except RetryLater as e:
+            self.put_delayed(self._process, e.delay, key)
+            return
+        except RateLimitException as e:
+            # Queued again by the worker
+            raise e
+        except Exception as e:
+            attempts = self._keys.get(key)
+            if attempts is None:
+                # Shed while running
+                return
+            attempts += 1
+            if attempts < self._max_attempts:
+                self._keys[key] = attempts
+                await taskQueueData.set_attempts(self.name, key, attempts)
+                self.put(self._process, key)
+            else:
+                await self._drop(key)
+            raise e
+
+        await self._drop(key)
+
+    async def add(self, key: str) -> bool:
+        """
+        Queue the task of a key unless it is already queued.
+
+        :return: True if the task was added, False if it was already queued or the queue is full.
+        """
+        return await self.add_many((key,)) > 0
+
+    async def add_many(self, keys: Iterable[str]) -> int:
+        """
+        Queue the tasks of multiple keys unless they are already queued. The tasks are persisted in one transaction.
+
+        :return: The amount of tasks that were added.
+        """
+        added = []
+        dropped = []
+        for key in keys:
+            if key in self._keys:
+                continue
+
+            if len(self._keys) >= self._max_size:
+                self.shed += 1
+                if not self._shed_oldest:
+                    continue
+                oldest = next(iter(self._keys))
+                self._keys.pop(oldest)
+                dropped.append(oldest)
+
+            self._keys[key] = 0
+            added.append(key)
+
+        # Keys of this batch can already have been shed again
+        added = [key for key in dict.fromkeys(added) if key in self._keys]
+        if dropped:
+            await taskQueueData.remove_all(self.name, dropped)
+        if added:
+            await taskQueueData.add_all(self.name, added)
+        for key in added:
+            self.put(self._process, key)
+        return len(added)
+
+    def size(self) -> int:
+        """
+        The amount of queued and running tasks.
+        """
+        return len(self._keys)
+
+    async def _restore_and_start(self):
+        try:
+            for key, attempts in await taskQueueData.get_all(self.name):
+                if key not in self._keys:
+                    self._keys[key] = attempts
+                    self.put(self._process, key)
+        except Exception as ex:
+            common.logging.error(f"Failed to restore the tasks of queue {self.name}.", exc_info=ex)
+
+        # Only start processing afterwards, the restored rows could otherwise include tasks that were just processed
+        super().start()
+
+    @property
+    def started(self):
+        return self._restore_task is not None
+
+    def start(self):
+        """
+        Queue the tasks persisted by the previous run and start the worker.
+        """
+        if self._restore_task is not None:
+            raise RuntimeError("Worker already running")
+        self._restore_task = asyncio.create_task(self._restore_and_start())
+
+    def stop(self):
+        if self._restore_task is not None:
+            self._restore_task.cancel()
+            self._restore_task = None
+        super().stop()
+
+    async def drain(self, timeout: float):
+        """
+        Stop the worker after processing the queued tasks for up to timeout seconds. Remaining tasks stay persisted.
+        """
+        if self.started:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._restore_task), timeout)
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                common.logging.info(f"Stopping queue {self.name} with {self.size()} tasks left.")
+        self.stop()
+        self._keys.clear()
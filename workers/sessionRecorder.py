@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+import common.logging
+import common.storage.sessionData
+import workers.onlineTracker
+
+
+def _normalize(uuid: str) -> str:
+    return uuid.replace("-", "").lower()
+
+
+def _naive(time: datetime) -> datetime:
+    return time.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class _SessionRecorder(workers.onlineTracker.OnlineSubscriber):
+    # The open sessions are the players that were online when the trackers last stopped
+    restore = True
+
+    async def online_changed(self, diff: workers.onlineTracker.OnlineDiff):
+        now = _naive(diff.snapshot.time)
+        started = {_normalize(uuid): diff.snapshot.uuids[uuid] for uuid in diff.joined_uuids}
+        ended = [_normalize(uuid) for uuid in diff.left_uuids]
+
+        if diff.restored:
+            # These players went offline at some point while the trackers were stopped, the last stored change is used
+            # as the end
+            await common.storage.sessionData.update_sessions({}, ended, _naive(diff.prev.time))
+            if ended:
+                common.logging.info(f"Ended {len(ended)} play sessions left open by the previous run.")
+            ended = []
+
+        await common.storage.sessionData.update_sessions(started, ended, now)
+
+
+_subscriber = _SessionRecorder()
+
+
+def start():
+    workers.onlineTracker.subscribe(_subscriber)
+    common.logging.info("Session recorder started.")
+
+
+def stop():
+    workers.onlineTracker.unsubscribe(_subscriber)
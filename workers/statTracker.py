@@ -1,79 +1,149 @@
-import asyncio
+from datetime import datetime, timedelta, timezone
 
 import aiohttp.client_exceptions
-from discord.ext import tasks
 
 import common.api
 import common.api.minecraft
-import common.api.rateLimit
+import common.api.retryPolicy
 import common.api.wynncraft.v3.guild
 import common.api.wynncraft.v3.player
 import common.api.wynncraft.v3.session
 import common.logging
 import common.storage.playerTrackerData
+import common.storage.sessionData
 import common.storage.usernameData
-from common.types.enums import PlayerIdentifier
-from workers.queueWorker import QueueWorker
+import workers.guildUpdater
+import workers.onlineTracker
+from workers.queueWorker import DurableQueueWorker, RetryLater
 
-_online_players: set[str] = set()
-_worker = QueueWorker(delay=0.1)
+# Time in seconds to keep recording the queued players on shutdown
+DRAIN_TIMEOUT = 10
+# Record the stats of players that are online for longer than this since their last record
+SNAPSHOT_INTERVAL = timedelta(hours=6)
+# The most snapshots queued per poll of the online list
+MAX_SNAPSHOTS_PER_POLL = 30
+# Wynncraft API calls left for commands, snapshots are only taken with the budget above this
+RESERVED_REQUESTS = 20
 
+# The online players mapped to the time their stats were last recorded (or they came online)
+_last_recorded: dict[str, datetime] = {}
 
-async def _record_stats(uuid: str, tries: int = 0):
-    if common.api.wynncraft.v3.session.calculate_remaining_requests() < 10:
-        wait_time = common.api.wynncraft.v3.session.ratelimit_reset_time()
-        await asyncio.sleep(wait_time + 1)
 
+async def _record_stats(uuid: str):
     stats = None
     try:
-        stats = await common.api.wynncraft.v3.player.stats(uuid=uuid)
-        await common.storage.playerTrackerData.add_record(stats)
+        stats = await common.api.wynncraft.v3.player.tracked_stats(uuid)
+        await common.storage.playerTrackerData.add_tracked_record(stats)
     except common.api.wynncraft.v3.player.UnknownPlayerException:
         common.logging.debug(f"Couldn't get stats of player with uuid {uuid}: Unknown player.")
+    except common.api.retryPolicy.CircuitOpenException as e:
+        # The API is down, try again once it is expected to be back
+        raise RetryLater(e.retry_after + 1)
     except aiohttp.client_exceptions.ClientResponseError as e:
-        if e.status == 500:
-            common.logging.warning(f"Error 500 for player with uuid: {uuid}")
-        elif tries < 1:
-            _worker.put(_record_stats, uuid, tries + 1)
-        else:
-            common.logging.error(f"Client error in player stat tracker: uuid: {uuid}")
-            raise e
+        # Transient errors were already retried by the session
+        common.logging.warning(f"Couldn't get stats of player with uuid {uuid}: Error {e.status}")
     except Exception as e:
         common.logging.error(f"Exception in player stat tracker: uuid: {uuid}, stats: {stats}")
         raise e
 
 
-@tasks.loop(seconds=61, reconnect=True)
-async def _update_online():
-    try:
-        global _online_players
-        prev_online_players = _online_players
-        _online_players = set(
-            (await common.api.wynncraft.v3.player.player_list(identifier=PlayerIdentifier.UUID)).keys())
+# Players that left are persisted until their stats were recorded, so they aren't lost on restarts. If the backlog
+# grows too large the oldest are dropped. Use the wynncraft API budget to work through backlogs but leave some for
+# commands.
+_worker = DurableQueueWorker("stat_tracker", _record_stats, max_size=20000, shed_oldest=True, concurrency=8,
+                             rate_limit=common.api.wynncraft.v3.session.get_rate_limit(),
+                             min_remaining=RESERVED_REQUESTS,
+                             backoff={aiohttp.client_exceptions.ClientError: 5, Exception: 1})
+
+
+def select_snapshots(last_recorded: dict[str, datetime], now: datetime, priority: set[str], budget: int) -> list[str]:
+    """
+    Select the online players whose stats should be recorded although they didn't leave.
+
+    :param last_recorded: The online players mapped to the time their stats were last recorded.
+    :param now: The current time.
+    :param priority: Undashed lowercase uuids of players that are recorded first, e.g. members of the tracked guilds.
+    :param budget: The maximum amount of players to select.
+    :return: The players online for longer than SNAPSHOT_INTERVAL since their last record, prioritized players first
+     and then the longest unrecorded.
+    """
+    due = [uuid for uuid, t in last_recorded.items() if now - t >= SNAPSHOT_INTERVAL]
+    due.sort(key=lambda uuid: (uuid.replace("-", "").lower() not in priority, last_recorded[uuid]))
+    return due[:max(budget, 0)]
+
+
+async def _restore(diff: workers.onlineTracker.OnlineDiff):
+    """
+    Record the players that left while the tracker was stopped. The players that are still online are snapshotted
+    again SNAPSHOT_INTERVAL after their last record in this session.
+    """
+    await _worker.add_many(diff.left_uuids)
+
+    still_online = {uuid: uuid.replace("-", "").lower() for uuid in diff.snapshot.uuids.keys() - diff.joined_uuids}
+    sessions = await common.storage.sessionData.get_open_sessions()
+    recorded = await common.storage.playerTrackerData.get_last_record_times(still_online.values())
+
+    _last_recorded.clear()
+    _last_recorded.update({uuid: diff.snapshot.time for uuid in diff.joined_uuids})
+    for uuid, normalized in still_online.items():
+        session = sessions.get(normalized)
+        if session is None:
+            _last_recorded[uuid] = diff.snapshot.time
+            continue
+        last = max(session.start, recorded.get(normalized, session.start))
+        _last_recorded[uuid] = last.replace(tzinfo=timezone.utc)
+
+    if diff.left_uuids:
+        common.logging.info(f"Tracking {len(diff.left_uuids)} player's stats that left while the tracker was stopped.")
+
+
+async def _schedule_snapshots(now: datetime):
+    # Leaves are recorded first, only use the budget that is left over
+    remaining = common.api.wynncraft.v3.session.calculate_remaining_requests()
+    budget = min(remaining - RESERVED_REQUESTS - _worker.qsize(), MAX_SNAPSHOTS_PER_POLL)
+
+    snapshots = select_snapshots(_last_recorded, now, workers.guildUpdater.tracked_members(), budget)
+    for uuid in snapshots:
+        # The stored time is updated once the stats were recorded
+        _last_recorded[uuid] = now
+    await _worker.add_many(snapshots)
+
+
+class _OnlinePlayerTracker(workers.onlineTracker.OnlineSubscriber):
+    # Leaves may have been missed while unsubscribed
+    restore = True
+
+    async def online_changed(self, diff: workers.onlineTracker.OnlineDiff):
+        now = diff.snapshot.time
+        if diff.restored:
+            await _restore(diff)
+        else:
+            for uuid in diff.left_uuids:
+                _last_recorded.pop(uuid, None)
+            await _worker.add_many(diff.left_uuids)
 
-        left_players = prev_online_players - _online_players
+            for uuid in diff.joined_uuids:
+                _last_recorded[uuid] = now
 
-        for uuid in left_players:
-            _worker.put(_record_stats, uuid)
+        await _schedule_snapshots(now)
 
-        if _worker.qsize() >= 50:
-            common.logging.debug(f"Tracking {len(left_players)}({_worker.qsize()}) player's stats.")
-    except common.api.rateLimit.RateLimitException:
-        pass
-    except Exception as ex:
-        await common.logging.error(exc_info=ex)
-        raise ex
+        if _worker.size() >= 50:
+            common.logging.debug(f"Tracking {len(diff.left_uuids)}({_worker.size()}) player's stats.")
 
 
-_update_online.add_exception_type(aiohttp.client_exceptions.ClientError, Exception)
+_subscriber = _OnlinePlayerTracker()
 
 
 def start():
-    _update_online.start()
+    workers.onlineTracker.subscribe(_subscriber)
     _worker.start()
     common.logging.info("Stat Tracker worker started.")
 
 
-def stop():
-    _worker.stop()
-    _update_online.stop()
+async def stop():
+    """
+    Stop tracking and record the stats of the queued players for up to DRAIN_TIMEOUT seconds. The remaining players are
+    recorded after the next start.
+    """
+    workers.onlineTracker.unsubscribe(_subscriber)
+    await _worker.drain(DRAIN_TIMEOUT)
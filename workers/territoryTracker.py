@@ -0,0 +1,99 @@
+import collections
+from datetime import datetime, timezone
+
+import aiohttp.client_exceptions
+from discord.ext import tasks
+
+import common.api.rateLimit
+import common.api.wynncraft.v3.guild
+import common.logging
+from common.storage import territoryData
+from common.storage.territoryData import TerritoryCapture
+from common.types.wynncraft import Territory
+from workers import loopStats
+
+# Territories mapped to the name of the guild owning them. None until the first poll.
+_owners: dict[str, str | None] | None = None
+_counts: collections.Counter[str] = collections.Counter()
+
+
+def get_counts() -> dict[str, int]:
+    """
+    Get the amount of territories each guild owns as of the last poll.
+    """
+    return dict(_counts)
+
+
+def get_owners() -> dict[str, str | None]:
+    """
+    Get the owners of the territories as of the last poll.
+
+    :return: The territories mapped to the name of the guild owning them.
+    """
+    return dict(_owners) if _owners is not None else {}
+
+
+def _acquired(territory: Territory, default: datetime) -> datetime:
+    try:
+        return datetime.fromisoformat(territory.acquired).astimezone(timezone.utc).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return default
+
+
+def compute_captures(prev: dict[str, str | None], territories: dict[str, Territory],
+                     now: datetime) -> list[TerritoryCapture]:
+    """
+    Compare the owners of the territories with the previous owners.
+
+    :param prev: The territories mapped to their previous owner.
+    :param territories: The current territories.
+    :param now: The time used if a territory has no valid acquire time.
+    :return: A capture for each territory with a new owner, at the time the territory was acquired.
+    """
+    captures = []
+    for name, territory in territories.items():
+        owner = territory.guild.name if territory.guild is not None else None
+        if name in prev and prev[name] == owner:
+            continue
+        captures.append(TerritoryCapture(_acquired(territory, now), name, prev.get(name), owner))
+    return captures
+
+
+@tasks.loop(seconds=30, reconnect=True)
+async def track_territories():
+    """
+    Store the captures of territories and count the territories of each guild.
+    """
+    try:
+        global _owners
+        territories = await common.api.wynncraft.v3.guild.list_territories()
+
+        prev = _owners
+        if prev is None:
+            # Continue from the owners stored before the restart
+            prev = await territoryData.get_owners()
+
+        captures = compute_captures(prev, territories, datetime.utcnow())
+        await territoryData.add_captures(captures)
+
+        _owners = {name: t.guild.name if t.guild is not None else None for name, t in territories.items()}
+        _counts.clear()
+        _counts.update(owner for owner in _owners.values() if owner is not None)
+    except common.api.rateLimit.RateLimitException:
+        pass
+    except Exception as ex:
+        common.logging.error(exc_info=ex)
+        raise ex
+
+
+track_territories.add_exception_type(aiohttp.client_exceptions.ClientError, Exception)
+loopStats.track_loop("territory_tracker", track_territories)
+
+
+def start():
+    track_territories.start()
+    common.logging.info("Territory tracker started.")
+
+
+def stop():
+    track_territories.stop()
@@ -0,0 +1,40 @@
+import common.logging
+import workers.guildCrawler
+import workers.guildUpdater
+import workers.playtimeTracker
+import workers.populationRecorder
+import workers.sessionRecorder
+import workers.statTracker
+import workers.territoryTracker
+import workers.usernameUpdater
+
+
+def start_tracking():
+    """
+    Start the workers that track players and guilds. Used by the bot and by the tracker process, whichever does the
+    tracking. Start the online tracker afterwards so the subscribers get its first poll.
+    """
+    common.logging.info("Starting tracking workers...")
+    workers.playtimeTracker.update_playtimes.start()
+    workers.guildUpdater.guild_updater.start()
+    workers.usernameUpdater.start()
+    workers.statTracker.start()
+    workers.guildCrawler.start()
+    workers.territoryTracker.start()
+    workers.populationRecorder.start()
+    workers.sessionRecorder.start()
+
+
+async def stop_tracking():
+    """
+    Stop the workers started by start_tracking, in reverse order. Stop the online tracker first.
+    """
+    common.logging.info("Stopping tracking workers...")
+    workers.sessionRecorder.stop()
+    workers.populationRecorder.stop()
+    workers.territoryTracker.stop()
+    workers.guildCrawler.stop()
+    await workers.statTracker.stop()
+    workers.usernameUpdater.stop()
+    workers.guildUpdater.guild_updater.stop()
+    workers.playtimeTracker.update_playtimes.stop()
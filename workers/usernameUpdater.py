@@ -2,12 +2,11 @@ import asyncio
 from abc import ABC, abstractmethod
 
 import aiohttp.client_exceptions
-from discord.ext import tasks
 
 import common.api.minecraft
 import common.api.rateLimit
+import common.api.retryPolicy
 import common.api.wynncraft.v3.guild
-import common.api.wynncraft.v3.player
 import common.api.wynncraft.v3.session
 import common.logging
 import common.storage.playerTrackerData
@@ -15,10 +14,10 @@ import common.storage.usernameData
 from common.types.dataTypes import MinecraftPlayer
 from common.types.enums import PlayerIdentifier
 from common.utils import minecraftPlayer
+import workers.onlineTracker
 from workers.queueWorker import QueueWorker
 
-_online_players: set[str] = set()
-_worker = QueueWorker(delay=0.5)
+_worker = QueueWorker(delay=0.5, name="username_updater")
 _queued_names: set[str] = set()
 
 
@@ -46,91 +45,88 @@ async def _update_username(player: MinecraftPlayer):
             await subscriber.name_changed(player.uuid, prev_p.name, player.name)
 
 
-async def _fetch_and_update_username_mojang(username: str, tries: int = 1):
-    if common.api.minecraft.calculate_remaining_calls() < 1:
-        _worker.put_delayed(_fetch_and_update_username_mojang, 61, username, tries)
-        return
-    try:
-        player = await common.api.minecraft.get_player(username=username, use_mojang=True)
-    except common.api.rateLimit.RateLimitException as e:
-        common.logging.error("Rate limited by mojang api!", e)
-        _worker.put_delayed(_fetch_and_update_username_mojang, 61, username, tries)
-        return
-    except aiohttp.client_exceptions.ClientError as e:
-        common.logging.error(f"Failed to update username ({tries}/3): ", username)
-        if tries < 3:
-            _worker.put_delayed(_fetch_and_update_username_mojang, 61, username, tries + 1)
-        raise e
+def _retry_later(username: str, tries: int, ex: Exception):
+    """
+    Queue another attempt of a username lookup. Lookups that failed because the api is unavailable (rate limited or
+    circuit open) are retried once it is available again and don't count as a try.
+
+    :param ex: The exception that caused the lookup to fail.
+    """
+    if isinstance(ex, common.api.retryPolicy.CircuitOpenException):
+        _worker.put_delayed(_fetch_and_update_username, ex.retry_after + 1, username, tries)
+    elif isinstance(ex, common.api.rateLimit.RateLimitException):
+        _worker.put_delayed(_fetch_and_update_username, 61, username, tries)
+    elif tries < 3:
+        _worker.put_delayed(_fetch_and_update_username, 61, username, tries + 1)
+    else:
+        _queued_names.discard(username)
+
 
+async def _name_found(username: str, player: MinecraftPlayer | None):
+    _queued_names.discard(username)
     if player is None:
-        common.logging.debug(f"{username} is not a minecraft name but online on wynncraft ({tries}/3)!")
-        if tries < 3:
-            _worker.put_delayed(_fetch_and_update_username_mojang, 300, username, tries + 1)
+        # Not looked up again until the negative cache entry expires
+        common.logging.debug(f"{username} is not a minecraft name but online on wynncraft!")
         return
 
-    _queued_names.discard(username)
     # Fix for api having outdated usernames
-    player = minecraftPlayer.MinecraftPlayer(uuid=player.uuid, name=username)
-    await _update_username(player)
+    await _update_username(minecraftPlayer.MinecraftPlayer(uuid=player.uuid, name=username))
 
 
 async def _fetch_and_update_username(username: str, tries: int = 1):
     try:
-        player = await common.api.minecraft.get_player(username=username)
-    except common.api.rateLimit.RateLimitException as e:
-        common.logging.error("Rate limited!", e)
-        await asyncio.sleep(60)
-        _worker.put(_fetch_and_update_username, username)
+        player = await common.api.minecraft.resolve_player(username=username)
+    except (common.api.rateLimit.RateLimitException, common.api.retryPolicy.CircuitOpenException) as e:
+        common.logging.debug(f"Player apis unavailable, delaying lookup of {username}: {e}")
+        _retry_later(username, tries, e)
         return
     except aiohttp.client_exceptions.ClientError as e:
         common.logging.error(f"Failed to update username ({tries}/3): ", username)
-        if tries < 3:
-            _worker.put_delayed(_fetch_and_update_username, 60, username, tries + 1)
+        _retry_later(username, tries, e)
         raise e
 
-    if player is None:
-        await _fetch_and_update_username_mojang(username, tries)
-        return
+    await _name_found(username, player)
 
-    _queued_names.discard(username)
-    await _update_username(player)
 
+async def _fetch_and_update_usernames(usernames: list[str]):
+    # The lookups are collected into one bulk request
+    players = await asyncio.gather(*(common.api.minecraft.lookup_name(name) for name in usernames),
+                                   return_exceptions=True)
 
-@tasks.loop(seconds=61, reconnect=True)
-async def _update_usernames():
-    try:
-        global _online_players
-        prev_online_players = _online_players
-        _online_players = set((await common.api.wynncraft.v3.player.player_list(PlayerIdentifier.USERNAME)).keys())
+    for username, player in zip(usernames, players):
+        if isinstance(player, Exception):
+            # Bulk lookups unavailable, resolve the name on its own instead
+            _worker.put(_fetch_and_update_username, username)
+        else:
+            await _name_found(username, player)
+
+
+class _JoinedPlayerTracker(workers.onlineTracker.OnlineSubscriber):
+    identifiers = frozenset({PlayerIdentifier.UUID, PlayerIdentifier.USERNAME})
 
-        joined_players = _online_players - prev_online_players
+    async def online_changed(self, diff: workers.onlineTracker.OnlineDiff):
+        joined_players = diff.joined_usernames
 
         known_names = {p.name for p in await common.storage.usernameData.get_players(usernames=list(joined_players))}
-        unknown_names = [name for name in joined_players if name not in known_names]
+        unknown_names = [name for name in joined_players if name not in known_names and name not in _queued_names]
 
-        for username in unknown_names:
-            if username not in _queued_names:
-                _worker.put(_fetch_and_update_username, username)
+        _queued_names.update(unknown_names)
+        for i in range(0, len(unknown_names), 10):
+            _worker.put(_fetch_and_update_usernames, unknown_names[i:i + 10])
 
         if _worker.qsize() >= 20:
             common.logging.debug(f"Updating {len(unknown_names)}({_worker.qsize()}) minecraft usernames.")
 
-    except common.api.rateLimit.RateLimitException:
-        pass
-    except Exception as ex:
-        await common.logging.error(exc_info=ex)
-        raise ex
-
 
-_update_usernames.add_exception_type(aiohttp.client_exceptions.ClientError, Exception)
+_online_subscriber = _JoinedPlayerTracker()
 
 
 def start():
-    _update_usernames.start()
+    workers.onlineTracker.subscribe(_online_subscriber)
     _worker.start()
     common.logging.info("Username updater worker started.")
 
 
 def stop():
+    workers.onlineTracker.unsubscribe(_online_subscriber)
     _worker.stop()
-    _update_usernames.stop()